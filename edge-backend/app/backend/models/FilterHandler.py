@@ -1,6 +1,7 @@
 import json
 
 from app.backend.models.ImageFilter import FilterSpec
+from app.backend.services.image_processing import compile_filters
 
 
 class FilterHandler:
@@ -8,9 +9,10 @@ class FilterHandler:
         self.recipe_path = recipe_path
         self.filters_list = []
         self.filter_specs = []
+        self.pipeline = compile_filters(self.filter_specs)
 
     def load_filters(self):
-        """Carrega os filtros de um arquivo JSON."""
+        """Carrega os filtros de um arquivo JSON e os compila em um pipeline."""
         try:
             with open(self.recipe_path, "r") as file:
                 self.filters_list = json.load(file)
@@ -18,3 +20,4 @@ class FilterHandler:
             self.filters_list = []
         finally:
             self.filter_specs = [FilterSpec(**filter) for filter in self.filters_list]
+            self.pipeline = compile_filters(self.filter_specs)
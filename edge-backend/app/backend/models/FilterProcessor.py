@@ -2,19 +2,20 @@ from fastapi import HTTPException
 
 from app.backend.models.Crop import GlobalCropData
 from app.backend.models.FilterHandler import FilterHandler
-from app.backend.services.image_processing import apply_crop, process_image_with_filters
+from app.backend.models.PipelineMetrics import PipelineMetrics
+from app.backend.services.image_processing import apply_crop
 
 
 class FilterProcessor:
-    def __init__(self, filter_handler: FilterHandler):
+    def __init__(self, filter_handler: FilterHandler, metrics: PipelineMetrics = None):
         self.filter_handler = filter_handler
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
 
     def apply_filters(self, image):
         """Aplica os filtros do FilterHandler ao frame."""
         try:
-            processed_image = process_image_with_filters(
-                image, self.filter_handler.filter_specs
-            )
+            with self.metrics.time("filters"):
+                processed_image = self.filter_handler.pipeline(image)
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Erro no processamento: {str(e)}"
@@ -24,6 +25,12 @@ class FilterProcessor:
     def apply_black_edges(self, image):
         return apply_crop(image, (0, -420, 1920, 1920))
 
-    def apply_crop_predict_image(self, image):
-        coordinates = GlobalCropData.recalculate_real_coordinates()
-        return apply_crop(image, coordinates)
+    def get_crop_coordinates(self):
+        """Retorna as coordenadas (x, y, largura, altura) do recorte de predição."""
+        return tuple(GlobalCropData.recalculate_real_coordinates())
+
+    def apply_crop_predict_image(self, image, coordinates=None):
+        if coordinates is None:
+            coordinates = self.get_crop_coordinates()
+        with self.metrics.time("crop"):
+            return apply_crop(image, coordinates)
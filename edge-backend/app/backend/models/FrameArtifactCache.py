@@ -0,0 +1,64 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class FrameArtifactCache:
+    def __init__(self):
+        """
+        Initializes a cache of artifacts derived from a single frame.
+
+        Artifacts (crops, JPEG encodings, base64 strings) are stored under a key that
+        describes how they were produced, for example the crop coordinates and the
+        encoding parameters. Only artifacts of the newest frame are kept: they are
+        evicted as soon as an artifact of a newer frame is requested.
+        """
+        self._seq = -1
+        self._artifacts: Dict[Hashable, Any] = {}
+        self._lock = threading.RLock()
+
+    def peek(self, seq: int, key: Hashable) -> Any:
+        """
+        Returns a cached artifact without building it.
+
+        Args:
+            seq (int): Sequence number of the frame.
+            key (Hashable): Description of the artifact.
+
+        Returns:
+            Any: The cached artifact, or None if it is not cached for this frame.
+        """
+        with self._lock:
+            if seq != self._seq:
+                return None
+            return self._artifacts.get(key)
+
+    def get_or_create(self, seq: int, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Returns the cached artifact for a frame, building it at most once.
+
+        Args:
+            seq (int): Sequence number of the frame the artifact is derived from.
+            key (Hashable): Description of the artifact, e.g. ("jpeg", coordinates, quality).
+            factory (Callable[[], Any]): Builds the artifact on a cache miss.
+
+        Returns:
+            Any: The cached or newly built artifact.
+        """
+        with self._lock:
+            if seq < self._seq:
+                # A consumer still holding an older frame: don't evict the newer one.
+                return factory()
+            if seq > self._seq:
+                self._seq = seq
+                self._artifacts.clear()
+            if key not in self._artifacts:
+                self._artifacts[key] = factory()
+            return self._artifacts[key]
+
+    def clear(self) -> None:
+        """
+        Drops every cached artifact.
+        """
+        with self._lock:
+            self._seq = -1
+            self._artifacts.clear()
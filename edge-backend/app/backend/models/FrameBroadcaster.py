@@ -0,0 +1,162 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Iterator, Optional, Set
+
+
+class FrameSubscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        """
+        Initializes a viewer of the broadcast with its own bounded queue.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Event loop the viewer is served from.
+            queue_size (int): Maximum number of chunks kept for this viewer.
+        """
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, chunk: Optional[bytes]) -> None:
+        """
+        Enqueues a chunk, discarding the oldest one if the viewer is falling behind.
+
+        Must run on the subscriber's event loop.
+
+        Args:
+            chunk (Optional[bytes]): The encoded chunk, or None to end the stream.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(chunk)
+
+
+class FrameBroadcaster:
+    def __init__(self, source: Callable[[], Iterator[bytes]], queue_size: int = 2):
+        """
+        Initializes a broadcaster that encodes each frame once and shares it with every viewer.
+
+        A single background thread consumes `source` and hands the same bytes to all
+        subscribers, so the encoding cost does not grow with the number of viewers.
+        The thread only pulls from `source` while at least one viewer is attached, so
+        nothing is encoded when nobody is watching.
+
+        Args:
+            source (Callable[[], Iterator[bytes]]): Factory for the encoded chunk iterator.
+            queue_size (int): Maximum number of chunks buffered per viewer.
+        """
+        self.source = source
+        self.queue_size = queue_size
+        self._subscribers: Set[FrameSubscriber] = set()
+        self._lock = threading.Lock()
+        self._viewers = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def subscriber_count(self) -> int:
+        """
+        Returns the number of connected viewers.
+        """
+        return len(self._subscribers)
+
+    def subscribe(self) -> FrameSubscriber:
+        """
+        Registers a viewer and starts the encoder thread if needed.
+
+        Must be called from the event loop that will consume the subscriber queue.
+
+        Returns:
+            FrameSubscriber: The new subscriber.
+        """
+        subscriber = FrameSubscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            self._ensure_running()
+            self._viewers.notify_all()
+        return subscriber
+
+    def unsubscribe(self, subscriber: FrameSubscriber) -> None:
+        """
+        Removes a viewer from the broadcast.
+
+        Args:
+            subscriber (FrameSubscriber): The subscriber to remove.
+        """
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _ensure_running(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _broadcast(self, chunk: Optional[bytes]) -> None:
+        """
+        Hands a chunk to every subscriber's event loop.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, chunk)
+            except RuntimeError:
+                # The subscriber's event loop is closed.
+                self.unsubscribe(subscriber)
+
+    def _wait_for_viewers(self) -> bool:
+        """
+        Blocks the encoder while nobody is subscribed.
+
+        Returns:
+            bool: False if the broadcaster was stopped while waiting.
+        """
+        with self._viewers:
+            while not self._subscribers and not self._stopped.is_set():
+                self._viewers.wait(1.0)
+        return not self._stopped.is_set()
+
+    def _run(self) -> None:
+        """
+        Encoder loop: pulls chunks from the source and fans them out.
+
+        The next chunk is only requested once a viewer is attached, which leaves the
+        source suspended (and not encoding) while the preview is unwatched.
+        """
+        chunks = None
+        while self._wait_for_viewers():
+            if chunks is None:
+                chunks = self.source()
+            chunk = next(chunks, None)
+            if chunk is None:
+                chunks = None
+                self._stopped.wait(1.0)
+                continue
+            self._broadcast(chunk)
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        """
+        Yields the broadcast chunks for one viewer until it disconnects.
+
+        Yields:
+            bytes: The shared encoded chunk.
+        """
+        subscriber = self.subscribe()
+        try:
+            while True:
+                chunk = await subscriber.queue.get()
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stop(self) -> None:
+        """
+        Stops the encoder thread and ends every viewer's stream.
+        """
+        self._stopped.set()
+        with self._viewers:
+            self._viewers.notify_all()
+        self._broadcast(None)
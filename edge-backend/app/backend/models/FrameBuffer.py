@@ -0,0 +1,169 @@
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+
+class FrameRecord(NamedTuple):
+    """
+    A frame read from the ring buffer.
+
+    Attributes:
+        seq (int): Monotonically increasing sequence number assigned at capture.
+        timestamp (float): `time.monotonic()` value taken when the frame was published.
+        image (Optional[np.ndarray]): A private copy of the captured pixels, or None for
+            frames published in compressed form.
+        jpeg (Optional[bytes]): The compressed bytes delivered by the camera, if any.
+    """
+
+    seq: int
+    timestamp: float
+    image: Optional[np.ndarray]
+    jpeg: Optional[bytes] = None
+
+    def pixels(self) -> np.ndarray:
+        """
+        Returns the frame as a BGR array, decoding the compressed bytes if needed.
+
+        Returns:
+            np.ndarray: The frame pixels.
+        """
+        if self.image is not None:
+            return self.image
+        return cv2.imdecode(np.frombuffer(self.jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class FrameBuffer:
+    def __init__(self, size: int = 4):
+        """
+        Initializes a fixed-size ring buffer of preallocated frame slots.
+
+        The buffer has a single writer (the capture thread) and any number of readers.
+        Readers never take a lock: every slot carries the sequence number of the frame
+        it holds and a reader retries if the writer reused the slot while it was copying.
+
+        Args:
+            size (int): Number of slots in the ring. Must be at least 2.
+
+        Raises:
+            ValueError: If size is smaller than 2.
+        """
+        if size < 2:
+            raise ValueError("FrameBuffer size must be at least 2.")
+        self.size = size
+        self._slots: List[Optional[np.ndarray]] = [None] * size
+        self._slot_seq = [-1] * size
+        self._slot_timestamp = [0.0] * size
+        self._slot_jpeg: List[Optional[bytes]] = [None] * size
+        self._latest_seq = -1
+        self._new_frame = threading.Condition()
+
+    @property
+    def latest_seq(self) -> int:
+        """
+        Returns the sequence number of the most recently published frame, or -1 if empty.
+        """
+        return self._latest_seq
+
+    def _allocate(self, shape, dtype) -> None:
+        """
+        Preallocates every slot for frames of the given shape and dtype.
+        """
+        self._slots = [np.empty(shape, dtype=dtype) for _ in range(self.size)]
+        self._slot_seq = [-1] * self.size
+        self._slot_jpeg = [None] * self.size
+
+    def publish(self, image: np.ndarray) -> int:
+        """
+        Copies a captured frame into the next slot and makes it visible to readers.
+
+        Slots are allocated on the first frame and only reallocated if the camera
+        changes resolution.
+
+        Args:
+            image (np.ndarray): The captured frame.
+
+        Returns:
+            int: The sequence number assigned to the frame.
+        """
+        slot = self._slots[0]
+        if slot is None or slot.shape != image.shape or slot.dtype != image.dtype:
+            self._allocate(image.shape, image.dtype)
+
+        seq = self._latest_seq + 1
+        index = seq % self.size
+        self._slot_seq[index] = -1
+        np.copyto(self._slots[index], image)
+        self._slot_jpeg[index] = None
+        self._slot_timestamp[index] = time.monotonic()
+        self._slot_seq[index] = seq
+        self._latest_seq = seq
+
+        with self._new_frame:
+            self._new_frame.notify_all()
+        return seq
+
+    def publish_encoded(self, jpeg: bytes) -> int:
+        """
+        Publishes a frame that is still JPEG compressed, as delivered by an MJPG camera.
+
+        The bytes are immutable, so readers share them without copying and only decode
+        them if they need pixels.
+
+        Args:
+            jpeg (bytes): The compressed frame.
+
+        Returns:
+            int: The sequence number assigned to the frame.
+        """
+        seq = self._latest_seq + 1
+        index = seq % self.size
+        self._slot_seq[index] = -1
+        self._slot_jpeg[index] = jpeg
+        self._slot_timestamp[index] = time.monotonic()
+        self._slot_seq[index] = seq
+        self._latest_seq = seq
+
+        with self._new_frame:
+            self._new_frame.notify_all()
+        return seq
+
+    def latest(self) -> Optional[FrameRecord]:
+        """
+        Returns a consistent copy of the most recent frame.
+
+        Returns:
+            Optional[FrameRecord]: The latest frame, or None if nothing was published yet.
+        """
+        while True:
+            seq = self._latest_seq
+            if seq < 0:
+                return None
+            index = seq % self.size
+            timestamp = self._slot_timestamp[index]
+            jpeg = self._slot_jpeg[index]
+            slot = self._slots[index]
+            image = slot.copy() if jpeg is None and slot is not None else None
+            if self._slot_seq[index] == seq:
+                return FrameRecord(seq, timestamp, image, jpeg)
+
+    def wait_for_frame(
+        self, after_seq: int, timeout: float = 1.0
+    ) -> Optional[FrameRecord]:
+        """
+        Blocks until a frame newer than `after_seq` is published.
+
+        Args:
+            after_seq (int): Sequence number of the last frame the caller has seen.
+            timeout (float): Maximum time to wait, in seconds.
+
+        Returns:
+            Optional[FrameRecord]: The latest frame, or None if the wait timed out.
+        """
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self._latest_seq > after_seq, timeout)
+        if self._latest_seq > after_seq:
+            return self.latest()
+        return None
@@ -0,0 +1,109 @@
+import os
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class FrameChangeDetector:
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_age: Optional[float] = None,
+        size: int = 32,
+    ):
+        """
+        Initializes a cheap detector of scene changes between prediction images.
+
+        Each image is reduced to a tiny grayscale thumbnail and compared with the
+        thumbnail of the last image that was actually inferred, using the mean absolute
+        difference of the pixels.
+
+        Args:
+            threshold (Optional[float]): Mean absolute difference, in gray levels (0-255),
+                below which the scene is considered unchanged. Defaults to the
+                FRAME_CHANGE_THRESHOLD environment variable, or 3.
+            max_age (Optional[float]): Maximum time, in seconds, a result may be reused
+                before a real inference is forced. Defaults to the FRAME_REUSE_MAX_AGE
+                environment variable, or 10. Zero disables reuse.
+            size (int): Side of the square thumbnail.
+        """
+        if threshold is None:
+            threshold = float(os.getenv("FRAME_CHANGE_THRESHOLD", "3"))
+        if max_age is None:
+            max_age = float(os.getenv("FRAME_REUSE_MAX_AGE", "10"))
+        self.threshold = threshold
+        self.max_age = max_age
+        self.size = size
+        self._reference: Optional[np.ndarray] = None
+        self._reference_time = 0.0
+
+    def signature(self, jpeg: bytes) -> Optional[np.ndarray]:
+        """
+        Computes the thumbnail of a JPEG image.
+
+        The JPEG is decoded at 1/8 scale straight to grayscale, so the cost stays small
+        even for full resolution frames.
+
+        Args:
+            jpeg (bytes): The JPEG encoded image.
+
+        Returns:
+            Optional[np.ndarray]: The thumbnail, or None if the image could not be decoded.
+        """
+        gray = cv2.imdecode(
+            np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8
+        )
+        if gray is None:
+            return None
+        thumbnail = cv2.resize(
+            gray, (self.size, self.size), interpolation=cv2.INTER_AREA
+        )
+        return thumbnail.astype(np.int16)
+
+    def difference(self, signature: Optional[np.ndarray]) -> Optional[float]:
+        """
+        Returns the mean absolute difference to the last inferred image.
+
+        Args:
+            signature (Optional[np.ndarray]): Thumbnail returned by `signature`.
+
+        Returns:
+            Optional[float]: The difference, or None if there is nothing to compare with.
+        """
+        if signature is None or self._reference is None:
+            return None
+        return float(np.mean(np.abs(signature - self._reference)))
+
+    def is_unchanged(self, signature: Optional[np.ndarray]) -> bool:
+        """
+        Checks whether the previous result can be reused for this image.
+
+        Args:
+            signature (Optional[np.ndarray]): Thumbnail returned by `signature`.
+
+        Returns:
+            bool: True if the scene did not change and the last result is not too old.
+        """
+        if time.monotonic() - self._reference_time >= self.max_age:
+            return False
+        difference = self.difference(signature)
+        return difference is not None and difference < self.threshold
+
+    def remember(self, signature: Optional[np.ndarray]) -> None:
+        """
+        Stores the thumbnail of an image that was actually inferred.
+
+        Args:
+            signature (Optional[np.ndarray]): Thumbnail returned by `signature`.
+        """
+        self._reference = signature
+        self._reference_time = time.monotonic()
+
+    def reset(self) -> None:
+        """
+        Forgets the last inferred image, forcing the next inference.
+        """
+        self._reference = None
+        self._reference_time = 0.0
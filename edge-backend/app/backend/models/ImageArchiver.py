@@ -0,0 +1,250 @@
+import asyncio
+import csv
+import hashlib
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+INDEX_FILE = "index.csv"
+INDEX_COLUMNS = ("created_at", "class", "score", "bytes", "hash", "file")
+
+# Space freed below the budget by each eviction, so it does not run on every write.
+EVICTION_MARGIN = 0.9
+
+
+class ImageArchiver:
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+        sample_every: Optional[int] = None,
+        reject_classes: Optional[Iterable[str]] = None,
+    ):
+        """
+        Initializes an archive of inference images on the local disk.
+
+        Images are written as they were sent to the model, under one directory per day and
+        class, e.g. "2026-10-18/nok/123456_789012_ab12cd34ef56.jpg". Each day directory has
+        an index.csv with the result of every image. Identical images are stored once, and
+        the oldest images are removed when the archive grows past its size or age limits.
+
+        Args:
+            root (Optional[str]): Directory of the archive. Defaults to the
+                IMAGE_ARCHIVE_DIR environment variable; archiving is disabled when not set.
+            max_bytes (Optional[int]): Disk budget of the images. Defaults to the
+                IMAGE_ARCHIVE_MAX_MB environment variable, or 1024 MB.
+            max_age_days (Optional[float]): Days images are kept. Defaults to the
+                IMAGE_ARCHIVE_MAX_DAYS environment variable, or 30.
+            sample_every (Optional[int]): Keep one image every N results of the other
+                classes. Defaults to the IMAGE_ARCHIVE_SAMPLE_EVERY environment variable, or 10.
+            reject_classes (Optional[Iterable[str]]): Classes whose images are always kept.
+                Defaults to the REJECT_CLASSES environment variable, comma separated, or "nok".
+        """
+        if root is None:
+            root = os.getenv("IMAGE_ARCHIVE_DIR") or None
+        if max_bytes is None:
+            max_bytes = int(
+                float(os.getenv("IMAGE_ARCHIVE_MAX_MB", "1024")) * 1024 * 1024
+            )
+        if max_age_days is None:
+            max_age_days = float(os.getenv("IMAGE_ARCHIVE_MAX_DAYS", "30"))
+        if sample_every is None:
+            sample_every = int(os.getenv("IMAGE_ARCHIVE_SAMPLE_EVERY", "10"))
+        if reject_classes is None:
+            reject_classes = os.getenv("REJECT_CLASSES", "nok").split(",")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = timedelta(days=max_age_days)
+        self.sample_every = max(1, sample_every)
+        self.reject_classes = {name for name in reject_classes if name}
+        self.stats = {"saved": 0, "sampled_out": 0, "duplicates": 0, "evicted": 0}
+        self._seen = 0
+        self._hashes: Optional[Dict[str, str]] = None
+        self._bytes = 0
+        self._last_age_check = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def should_archive(self, inference: dict) -> bool:
+        """
+        Applies the sampling rules to a result: every reject, one in N of the others.
+
+        Args:
+            inference (dict): Result with "classification".
+
+        Returns:
+            bool: Whether the image of the result is archived.
+        """
+        if not self.enabled:
+            return False
+        if inference["classification"] in self.reject_classes:
+            return True
+        self._seen += 1
+        if (self._seen - 1) % self.sample_every == 0:
+            return True
+        self.stats["sampled_out"] += 1
+        return False
+
+    async def archive(
+        self, jpeg: bytes, inference: dict, created_at: Optional[datetime] = None
+    ) -> Optional[str]:
+        """
+        Archives the image of a result if the sampling rules keep it.
+
+        The file is written in a worker thread, so the event loop never waits for the disk.
+
+        Args:
+            jpeg (bytes): The JPEG image the result was computed on.
+            inference (dict): Result with "classification" and "confidence-score".
+            created_at (Optional[datetime]): When the frame was captured. Defaults to now.
+
+        Returns:
+            Optional[str]: Path of the image, or None if it was sampled out.
+        """
+        if not self.should_archive(inference):
+            return None
+        created_at = created_at or datetime.now(timezone.utc)
+        return await asyncio.to_thread(self.write, jpeg, inference, created_at)
+
+    def write(self, jpeg: bytes, inference: dict, created_at: datetime) -> str:
+        """
+        Writes an image and its index entry, then evicts old images if needed.
+
+        Must not run concurrently with itself; the archive sink calls it from a single task.
+
+        Args:
+            jpeg (bytes): The JPEG image.
+            inference (dict): Result with "classification" and "confidence-score".
+            created_at (datetime): When the frame was captured.
+
+        Returns:
+            str: Path of the image, which is the existing copy for a duplicate.
+        """
+        self._load()
+        digest = hashlib.blake2b(jpeg, digest_size=16).hexdigest()
+        class_name = re.sub(r"[^\w.-]", "_", str(inference["classification"])) or "_"
+        day = created_at.astimezone(timezone.utc).strftime("%Y-%m-%d")
+        name = f"{created_at.astimezone(timezone.utc):%H%M%S_%f}_{digest[:12]}.jpg"
+        relative = os.path.join(class_name, name)
+        duplicate = digest in self._hashes
+        if duplicate:
+            self.stats["duplicates"] += 1
+            path = self._hashes[digest]
+        else:
+            directory = os.path.join(self.root, day, class_name)
+            os.makedirs(directory, exist_ok=True)
+            temporary = os.path.join(directory, f".{name}.tmp")
+            with open(temporary, "wb") as image:
+                image.write(jpeg)
+            os.replace(temporary, os.path.join(directory, name))
+            path = os.path.join(day, relative)
+            self._hashes[digest] = path
+            self._bytes += len(jpeg)
+            self.stats["saved"] += 1
+        self._append_index(
+            day,
+            [
+                created_at.isoformat(),
+                inference["classification"],
+                inference["confidence-score"],
+                0 if duplicate else len(jpeg),
+                digest,
+                "" if duplicate else relative,
+            ],
+        )
+        self._evict()
+        return os.path.join(self.root, path)
+
+    def _append_index(self, day: str, entry: List) -> None:
+        path = os.path.join(self.root, day, INDEX_FILE)
+        new = not os.path.exists(path)
+        with open(path, "a", newline="") as index:
+            writer = csv.writer(index)
+            if new:
+                writer.writerow(INDEX_COLUMNS)
+            writer.writerow(entry)
+
+    def _days(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            entry.name
+            for entry in os.scandir(self.root)
+            if entry.is_dir() and re.fullmatch(r"\d{4}-\d{2}-\d{2}", entry.name)
+        )
+
+    def _read_index(self, day: str) -> List[Dict[str, str]]:
+        path = os.path.join(self.root, day, INDEX_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, newline="") as index:
+            return list(csv.DictReader(index))
+
+    def _load(self) -> None:
+        """
+        Reads the hashes and size of the stored images once, on the first write.
+        """
+        if self._hashes is not None:
+            return
+        self._hashes = {}
+        self._bytes = 0
+        for day in self._days():
+            for entry in self._read_index(day):
+                if entry["file"]:
+                    self._hashes[entry["hash"]] = os.path.join(day, entry["file"])
+                    self._bytes += int(entry["bytes"])
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        if now - self._last_age_check >= 3600:
+            self._last_age_check = now
+            oldest = (datetime.now(timezone.utc) - self.max_age).strftime("%Y-%m-%d")
+            for day in self._days():
+                if day < oldest:
+                    self._remove_day(day)
+        if self._bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICTION_MARGIN
+        for day in self._days():
+            if self._bytes <= target:
+                return
+            entries = self._read_index(day)
+            kept = []
+            for entry in entries:
+                if entry["file"] and self._bytes > target:
+                    self._remove_file(day, entry)
+                else:
+                    kept.append(entry)
+            if any(entry["file"] for entry in kept):
+                self._rewrite_index(day, kept)
+            else:
+                shutil.rmtree(os.path.join(self.root, day), ignore_errors=True)
+
+    def _remove_file(self, day: str, entry: Dict[str, str]) -> None:
+        try:
+            os.remove(os.path.join(self.root, day, entry["file"]))
+        except FileNotFoundError:
+            pass
+        self._hashes.pop(entry["hash"], None)
+        self._bytes -= int(entry["bytes"])
+        self.stats["evicted"] += 1
+
+    def _remove_day(self, day: str) -> None:
+        for entry in self._read_index(day):
+            if entry["file"]:
+                self._remove_file(day, entry)
+        shutil.rmtree(os.path.join(self.root, day), ignore_errors=True)
+
+    def _rewrite_index(self, day: str, entries: List[Dict[str, str]]) -> None:
+        path = os.path.join(self.root, day, INDEX_FILE)
+        with open(f"{path}.tmp", "w", newline="") as index:
+            writer = csv.DictWriter(index, fieldnames=INDEX_COLUMNS)
+            writer.writeheader()
+            writer.writerows(entries)
+        os.replace(f"{path}.tmp", path)
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Sequence, Tuple
+
+import websockets
+
+from app.backend.services.frame_protocol import FRAME_SUBPROTOCOL
+
+
+class ConnectionUnavailableError(Exception):
+    """Exception raised while a route is backing off after failed connection attempts."""
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class InferenceRejectedError(Exception):
+    """Exception raised when the inference service refuses a frame, e.g. when overloaded."""
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class _RoutePool:
+    def __init__(self, size: int):
+        self.slots = asyncio.Semaphore(size)
+        # (connection, generation, last_used)
+        self.idle: List[Tuple[object, int, float]] = []
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+class InferenceConnectionPool:
+    def __init__(
+        self,
+        connect: Callable = websockets.connect,
+        size: int = 1,
+        subprotocols: Sequence[str] = (FRAME_SUBPROTOCOL,),
+        health_check_interval: float = 10.0,
+        health_check_timeout: float = 2.0,
+        min_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        """
+        Initializes a pool of long-lived WebSocket connections, keyed by route.
+
+        Connections are reused across requests instead of paying a TCP and WebSocket
+        handshake per inference. Each route holds at most `size` connections, and each
+        connection carries one request at a time.
+
+        Args:
+            connect (Callable): Coroutine factory used to open connections.
+            size (int): Maximum number of connections per route.
+            subprotocols (Sequence[str]): Subprotocols offered when connecting.
+            health_check_interval (float): Idle time, in seconds, after which a connection
+                is pinged before being reused.
+            health_check_timeout (float): Time to wait for the pong, in seconds.
+            min_backoff (float): Delay before the first reconnection attempt, in seconds.
+            max_backoff (float): Upper bound of the exponential reconnection delay.
+        """
+        self._connect = connect
+        self.size = size
+        self.subprotocols = list(subprotocols)
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._routes: Dict[str, _RoutePool] = {}
+        self._generation = 0
+
+    def _route_pool(self, route: str) -> _RoutePool:
+        if route not in self._routes:
+            self._routes[route] = _RoutePool(self.size)
+        return self._routes[route]
+
+    @asynccontextmanager
+    async def acquire(self, route: str) -> AsyncIterator[object]:
+        """
+        Lends a healthy connection to `route`, opening one if needed.
+
+        The connection goes back to the pool when the block exits normally, or with an
+        InferenceRejectedError, since the service answered and the connection is healthy.
+        If the block raises anything else (or is cancelled) the connection state is
+        unknown, so it is closed.
+
+        Args:
+            route (str): WebSocket URL of the service.
+
+        Yields:
+            The open WebSocket connection.
+
+        Raises:
+            ConnectionUnavailableError: If the route is still backing off after a failure.
+            Exception: Any error raised while opening the connection.
+        """
+        pool = self._route_pool(route)
+        async with pool.slots:
+            connection, generation = await self._checkout(route, pool)
+            try:
+                yield connection
+            except InferenceRejectedError:
+                await self._release(pool, connection, generation)
+                raise
+            except BaseException:
+                await self._close(connection)
+                raise
+            await self._release(pool, connection, generation)
+
+    async def _release(self, pool: _RoutePool, connection, generation: int) -> None:
+        if generation == self._generation and self._is_open(connection):
+            pool.idle.append((connection, generation, time.monotonic()))
+        else:
+            await self._close(connection)
+
+    async def _checkout(self, route: str, pool: _RoutePool) -> Tuple[object, int]:
+        while pool.idle:
+            connection, generation, last_used = pool.idle.pop()
+            if generation != self._generation or not self._is_open(connection):
+                await self._close(connection)
+                continue
+            if time.monotonic() - last_used >= self.health_check_interval:
+                if not await self._is_healthy(connection):
+                    await self._close(connection)
+                    continue
+            return connection, generation
+
+        return await self._open(route, pool), self._generation
+
+    async def _open(self, route: str, pool: _RoutePool):
+        now = time.monotonic()
+        if now < pool.retry_at:
+            raise ConnectionUnavailableError(
+                f"Conexão com {route} indisponível, nova tentativa em "
+                f"{pool.retry_at - now:.1f}s."
+            )
+        try:
+            connection = await self._connect(route, subprotocols=self.subprotocols)
+        except Exception:
+            pool.failures += 1
+            backoff = min(self.max_backoff, self.min_backoff * 2 ** (pool.failures - 1))
+            pool.retry_at = time.monotonic() + backoff
+            raise
+        pool.failures = 0
+        pool.retry_at = 0.0
+        return connection
+
+    async def _is_healthy(self, connection) -> bool:
+        try:
+            pong_waiter = await connection.ping()
+            await asyncio.wait_for(pong_waiter, self.health_check_timeout)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _is_open(connection) -> bool:
+        return getattr(connection, "open", True)
+
+    @staticmethod
+    async def _close(connection) -> None:
+        try:
+            await connection.close()
+        except Exception:
+            pass
+
+    async def reset(self) -> None:
+        """
+        Closes every idle connection and retires the ones in use.
+
+        Called when the loaded model changes, so the next requests connect to the
+        new route (and services that load the model per connection pick it up).
+        """
+        self._generation += 1
+        for pool in self._routes.values():
+            pool.failures = 0
+            pool.retry_at = 0.0
+            while pool.idle:
+                connection, _, _ = pool.idle.pop()
+                await self._close(connection)
+
+    async def close(self) -> None:
+        """
+        Closes every pooled connection.
+        """
+        await self.reset()
+        self._routes.clear()
@@ -0,0 +1,154 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Rough size of a journaled log on disk, used to turn the disk budget into rows.
+ROW_BYTES = 128
+
+
+class MemoryLogJournal:
+    def __init__(self, max_rows: int = 10000):
+        """
+        Initializes a bounded in-memory journal of inference logs, lost on restart.
+
+        Args:
+            max_rows (int): Logs kept. The oldest logs are dropped beyond that.
+        """
+        self.max_rows = max_rows
+        self.dropped = 0
+        self._rows: Deque[Tuple[int, Dict]] = deque()
+        self._next_seq = 1
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def append(self, row: Dict) -> None:
+        with self._lock:
+            self._rows.append((self._next_seq, row))
+            self._next_seq += 1
+            excess = len(self._rows) - self.max_rows
+            for _ in range(max(0, excess)):
+                self._rows.popleft()
+            self._dropped(excess)
+
+    def read(self, limit: int) -> List[Tuple[int, Dict]]:
+        with self._lock:
+            return [self._rows[index] for index in range(min(limit, len(self._rows)))]
+
+    def acknowledge(self, seq: int) -> None:
+        with self._lock:
+            while self._rows and self._rows[0][0] <= seq:
+                self._rows.popleft()
+
+    def close(self) -> None:
+        pass
+
+    def _dropped(self, excess: int) -> None:
+        if excess > 0:
+            self.dropped += excess
+            print(f"Buffer de logs de inferência cheio, {excess} logs descartados.")
+
+
+class InferenceLogJournal(MemoryLogJournal):
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        """
+        Initializes an append-only journal of inference logs in a local SQLite file.
+
+        The file is in WAL mode with synchronous=NORMAL, so an append is a page write in
+        the OS cache that survives a crash of the process, without waiting for the disk.
+        Logs stay in the journal until they are acknowledged, so nothing is lost while
+        the database is unreachable or across restarts.
+
+        Args:
+            path (str): The journal file, created with its directory if missing.
+            max_bytes (Optional[int]): Disk budget of the journal. The oldest logs are
+                dropped beyond it. Defaults to the INFERENCE_JOURNAL_MAX_MB environment
+                variable, or 64 MB.
+        """
+        if max_bytes is None:
+            max_bytes = int(
+                float(os.getenv("INFERENCE_JOURNAL_MAX_MB", "64")) * 1024 * 1024
+            )
+        super().__init__(max_rows=max(1, max_bytes // ROW_BYTES))
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        # Truncate the write-ahead log back to 4 MB after each checkpoint.
+        self._connection.execute("PRAGMA journal_size_limit=4194304")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS journal (seq INTEGER PRIMARY KEY, row TEXT NOT NULL)"
+        )
+        self._pending = self._connection.execute(
+            "SELECT count(*) FROM journal"
+        ).fetchone()[0]
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def append(self, row: Dict) -> None:
+        """
+        Stores a log. Takes microseconds and never touches the network.
+
+        Args:
+            row (Dict): The log, with JSON serializable values besides `created_at`.
+        """
+        data = json.dumps({**row, "created_at": row["created_at"].isoformat()})
+        with self._lock:
+            self._connection.execute("INSERT INTO journal (row) VALUES (?)", (data,))
+            self._pending += 1
+            excess = self._pending - self.max_rows
+            if excess > 0:
+                self._pending -= self._connection.execute(
+                    "DELETE FROM journal WHERE seq IN "
+                    "(SELECT seq FROM journal ORDER BY seq LIMIT ?)",
+                    (excess,),
+                ).rowcount
+            self._dropped(excess)
+
+    def read(self, limit: int) -> List[Tuple[int, Dict]]:
+        """
+        Returns the oldest logs, without removing them.
+
+        Args:
+            limit (int): Maximum number of logs.
+
+        Returns:
+            List[Tuple[int, Dict]]: The sequence number and values of each log.
+        """
+        with self._lock:
+            entries = self._connection.execute(
+                "SELECT seq, row FROM journal ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+        rows = []
+        for seq, data in entries:
+            row = json.loads(data)
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+            rows.append((seq, row))
+        return rows
+
+    def acknowledge(self, seq: int) -> None:
+        """
+        Removes every log up to a sequence number, once they are safely written.
+
+        Args:
+            seq (int): The sequence number of the last written log.
+        """
+        with self._lock:
+            self._pending -= self._connection.execute(
+                "DELETE FROM journal WHERE seq <= ?", (seq,)
+            ).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
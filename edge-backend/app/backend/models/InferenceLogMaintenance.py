@@ -0,0 +1,275 @@
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.backend.models.PipelineMetrics import PipelineMetrics
+from app.sql_app import crud, maintenance, models
+
+
+class InferenceLogMaintenance:
+    def __init__(
+        self,
+        engine: Engine,
+        retention_days: Optional[int] = None,
+        rollup_retention_days: Optional[int] = None,
+        archive_dir: Optional[str] = None,
+        interval: Optional[float] = None,
+        rollup_delay: float = 120.0,
+        rollup_chunk: timedelta = timedelta(hours=1),
+        partitions_ahead: int = 2,
+        legacy_batch: int = 5000,
+        metrics: Optional[PipelineMetrics] = None,
+    ):
+        """
+        Initializes the background job that keeps the inference log storage bounded.
+
+        Every run creates the daily partitions of the next days, writes the per-minute
+        rollups of the minutes closed since the last run and removes the raw logs past
+        their retention. Raw logs are never removed before being rolled up, so the
+        aggregates outlive them. Logs left in the old free text table are first moved
+        to the new one, so they are rolled up and expire like any other.
+
+        Args:
+            engine (Engine): The synchronous database engine.
+            retention_days (Optional[int]): Days of raw logs kept. Defaults to the
+                INFERENCE_LOG_RETENTION_DAYS environment variable, or 30.
+            rollup_retention_days (Optional[int]): Days of rollups kept. Defaults to the
+                INFERENCE_ROLLUP_RETENTION_DAYS environment variable, or 400.
+            archive_dir (Optional[str]): Where expired raw logs are archived as compressed
+                CSV, one file per day. Defaults to the INFERENCE_LOG_ARCHIVE_DIR environment
+                variable; expired logs are discarded when not set.
+            interval (Optional[float]): Seconds between runs. Defaults to the
+                INFERENCE_LOG_MAINTENANCE_INTERVAL environment variable, or 60.
+            rollup_delay (float): Seconds a minute stays open to buffered writes before
+                being rolled up.
+            rollup_chunk (timedelta): Longest time range rolled up in one transaction.
+            partitions_ahead (int): Days of partitions created in advance.
+            legacy_batch (int): Old logs moved per transaction.
+            metrics (Optional[PipelineMetrics]): Where run durations are recorded.
+        """
+        if retention_days is None:
+            retention_days = int(os.getenv("INFERENCE_LOG_RETENTION_DAYS", "30"))
+        if rollup_retention_days is None:
+            rollup_retention_days = int(
+                os.getenv("INFERENCE_ROLLUP_RETENTION_DAYS", "400")
+            )
+        if archive_dir is None:
+            archive_dir = os.getenv("INFERENCE_LOG_ARCHIVE_DIR") or None
+        if interval is None:
+            interval = float(os.getenv("INFERENCE_LOG_MAINTENANCE_INTERVAL", "60"))
+        self.engine = engine
+        self.retention = timedelta(days=max(1, retention_days))
+        self.rollup_retention = timedelta(days=max(1, rollup_retention_days))
+        self.archive_dir = archive_dir
+        self.interval = interval
+        self.rollup_delay = timedelta(seconds=rollup_delay)
+        self.rollup_chunk = rollup_chunk
+        self.partitions_ahead = partitions_ahead
+        self.legacy_batch = max(1, legacy_batch)
+        self.metrics = (
+            metrics if metrics is not None else PipelineMetrics(enabled=False)
+        )
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Starts running the maintenance in a background thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stops the background thread, letting a run in progress finish.
+
+        Args:
+            timeout (float): Maximum time to wait for the thread, in seconds.
+        """
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join(timeout)
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict:
+        """
+        Runs every maintenance step once.
+
+        Args:
+            now (Optional[datetime]): The current time. Defaults to the clock.
+
+        Returns:
+            Dict: The partitions created, old logs moved, rollup rows written and days of
+                raw logs removed.
+        """
+        now = maintenance.as_utc(now or datetime.now(timezone.utc))
+        with self.metrics.time("db_maintenance"):
+            with self.engine.begin() as connection:
+                created = maintenance.ensure_partitions(
+                    connection,
+                    now.date(),
+                    now.date() + timedelta(days=self.partitions_ahead),
+                )
+            moved = self.move_legacy_logs(now)
+            rollups = self.rollup(now)
+            removed = self.enforce_retention(now)
+        return {
+            "partitions_created": created,
+            "legacy_logs_moved": moved,
+            "rollup_rows": rollups,
+            "days_removed": removed,
+        }
+
+    def move_legacy_logs(self, now: datetime) -> int:
+        """
+        Moves the logs of the old free text table to the new one, one batch per transaction.
+
+        Class names go through the class lookup table and the model, which the old table
+        did not record, is `crud.UNKNOWN_MODEL`. Each batch rewinds the rollup watermark,
+        so its minutes are rolled up again. Moved rows are deleted from the old table,
+        which is dropped once empty; rows without a class, a time or a numeric score stay
+        there.
+
+        Args:
+            now (datetime): The current time. Days within the raw log retention get
+                their partitions; older logs only need to last until they are rolled up.
+
+        Returns:
+            int: The number of logs moved.
+        """
+        with self.engine.connect() as connection:
+            if not maintenance.has_legacy_logs(connection):
+                return 0
+            previous_id = maintenance.last_legacy_log_id(connection)
+        with Session(self.engine) as db:
+            model_id = crud.get_lookup_ids(
+                db, models.ModeloInferencia, [crud.UNKNOWN_MODEL]
+            )[crud.UNKNOWN_MODEL]
+        first_kept_day = (now - self.retention).date()
+        after_id, moved = 0, 0
+        while not self._stop.is_set():
+            with self.engine.connect() as connection:
+                rows = maintenance.read_legacy_logs(
+                    connection, after_id, self.legacy_batch
+                )
+            if not rows:
+                break
+            after_id = rows[-1].id
+            parsed = {row.id: maintenance.parse_legacy_log(row) for row in rows}
+            parsed = {
+                legacy_id: log for legacy_id, log in parsed.items() if log is not None
+            }
+            if not parsed:
+                continue
+            with Session(self.engine) as db:
+                class_ids = crud.get_lookup_ids(
+                    db, models.ClasseInferencia, {log[1] for log in parsed.values()}
+                )
+            logs = []
+            for created_at, class_name, score in parsed.values():
+                previous_id = maintenance.legacy_log_id(created_at, previous_id)
+                logs.append(
+                    {
+                        "created_at": created_at,
+                        "id": previous_id,
+                        "class_id": class_ids[class_name],
+                        "score": score,
+                        "model_id": model_id,
+                        "camera_id": 0,
+                    }
+                )
+            oldest = min(log["created_at"] for log in logs)
+            newest = max(log["created_at"] for log in logs)
+            with self.engine.begin() as connection:
+                if newest.date() >= first_kept_day:
+                    maintenance.ensure_partitions(
+                        connection, max(oldest.date(), first_kept_day), newest.date()
+                    )
+                maintenance.move_legacy_logs(connection, logs, list(parsed))
+                maintenance.rewind_watermark(
+                    connection, maintenance.ROLLUP_TASK, oldest
+                )
+            moved += len(logs)
+        if self._stop.is_set():
+            return moved
+        with self.engine.begin() as connection:
+            dropped = maintenance.drop_legacy_logs(connection)
+        if dropped:
+            print(
+                f"Logs de inferência antigos migrados, {maintenance.LEGACY_TABLE} removida."
+            )
+        elif moved:
+            print(
+                f"Logs de inferência antigos migrados; os sem classe ou pontuação válida "
+                f"continuam em {maintenance.LEGACY_TABLE}."
+            )
+        return moved
+
+    def rollup(self, now: datetime) -> int:
+        """
+        Rolls up the minutes closed since the last run, one chunk per transaction.
+
+        Args:
+            now (datetime): The current time.
+
+        Returns:
+            int: The number of rollup rows written.
+        """
+        end = maintenance.floor_minute(now - self.rollup_delay)
+        with self.engine.connect() as connection:
+            start = maintenance.get_watermark(connection, maintenance.ROLLUP_TASK)
+            if start is None:
+                oldest = maintenance.oldest_log_time(connection)
+                if oldest is None:
+                    return 0
+                start = maintenance.floor_minute(oldest)
+        written = 0
+        while start < end and not self._stop.is_set():
+            chunk_end = min(start + self.rollup_chunk, end)
+            with self.engine.begin() as connection:
+                written += maintenance.rollup_minutes(connection, start, chunk_end)
+                maintenance.set_watermark(
+                    connection, maintenance.ROLLUP_TASK, chunk_end
+                )
+            start = chunk_end
+        return written
+
+    def enforce_retention(self, now: datetime) -> list:
+        """
+        Removes the raw logs and rollups past their retention.
+
+        Raw logs of days not fully rolled up yet are kept.
+
+        Args:
+            now (datetime): The current time.
+
+        Returns:
+            list: The days of raw logs removed.
+        """
+        with self.engine.begin() as connection:
+            watermark = maintenance.get_watermark(connection, maintenance.ROLLUP_TASK)
+            removed = []
+            if watermark is not None:
+                cutoff = min(now - self.retention, watermark)
+                removed = maintenance.drop_logs_before(
+                    connection, cutoff.date(), self.archive_dir
+                )
+            maintenance.drop_rollups_before(connection, now - self.rollup_retention)
+        if removed:
+            print(f"Logs de inferência removidos: {', '.join(map(str, removed))}")
+        return removed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Erro na manutenção dos logs de inferência: {e}")
+            self._stop.wait(self.interval)
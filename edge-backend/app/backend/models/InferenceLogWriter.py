@@ -0,0 +1,248 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.backend.models.InferenceLogJournal import MemoryLogJournal
+from app.backend.models.PipelineMetrics import PipelineMetrics
+from app.sql_app import crud, maintenance, models
+
+# Logs older than this when written may belong to minutes already rolled up.
+LATE_LOG_AGE = timedelta(minutes=1)
+
+
+class InferenceLogWriter:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[float] = None,
+        max_buffer: int = 10000,
+        use_copy: Optional[bool] = None,
+        camera_id: Optional[int] = None,
+        journal: Optional[MemoryLogJournal] = None,
+        max_retry_delay: float = 30.0,
+        metrics: Optional[PipelineMetrics] = None,
+    ):
+        """
+        Initializes a buffered writer of inference logs.
+
+        Results are stamped and appended to a journal when they are added. A background
+        thread writes them in a single transaction when `batch_size` rows are waiting or
+        `flush_interval_ms` after the oldest waiting row, whichever comes first, so the
+        database commits once per batch instead of once per result. While the database is
+        unreachable the rows stay in the journal and are written in bulk once it is back.
+        Rows keep the id given when they were added and are inserted only if absent, so a
+        batch written again after a crash is not duplicated.
+
+        Args:
+            session_factory (Callable[[], Session]): Creates the session used by each flush.
+            batch_size (Optional[int]): Rows that trigger a flush. Defaults to the
+                INFERENCE_LOG_BATCH_SIZE environment variable, or 100.
+            flush_interval_ms (Optional[float]): Maximum time a row waits before being
+                written. Defaults to the INFERENCE_LOG_FLUSH_MS environment variable, or 1000.
+            max_buffer (int): Rows kept while the database is unavailable, when no journal
+                is given. The oldest rows are dropped beyond that.
+            use_copy (Optional[bool]): Write with COPY instead of a multi-row INSERT.
+                Defaults to True on PostgreSQL.
+            camera_id (Optional[int]): Camera stored with every log, between 0 and 255.
+                Defaults to the CAMERA_ID environment variable, or 0.
+            journal (Optional[MemoryLogJournal]): Where rows wait to be written, e.g. a
+                durable `InferenceLogJournal`. Defaults to a `MemoryLogJournal` of
+                `max_buffer` rows.
+            max_retry_delay (float): Upper bound of the delay between write attempts while
+                the database is unavailable, in seconds.
+            metrics (Optional[PipelineMetrics]): Where flush durations are recorded.
+        """
+        if batch_size is None:
+            batch_size = int(os.getenv("INFERENCE_LOG_BATCH_SIZE", "100"))
+        if flush_interval_ms is None:
+            flush_interval_ms = float(os.getenv("INFERENCE_LOG_FLUSH_MS", "1000"))
+        if camera_id is None:
+            camera_id = int(os.getenv("CAMERA_ID", "0"))
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000
+        self.use_copy = use_copy
+        self.camera_id = camera_id
+        self.journal = journal if journal is not None else MemoryLogJournal(max_buffer)
+        self.max_retry_delay = max_retry_delay
+        self.metrics = (
+            metrics if metrics is not None else PipelineMetrics(enabled=False)
+        )
+        # Rows left by a previous run are due at once.
+        self._oldest = time.monotonic() - self.flush_interval
+        self._condition = threading.Condition()
+        self._drain_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._class_ids: Dict[str, int] = {}
+        self._model_ids: Dict[str, int] = {}
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns the number of rows waiting to be written.
+        """
+        return self.journal.pending
+
+    @property
+    def dropped(self) -> int:
+        """
+        Returns the number of rows dropped because the journal was full.
+        """
+        return self.journal.dropped
+
+    def start(self) -> None:
+        """
+        Starts the background thread, which first writes the rows left by a previous run.
+        """
+        with self._condition:
+            if self._thread is None:
+                self._closing = False
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def add(self, inference: dict, model_name: Optional[str] = None) -> None:
+        """
+        Journals the log of an inference result. Never touches the database.
+
+        The log gets its id here, so it keeps it if a write fails and is retried.
+
+        Args:
+            inference (dict): Result with "classification" and "confidence-score".
+            model_name (Optional[str]): The model that made the prediction.
+        """
+        row = {
+            "created_at": datetime.now(timezone.utc),
+            "id": crud.next_inference_log_id(self.camera_id),
+            "class_name": inference["classification"],
+            "score": float(inference["confidence-score"]),
+            "model_name": model_name or crud.UNKNOWN_MODEL,
+            "camera_id": self.camera_id,
+        }
+        self.start()
+        with self._condition:
+            if self.journal.pending == 0:
+                self._oldest = time.monotonic()
+            self.journal.append(row)
+            if self.journal.pending >= self.batch_size:
+                self._condition.notify()
+
+    def flush(self) -> None:
+        """
+        Writes every journaled row now, in the calling thread.
+        """
+        self._drain()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Stops the background thread after writing every journaled row it can, then closes
+        the journal, which checkpoints its write-ahead log.
+
+        Args:
+            timeout (float): Maximum time to wait for the final flush, in seconds.
+        """
+        with self._condition:
+            thread, self._thread = self._thread, None
+            self._closing = True
+            self._condition.notify()
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                # Still writing; the rows stay journaled and are written on the next start.
+                return
+        self.journal.close()
+
+    def _run(self) -> None:
+        retry_delay = self.flush_interval
+        while True:
+            with self._condition:
+                while not self._closing and not self._due():
+                    self._condition.wait(self._time_to_flush())
+                closing = self._closing
+            try:
+                self._drain()
+                retry_delay = self.flush_interval
+            except Exception as e:
+                print(f"Erro ao gravar {self.journal.pending} logs de inferência: {e}")
+                if closing:
+                    return
+                with self._condition:
+                    self._condition.wait(retry_delay)
+                retry_delay = min(max(retry_delay, 0.01) * 2, self.max_retry_delay)
+                continue
+            if closing:
+                return
+
+    def _due(self) -> bool:
+        pending = self.journal.pending
+        if not pending:
+            return False
+        return (
+            pending >= self.batch_size
+            or time.monotonic() - self._oldest >= self.flush_interval
+        )
+
+    def _time_to_flush(self) -> Optional[float]:
+        if not self.journal.pending:
+            return None
+        return max(0.0, self._oldest + self.flush_interval - time.monotonic())
+
+    def _drain(self) -> None:
+        """
+        Writes the journaled rows in bulk, removing each batch once it is committed.
+        """
+        with self._drain_lock:
+            while True:
+                entries = self.journal.read(self.batch_size * 10)
+                if not entries:
+                    return
+                self._write([row for _, row in entries])
+                with self._condition:
+                    self.journal.acknowledge(entries[-1][0])
+                    self._oldest = time.monotonic()
+
+    def _write(self, rows: List[Dict]) -> None:
+        with self.metrics.time("db_flush"):
+            with self.session_factory() as db:
+                use_copy = self.use_copy
+                if use_copy is None:
+                    use_copy = db.get_bind().dialect.name == "postgresql"
+                rows = self._resolve_ids(db, rows)
+                if use_copy:
+                    crud.copy_inference_logs(db, rows)
+                else:
+                    crud.create_inference_logs(db, rows)
+                oldest = min(row["created_at"] for row in rows)
+                if oldest < datetime.now(timezone.utc) - LATE_LOG_AGE:
+                    maintenance.rewind_watermark(
+                        db.connection(), maintenance.ROLLUP_TASK, oldest
+                    )
+                    db.commit()
+
+    def _resolve_ids(self, db: Session, rows: List[Dict]) -> List[Dict]:
+        """
+        Replaces the class and model names of the rows by their lookup table ids.
+        """
+        for cache, table, key in (
+            (self._class_ids, models.ClasseInferencia, "class_name"),
+            (self._model_ids, models.ModeloInferencia, "model_name"),
+        ):
+            missing = {row[key] for row in rows} - cache.keys()
+            if missing:
+                cache.update(crud.get_lookup_ids(db, table, missing))
+        return [
+            {
+                "created_at": row["created_at"],
+                "id": row["id"],
+                "class_id": self._class_ids[row["class_name"]],
+                "score": row["score"],
+                "model_id": self._model_ids[row["model_name"]],
+                "camera_id": row["camera_id"],
+            }
+            for row in rows
+        ]
@@ -0,0 +1,176 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from app.backend.models.PipelineMetrics import PipelineMetrics
+
+_STOP = object()
+
+
+class InferenceScheduler:
+    def __init__(
+        self,
+        prepare: Callable[[], Awaitable[Any]],
+        infer: Callable[[Any], Awaitable[Any]],
+        publish: Callable[[Any], Awaitable[None]],
+        target_fps: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        metrics: Optional[PipelineMetrics] = None,
+        report_interval: float = 10.0,
+    ):
+        """
+        Initializes a pipelined scheduler for continuous inference.
+
+        Each frame goes through three stages, prepare, infer and publish, each running
+        in its own task and handing frames to the next one through a one-slot queue.
+        Preparing frame N+1, running the inference of frame N and publishing frame N-1
+        therefore overlap, while frames still leave every stage in order.
+
+        Args:
+            prepare (Callable[[], Awaitable[Any]]): Returns the next frame to infer, or
+                None when there is no new frame yet.
+            infer (Callable[[Any], Awaitable[Any]]): Runs the inference of a prepared frame.
+            publish (Callable[[Any], Awaitable[None]]): Saves and broadcasts a result.
+            target_fps (Optional[float]): Frames started per second. Zero runs as fast
+                as the pipeline allows. Defaults to the INFERENCE_TARGET_FPS environment
+                variable, or 0.
+            max_in_flight (Optional[int]): Maximum frames between prepare and the end of
+                publish. Defaults to the INFERENCE_MAX_IN_FLIGHT environment variable, or 3.
+            metrics (Optional[PipelineMetrics]): Where the end-to-end latency, failures
+                and late frames are recorded.
+            report_interval (float): Seconds between checks of the achieved rate.
+        """
+        if target_fps is None:
+            target_fps = float(os.getenv("INFERENCE_TARGET_FPS", "0"))
+        if max_in_flight is None:
+            max_in_flight = int(os.getenv("INFERENCE_MAX_IN_FLIGHT", "3"))
+        self.prepare = prepare
+        self.infer = infer
+        self.publish = publish
+        self.target_fps = target_fps
+        self.period = 1 / target_fps if target_fps > 0 else 0.0
+        self.max_in_flight = max(1, max_in_flight)
+        self.metrics = (
+            metrics if metrics is not None else PipelineMetrics(enabled=False)
+        )
+        self.report_interval = report_interval
+        self.completed = 0
+        self.missed = 0
+
+    async def run(self, running: Callable[[], bool] = lambda: True) -> None:
+        """
+        Runs the pipeline until `running` returns False or the task is cancelled.
+
+        Once stopped, frames already in flight are still published.
+
+        Args:
+            running (Callable[[], bool]): Checked before each new frame is started.
+        """
+        slots = asyncio.Semaphore(self.max_in_flight)
+        to_infer: asyncio.Queue = asyncio.Queue(maxsize=1)
+        to_publish: asyncio.Queue = asyncio.Queue(maxsize=1)
+        tasks = [
+            asyncio.ensure_future(self._prepare_stage(running, slots, to_infer)),
+            asyncio.ensure_future(self._infer_stage(slots, to_infer, to_publish)),
+            asyncio.ensure_future(self._publish_stage(slots, to_publish)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _prepare_stage(self, running, slots, to_infer) -> None:
+        loop = asyncio.get_running_loop()
+        next_start = loop.time()
+        while running():
+            await slots.acquire()
+            if self.period:
+                next_start = await self._wait_turn(loop, next_start)
+            started = time.perf_counter()
+            try:
+                frame = await self.prepare()
+            except Exception as e:
+                print(f"Erro ao preparar o frame: {e}")
+                self.metrics.count_frame("failed")
+                slots.release()
+                await self._back_off()
+                continue
+            if frame is None:
+                slots.release()
+                continue
+            await to_infer.put((started, frame))
+        await to_infer.put(_STOP)
+
+    async def _wait_turn(self, loop, next_start: float) -> float:
+        """
+        Sleeps until the scheduled start of the next frame and returns the following one.
+
+        A frame starting a whole period or more behind schedule counts as late, and the
+        schedule restarts from now instead of bursting to catch up.
+        """
+        delay = next_start - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif -delay >= self.period:
+            self.missed += 1
+            self.metrics.count_frame("late")
+            next_start = loop.time()
+        return next_start + self.period
+
+    async def _back_off(self) -> None:
+        """
+        Pauses a stage after a failure, so an unreachable service is not retried in a
+        tight loop.
+        """
+        await asyncio.sleep(max(self.period, 0.1))
+
+    async def _infer_stage(self, slots, to_infer, to_publish) -> None:
+        while True:
+            item = await to_infer.get()
+            if item is _STOP:
+                break
+            started, frame = item
+            try:
+                result = await self.infer(frame)
+            except Exception as e:
+                print(f"Erro na inferência: {e}")
+                self.metrics.count_frame("failed")
+                slots.release()
+                await self._back_off()
+                continue
+            await to_publish.put((started, result))
+        await to_publish.put(_STOP)
+
+    async def _publish_stage(self, slots, to_publish) -> None:
+        loop = asyncio.get_running_loop()
+        window_start, window_count = loop.time(), 0
+        while True:
+            item = await to_publish.get()
+            if item is _STOP:
+                break
+            started, result = item
+            try:
+                await self.publish(result)
+                self.completed += 1
+                window_count += 1
+            except Exception as e:
+                print(f"Erro ao publicar o resultado: {e}")
+                self.metrics.count_frame("failed")
+            finally:
+                slots.release()
+                self.metrics.observe("total", time.perf_counter() - started)
+
+            elapsed = loop.time() - window_start
+            if elapsed >= self.report_interval:
+                self._report_rate(window_count / elapsed)
+                window_start, window_count = loop.time(), 0
+
+    def _report_rate(self, achieved_fps: float) -> None:
+        if self.target_fps > 0 and achieved_fps < 0.9 * self.target_fps:
+            print(
+                f"Meta de inferência não atingida: {achieved_fps:.2f} de "
+                f"{self.target_fps:.2f} fps ({self.missed} frames atrasados)"
+            )
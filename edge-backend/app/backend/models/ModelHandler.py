@@ -19,16 +19,21 @@ class ModelHandler(ModelHandlerInterface):
             ModelType.KERAS: f"ws://{self.host_python}:9999/inference",
         }
         self.loaded_model_type = None
+        self.model_version = 0
         self.filter_handler = filter_handler
 
     def load_model_type(self, model_type) -> None:
         """
         Loads the specified model type into the handler.
 
+        Every call bumps `model_version`, so holders of long-lived connections to the
+        inference service know to reconnect.
+
         Args:
             model_type (ModelType): The type of model to be loaded.
         """
         self.loaded_model_type = model_type
+        self.model_version += 1
         self.filter_handler.load_filters()
 
     def get_classification_route(self) -> str:
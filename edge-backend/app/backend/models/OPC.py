@@ -1,7 +1,10 @@
+import asyncio
 import logging
 import os
+import time
+from typing import Any, Dict, Tuple
 
-from asyncua import Client, ua
+from asyncua import Client, Node, ua
 from asyncua.ua import VariantType
 
 OPCUA_URL = os.getenv("HOST_OPC")
@@ -14,7 +17,17 @@ class OPCUA:
     def __init__(self):
         """
         Initializes the OPCUA class and sets up the OPC UA client.
+
+        The session is opened on the first write and kept for the following ones.
+        The client's watchdog reads the server state every `OPC_KEEPALIVE_INTERVAL`
+        seconds, so a dead session is noticed before the next write and reopened.
         """
+        self.keepalive_interval = float(os.getenv("OPC_KEEPALIVE_INTERVAL", "5"))
+        self.min_backoff = 0.5
+        self.max_backoff = 30.0
+        self._failures = 0
+        self._retry_at = 0.0
+        self._lock = asyncio.Lock()
         self.setup_opcua_client()
 
     def setup_opcua_client(self) -> None:
@@ -22,36 +35,100 @@ class OPCUA:
         Sets up the OPC UA client connection settings including the server URL and session timeout.
         """
         self.opcua_url = f"opc.tcp://{OPCUA_URL}:53880/UA/VisionOPC"
-        self.client = Client(self.opcua_url)
+        self.client = Client(self.opcua_url, watchdog_intervall=self.keepalive_interval)
         self.client.session_timeout = 600000
+        self._connected = False
+        self._nodes: Dict[str, Node] = {}
 
-    async def _opcua_write(self, node_id, value, variant_type) -> None:
+    async def _ensure_connected(self) -> None:
         """
-        Asynchronously writes a value to a specified node on the OPC UA server.
-
-        Args:
-            node_id (str): The node identifier.
-            value (Any): The value to be written to the node.
-            variant_type (VariantType): The type of the value as defined in OPC UA.
+        Makes sure a live session is open, reconnecting with exponential backoff.
 
         Raises:
-            ua.uaerrors._auto.BadNodeIdUnknown: If the specified node ID does not exist.
-            Exception: If any other error occurs during the operation.
+            ConnectionError: If the server is still backing off after a failed connection.
+            Exception: Any error raised while connecting.
         """
+        if self._connected:
+            try:
+                await self.client.check_connection()
+                return
+            except Exception as e:
+                logging.warning(f"OPC UA session lost: {e}")
+                await self._reset_session()
+
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise ConnectionError(
+                f"OPC UA server unavailable, retrying in {self._retry_at - now:.1f}s."
+            )
         try:
             await self.client.connect()
-            logging.info(f"Trying to access Node ID: ns=1;s={node_id}")
-            result = ua.DataValue(ua.Variant(value, variant_type))
-            node = self.client.get_node(f"ns=1;s={node_id}")
-            await node.set_value(result)
-        except ua.uaerrors._auto.BadNodeIdUnknown as e:
-            logging.error(
-                f"Node ID not found: {e} - Check the Node ID and Namespace index."
+        except Exception:
+            self._failures += 1
+            backoff = min(
+                self.max_backoff, self.min_backoff * 2 ** (self._failures - 1)
             )
-        except Exception as e:
-            logging.error(f"An error occurred: {e}")
-        finally:
+            self._retry_at = time.monotonic() + backoff
+            await self._reset_session()
+            raise
+        self._failures = 0
+        self._retry_at = 0.0
+        self._connected = True
+
+    async def _reset_session(self) -> None:
+        """
+        Discards the current session and node handles and prepares a fresh client.
+        """
+        try:
             await self.client.disconnect()
+        except Exception:
+            pass
+        self.setup_opcua_client()
+
+    def _get_node(self, node_id: str) -> Node:
+        """
+        Returns the cached node handle for a node ID of namespace 1.
+
+        Args:
+            node_id (str): The node identifier.
+
+        Returns:
+            Node: The node handle bound to the current client.
+        """
+        node = self._nodes.get(node_id)
+        if node is None:
+            node = self.client.get_node(f"ns=1;s={node_id}")
+            self._nodes[node_id] = node
+        return node
+
+    async def _opcua_write(self, values: Dict[str, Tuple[Any, VariantType]]) -> None:
+        """
+        Asynchronously writes several values to the OPC UA server in a single write request.
+
+        Errors are logged instead of raised, so a missing PLC never stops the inference.
+
+        Args:
+            values (Dict[str, Tuple[Any, VariantType]]): The value and OPC UA type to be
+                written to each node ID.
+        """
+        async with self._lock:
+            try:
+                await self._ensure_connected()
+                logging.info(f"Writing Node IDs: {', '.join(values)}")
+                nodes = [self._get_node(node_id) for node_id in values]
+                data = [
+                    ua.DataValue(ua.Variant(value, variant_type))
+                    for value, variant_type in values.values()
+                ]
+                await self.client.write_values(nodes, data)
+            except ua.uaerrors._auto.BadNodeIdUnknown as e:
+                logging.error(
+                    f"Node ID not found: {e} - Check the Node ID and Namespace index."
+                )
+            except Exception as e:
+                logging.error(f"An error occurred: {e}")
+                if self._connected:
+                    await self._reset_session()
 
     async def send_values_OPC(self, predictions) -> None:
         """
@@ -62,5 +139,17 @@ class OPCUA:
         """
         predicted_class = predictions["classification"]
         predicted_accuracy = float(predictions["confidence-score"])
-        await self._opcua_write("classePrevista", predicted_class, VariantType.String)
-        await self._opcua_write("valorPrevisto", predicted_accuracy, VariantType.Float)
+        await self._opcua_write(
+            {
+                "classePrevista": (predicted_class, VariantType.String),
+                "valorPrevisto": (predicted_accuracy, VariantType.Float),
+            }
+        )
+
+    async def close(self) -> None:
+        """
+        Closes the OPC UA session, if one is open.
+        """
+        async with self._lock:
+            if self._connected:
+                await self._reset_session()
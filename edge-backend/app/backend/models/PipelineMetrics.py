@@ -0,0 +1,307 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds, in seconds, shared by every stage histogram.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+FRAME_EVENTS = ("captured", "dropped", "inferred", "reused", "failed", "late")
+SINK_EVENTS = ("enqueued", "delivered", "retried", "dropped", "failed")
+
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initializes a fixed-bucket latency histogram.
+
+        Args:
+            buckets (Tuple[float, ...]): Sorted upper bounds of the buckets, in seconds.
+                Observations above the last bound fall in an implicit +Inf bucket.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def cumulative_counts(self) -> List[int]:
+        """
+        Returns the number of observations less than or equal to each bound, +Inf last.
+        """
+        total = 0
+        cumulative = []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile by linear interpolation inside its bucket.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            Optional[float]: The estimate in seconds, or None without observations.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for upper, count in zip(self.buckets + (self.max,), self.counts):
+            if count and seen + count >= rank:
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.max
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "PipelineMetrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class PipelineMetrics:
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initializes the stage latency histograms and frame counters of the pipeline.
+
+        Recording costs a clock read, a bisect and a few increments under a lock, and
+        nothing is formatted until an endpoint is scraped. When disabled, timers are a
+        shared no-op context manager and counters are not touched.
+
+        Args:
+            enabled (Optional[bool]): Whether to record anything. Defaults to the
+                PIPELINE_METRICS environment variable, or True.
+            buckets (Tuple[float, ...]): Upper bounds of the histogram buckets, in seconds.
+        """
+        if enabled is None:
+            enabled = os.getenv("PIPELINE_METRICS", "true").lower() in ("1", "true")
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._frames: Dict[str, int] = defaultdict(int)
+        self._frames.update((event, 0) for event in FRAME_EVENTS)
+        self._sinks: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._queues: Dict[str, Callable[[], int]] = {}
+
+    def time(self, stage: str):
+        """
+        Returns a context manager that records the duration of its block.
+
+        Args:
+            stage (str): Name of the pipeline stage, e.g. "encode".
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Records one duration of a stage.
+
+        Args:
+            stage (str): Name of the pipeline stage.
+            seconds (float): The duration, in seconds.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count_frame(self, event: str, amount: int = 1) -> None:
+        """
+        Increments a frame counter.
+
+        Args:
+            event (str): One of "captured", "dropped", "inferred", "reused", "failed" or
+                "late" (started behind the target rate).
+            amount (int): How much to add.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._frames[event] += amount
+
+    def count_sink(self, sink: str, event: str) -> None:
+        """
+        Increments a result dispatch counter of a sink.
+
+        Args:
+            sink (str): Name of the sink, e.g. "db".
+            event (str): One of "enqueued", "delivered", "retried", "dropped" or "failed".
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._sinks[(sink, event)] += 1
+
+    def track_queue(self, sink: str, depth: Callable[[], int]) -> None:
+        """
+        Registers a function reporting the queue depth of a sink when scraped.
+
+        Args:
+            sink (str): Name of the sink.
+            depth (Callable[[], int]): Returns the number of results waiting.
+        """
+        self._queues[sink] = depth
+
+    def reset(self) -> None:
+        """
+        Clears every histogram and counter.
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._frames = defaultdict(int, ((event, 0) for event in FRAME_EVENTS))
+            self._sinks.clear()
+
+    def _sink_snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            counters = dict(self._sinks)
+        sinks = {}
+        for sink in sorted(set(self._queues) | {sink for sink, _ in counters}):
+            depth = self._queues.get(sink)
+            sinks[sink] = {
+                event: counters.get((sink, event), 0) for event in SINK_EVENTS
+            }
+            sinks[sink]["queue_depth"] = depth() if depth is not None else 0
+        return sinks
+
+    def _snapshot(self) -> Tuple[Dict[str, Histogram], Dict[str, int]]:
+        with self._lock:
+            histograms = {}
+            for stage, histogram in self._histograms.items():
+                copy = Histogram(histogram.buckets)
+                copy.counts = list(histogram.counts)
+                copy.sum, copy.count, copy.max = (
+                    histogram.sum,
+                    histogram.count,
+                    histogram.max,
+                )
+                histograms[stage] = copy
+            return histograms, dict(self._frames)
+
+    def render_prometheus(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format (version 0.0.4).
+        """
+        histograms, frames = self._snapshot()
+        lines = [
+            "# HELP edge_frames_total Frames handled by the pipeline, by event.",
+            "# TYPE edge_frames_total counter",
+        ]
+        for event, count in sorted(frames.items()):
+            lines.append(f'edge_frames_total{{event="{event}"}} {count}')
+        lines += [
+            "# HELP edge_stage_duration_seconds Duration of each pipeline stage.",
+            "# TYPE edge_stage_duration_seconds histogram",
+        ]
+        for stage, histogram in sorted(histograms.items()):
+            bounds = [repr(bound) for bound in histogram.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, histogram.cumulative_counts()):
+                lines.append(
+                    f'edge_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'edge_stage_duration_seconds_sum{{stage="{stage}"}} {histogram.sum!r}'
+            )
+            lines.append(
+                f'edge_stage_duration_seconds_count{{stage="{stage}"}} {histogram.count}'
+            )
+        sinks = self._sink_snapshot()
+        lines += [
+            "# HELP edge_sink_results_total Results handled by each output sink, by event.",
+            "# TYPE edge_sink_results_total counter",
+        ]
+        for sink, counters in sinks.items():
+            for event in SINK_EVENTS:
+                lines.append(
+                    f'edge_sink_results_total{{sink="{sink}",event="{event}"}} {counters[event]}'
+                )
+        lines += [
+            "# HELP edge_sink_queue_depth Results waiting to be delivered to each sink.",
+            "# TYPE edge_sink_queue_depth gauge",
+        ]
+        for sink, counters in sinks.items():
+            lines.append(
+                f'edge_sink_queue_depth{{sink="{sink}"}} {counters["queue_depth"]}'
+            )
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict:
+        """
+        Returns the counters, per stage latencies in milliseconds and per sink counters.
+
+        Percentiles are estimated from the histogram buckets.
+        """
+        histograms, frames = self._snapshot()
+
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        stages = {
+            stage: {
+                "count": histogram.count,
+                "mean_ms": ms(histogram.sum / histogram.count),
+                "p50_ms": ms(histogram.quantile(0.5)),
+                "p95_ms": ms(histogram.quantile(0.95)),
+                "p99_ms": ms(histogram.quantile(0.99)),
+                "max_ms": ms(histogram.max),
+            }
+            for stage, histogram in sorted(histograms.items())
+        }
+        return {
+            "enabled": self.enabled,
+            "frames": frames,
+            "stages": stages,
+            "sinks": self._sink_snapshot(),
+        }
@@ -1,12 +1,28 @@
 import asyncio
 import json
-from typing import Dict
 import time
-import websockets
+from datetime import datetime, timezone
+from typing import Dict, NamedTuple, Union
+
+from app.backend.models.FrameBuffer import FrameRecord
+from app.backend.models.FrameChangeDetector import FrameChangeDetector
+from app.backend.models.InferenceConnectionPool import (
+    InferenceConnectionPool,
+    InferenceRejectedError,
+)
+from app.backend.models.InferenceScheduler import InferenceScheduler
 from app.backend.models.OPC import OPCUA
+from app.backend.models.ResultDispatcher import ResultDispatcher
 from app.backend.models.StatusHandler import StatusHandler
-from app.routes.Model import model_handler
-from app.utils import filter, inference_log, stream
+from app.backend.services.frame_protocol import FRAME_SUBPROTOCOL, pack_frame
+from app.backend.services.image_processing import read_jpeg_size
+from app.routes.Model import file_handler, model_handler
+from app.utils import filter, image_archiver, inference_log_writer, metrics, stream
+
+
+class PredictionResult(NamedTuple):
+    inference: dict
+    frame: FrameRecord
 
 
 class Predictor:
@@ -15,20 +31,32 @@ class Predictor:
         self.status_handler = StatusHandler()
         self.connected_clients = []
         self.task = None
+        self.connection_pool = InferenceConnectionPool()
+        self.change_detector = FrameChangeDetector()
+        self._last_inference = None
+        self._last_prepared_seq = -1
+        self._model_version = model_handler.model_version
+        self.dispatcher = ResultDispatcher(metrics=metrics)
+        self.dispatcher.add_sink("db", self._log_result, max_queue=256)
+        # Only the latest result matters to the PLC, and OPCUA reconnects by itself.
+        self.dispatcher.add_sink("opc", self._write_opc, max_queue=1)
+        self.dispatcher.add_sink("clients", self._broadcast, max_queue=8)
+        if image_archiver.enabled:
+            self.dispatcher.add_sink("image_archive", self._archive_image, max_queue=4)
 
-    async def infere_now(self, db):
+    async def infere_now(self):
         if self.status_handler.able_to_infere:
-            inference = await self._infere_and_save(db)
+            inference = await self._infere_and_save()
             return inference
         return {"Error": "Process already running continuouslly"}
 
-    async def continuous_inference(self, request, db):
+    async def continuous_inference(self, request):
         data = await request.json()
         self.status_handler.set_status(data)
         if self.status_handler.continuous_status:
             if self.status_handler.check_process_running_status():
                 return {"message": "Process already running"}
-            self.task = asyncio.create_task(self._process_data(db))
+            self.task = asyncio.create_task(self._process_data())
             self.status_handler.set_last_status()
             return {"message": "Process started"}
         self.status_handler.set_last_status()
@@ -37,55 +65,203 @@ class Predictor:
         finally:
             return {"message": "Process stoped"}
 
-    async def _process_data(self, db):
-        while self.status_handler.continuous_status:
-            inference = await self._infere_and_save(db)
-            for client in self.connected_clients:
-                await client.send_json(inference)
-            await asyncio.sleep(0.57) 
+    async def _process_data(self):
+        """
+        Runs continuous inference on a pipelined scheduler until the process is stopped.
+        """
+        self._last_prepared_seq = -1
+        scheduler = InferenceScheduler(
+            prepare=self._prepare_next_frame,
+            infer=lambda prepared: self._infer_frame(prepared, reuse_unchanged=True),
+            publish=self._publish,
+            metrics=metrics,
+        )
+        await scheduler.run(lambda: self.status_handler.continuous_status)
+
+    async def _infere_and_save(self, reuse_unchanged=False):
+        """
+        Runs an inference on the latest frame and dispatches the result to the sinks.
+
+        Args:
+            reuse_unchanged (bool): Reuse the previous result instead of running the model
+                when the scene did not change since the last real inference.
+
+        Returns:
+            dict: The result, with "reused" telling whether it came from a previous inference.
+        """
+        try:
+            with metrics.time("total"):
+                prepared = await asyncio.to_thread(self._prepare_frame)
+                result = await self._infer_frame(prepared, reuse_unchanged)
+                await self._publish(result)
+        except Exception:
+            metrics.count_frame("failed")
+            raise
+        return result.inference
+
+    async def _prepare_next_frame(self):
+        """
+        Prepares the first frame captured after the last prepared one.
+
+        Returns:
+            Optional[tuple]: The frame and its change signature, or None if no new frame
+            arrived in time.
+        """
+        prepared = await asyncio.to_thread(self._prepare_frame, self._last_prepared_seq)
+        if prepared is not None:
+            self._last_prepared_seq = prepared[0].seq
+        return prepared
+
+    def _prepare_frame(self, after_seq=None):
+        """
+        Encodes the prediction image of the latest frame and computes its change signature.
+
+        Runs in a worker thread, so the event loop keeps serving inference and I/O.
+
+        Args:
+            after_seq (Optional[int]): Wait for a frame newer than this sequence number.
+
+        Returns:
+            Optional[tuple]: The frame and its signature, or None if the wait timed out.
+        """
+        if (
+            after_seq is not None
+            and stream.frame_buffer.wait_for_frame(after_seq) is None
+        ):
+            return None
+        with metrics.time("prepare"):
+            frame = stream.get_frame_jpeg()
+        with metrics.time("change_detection"):
+            signature = self.change_detector.signature(frame.jpeg)
+        return frame, signature
+
+    async def _infer_frame(self, prepared, reuse_unchanged=False):
+        """
+        Runs the model on a prepared frame, or reuses the previous result.
+
+        Args:
+            prepared (tuple): The frame and signature returned by `_prepare_frame`.
+            reuse_unchanged (bool): Reuse the previous result when the scene did not change.
+
+        Returns:
+            PredictionResult: The result, with "reused" telling whether it came from a
+            previous inference, and the frame.
+        """
+        await self._sync_model_version()
+        frame, signature = prepared
+        if (
+            reuse_unchanged
+            and self._last_inference is not None
+            and self.change_detector.is_unchanged(signature)
+        ):
+            metrics.count_frame("reused")
+            return PredictionResult({**self._last_inference, "reused": True}, frame)
+        inference = await self._execute_inferece(frame)
+        self.change_detector.remember(signature)
+        self._last_inference = inference
+        metrics.count_frame("inferred")
+        return PredictionResult({**inference, "reused": False}, frame)
+
+    async def _publish(self, result: PredictionResult):
+        """
+        Hands a result to the dispatcher, which delivers it to every sink in the background.
+        """
+        self.dispatcher.dispatch(result)
 
-    async def _infere_and_save(self, db):
-        inference = await self._execute_inferece()
-        await self._save_result(inference, db)
-        return inference
+    async def _log_result(self, result: PredictionResult):
+        # A reused result is the same inference again; logging it would inflate the history.
+        if result.inference["reused"]:
+            return
+        inference_log_writer.add(result.inference, file_handler.model_name)
 
-    async def _execute_inferece(self):
-        async with websockets.connect(
-            model_handler.get_classification_route()
-        ) as API_inference:
-            return await self._get_predictions(API_inference)
+    async def _write_opc(self, result: PredictionResult):
+        with metrics.time("opc_write"):
+            await self.opcua.send_values_OPC(result.inference)
 
-    async def _save_result(self, result, db):
-        inference_log(result, db)
-        await self.opcua.send_values_OPC(result)
+    async def _broadcast(self, result: PredictionResult):
+        for client in list(self.connected_clients):
+            try:
+                await client.send_json(result.inference)
+            except Exception as e:
+                print(f"Erro ao enviar o resultado ao cliente: {e}")
 
-    async def _get_predictions(self, API_inference) -> Dict[str, float]:
+    async def _archive_image(self, result: PredictionResult):
+        if result.inference["reused"]:
+            return
+        captured = time.time() - (time.monotonic() - result.frame.timestamp)
+        with metrics.time("save_image"):
+            await image_archiver.archive(
+                result.frame.jpeg,
+                result.inference,
+                datetime.fromtimestamp(captured, timezone.utc),
+            )
+
+    async def _sync_model_version(self):
+        """
+        Drops pooled connections and the reusable result after a model change.
         """
-        Retrieves predictions for the current video frame from the model inference API.
+        if self._model_version != model_handler.model_version:
+            await self.connection_pool.reset()
+            self.change_detector.reset()
+            self._last_inference = None
+            self._model_version = model_handler.model_version
+
+    async def _execute_inferece(self, frame: FrameRecord):
+        route = model_handler.get_classification_route()
+        async with self.connection_pool.acquire(route) as API_inference:
+            return await self._get_predictions(API_inference, frame)
+
+    async def close(self):
+        await self.dispatcher.close()
+        await self.connection_pool.close()
+        await self.opcua.close()
+
+    async def _get_predictions(
+        self, API_inference, frame: FrameRecord
+    ) -> Dict[str, float]:
+        """
+        Retrieves predictions for a video frame from the model inference API.
 
         Args:
             API_inference (websockets.WebSocketClientProtocol): The WebSocket client connected to the model API.
+            frame (FrameRecord): The encoded prediction frame.
 
         Returns:
             dict: The filtered prediction results.
+
+        Raises:
+            InferenceRejectedError: If the service answered with an error instead of a prediction.
         """
-        
-        await API_inference.send(stream.get_frame())
-        response = await API_inference.recv()
+        with metrics.time("inference"):
+            await API_inference.send(self._frame_message(API_inference, frame))
+            response = await API_inference.recv()
         predictions = json.loads(response)
-        
-        try:
-            async with websockets.connect("ws://saveimage:8000/ws/image") as send_image:
-                await send_image.send(stream.get_frame())
-        except Exception as e:
-            # Optionally, handle or log the exception silently here if needed
-            print("erro ao conectar no websocket")        
-            pass
-        finally:
-            # Perform any necessary cleanup here silently
-            pass
+        if "error" in predictions:
+            raise InferenceRejectedError(
+                predictions.get("detail", predictions["error"])
+            )
         return filter.compare_results(predictions)
-        
+
+    def _frame_message(self, websocket, frame: FrameRecord) -> Union[bytes, str]:
+        """
+        Builds the frame message in the format negotiated on the connection.
+
+        Connections that accepted the binary frame subprotocol receive the JPEG bytes
+        behind a small header; any other peer receives the base64 text it expects.
+
+        Args:
+            websocket (websockets.WebSocketClientProtocol): The connection the frame is sent on.
+            frame (FrameRecord): The encoded prediction frame.
+
+        Returns:
+            Union[bytes, str]: The binary frame message, or the base64 encoded frame.
+        """
+        if websocket.subprotocol != FRAME_SUBPROTOCOL:
+            return stream.frame_to_base64(frame)
+        height, width = read_jpeg_size(frame.jpeg) or (0, 0)
+        timestamp = time.time() - (time.monotonic() - frame.timestamp)
+        return pack_frame(frame.jpeg, frame.seq, timestamp, shape=(height, width, 3))
+
     def add_clients(self, websocket):
         self.connected_clients.append(websocket)
 
@@ -0,0 +1,166 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.backend.models.PipelineMetrics import PipelineMetrics
+
+DROP_POLICIES = ("oldest", "newest")
+
+
+class _Sink:
+    def __init__(
+        self, name, handler, max_queue, retries, retry_delay, max_retry_delay, drop
+    ):
+        self.name = name
+        self.handler = handler
+        self.max_queue = max_queue
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.drop = drop
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue is not None else 0
+
+
+class ResultDispatcher:
+    def __init__(self, metrics: Optional[PipelineMetrics] = None):
+        """
+        Initializes a dispatcher that delivers results to sinks outside the inference loop.
+
+        Every sink has its own bounded queue and consumer task, so a slow sink only
+        delays itself. Dispatching never waits: when a queue is full one result is
+        dropped following the sink's policy.
+
+        Args:
+            metrics (Optional[PipelineMetrics]): Where the queue depth and the delivered,
+                retried, dropped and failed results of each sink are recorded.
+        """
+        self.metrics = (
+            metrics if metrics is not None else PipelineMetrics(enabled=False)
+        )
+        self._sinks: Dict[str, _Sink] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def add_sink(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[None]],
+        max_queue: int = 64,
+        retries: int = 0,
+        retry_delay: float = 0.5,
+        max_retry_delay: float = 5.0,
+        drop: str = "oldest",
+    ) -> None:
+        """
+        Registers a sink.
+
+        Args:
+            name (str): Name of the sink in logs and metrics.
+            handler (Callable[[Any], Awaitable[None]]): Delivers one result.
+            max_queue (int): Results waiting for the sink before dropping starts.
+            retries (int): Extra attempts after a failed delivery.
+            retry_delay (float): Delay before the first retry, doubled on each new one.
+            max_retry_delay (float): Upper bound of the retry delay.
+            drop (str): "oldest" discards the oldest waiting result to make room,
+                "newest" discards the result being dispatched.
+
+        Raises:
+            ValueError: If the drop policy is unknown.
+        """
+        if drop not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop}")
+        sink = _Sink(
+            name,
+            handler,
+            max(1, max_queue),
+            retries,
+            retry_delay,
+            max_retry_delay,
+            drop,
+        )
+        self._sinks[name] = sink
+        self.metrics.track_queue(name, lambda: sink.depth)
+
+    def dispatch(self, result: Any) -> None:
+        """
+        Queues a result for every sink without waiting for any of them.
+
+        Must be called from the event loop.
+
+        Args:
+            result (Any): The result handed to each sink handler.
+        """
+        self._ensure_started()
+        for sink in self._sinks.values():
+            if sink.queue.full():
+                self.metrics.count_sink(sink.name, "dropped")
+                if sink.drop == "newest":
+                    continue
+                sink.queue.get_nowait()
+                sink.queue.task_done()
+            sink.queue.put_nowait(result)
+            self.metrics.count_sink(sink.name, "enqueued")
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {name: sink.depth for name, sink in self._sinks.items()}
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """
+        Waits for the queued results to be delivered, then stops the consumers.
+
+        Args:
+            timeout (float): Maximum time to wait for the queues to drain, in seconds.
+        """
+        sinks = [sink for sink in self._sinks.values() if sink.task is not None]
+        if not sinks:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(sink.queue.join() for sink in sinks)), timeout
+            )
+        except asyncio.TimeoutError:
+            print(f"Resultados descartados no encerramento: {self.queue_depths()}")
+        for sink in sinks:
+            sink.task.cancel()
+        await asyncio.gather(*(sink.task for sink in sinks), return_exceptions=True)
+        for sink in sinks:
+            sink.queue, sink.task = None, None
+        self._loop = None
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        for sink in self._sinks.values():
+            sink.queue = asyncio.Queue(maxsize=sink.max_queue)
+            sink.task = loop.create_task(self._consume(sink))
+
+    async def _consume(self, sink: _Sink) -> None:
+        while True:
+            result = await sink.queue.get()
+            try:
+                await self._deliver(sink, result)
+            finally:
+                sink.queue.task_done()
+
+    async def _deliver(self, sink: _Sink, result: Any) -> None:
+        delay = sink.retry_delay
+        for attempt in range(sink.retries + 1):
+            try:
+                await sink.handler(result)
+                self.metrics.count_sink(sink.name, "delivered")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+            if attempt < sink.retries:
+                self.metrics.count_sink(sink.name, "retried")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, sink.max_retry_delay)
+        print(f"Falha ao entregar o resultado para {sink.name}: {error}")
+        self.metrics.count_sink(sink.name, "failed")
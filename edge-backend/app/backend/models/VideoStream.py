@@ -1,30 +1,84 @@
 import base64
+import os
+from typing import Optional, Tuple, Union
 
 import cv2
 import numpy as np
 
 from app.backend.models.FilterProcessor import FilterProcessor
+from app.backend.models.FrameArtifactCache import FrameArtifactCache
+from app.backend.models.FrameBroadcaster import FrameBroadcaster
+from app.backend.models.FrameBuffer import FrameBuffer, FrameRecord
+from app.backend.models.PipelineMetrics import PipelineMetrics
+from app.backend.services.image_processing import read_jpeg_size
+
+MJPG_FOURCC = cv2.VideoWriter_fourcc(*"MJPG")
 
 
 class Stream:
-    def __init__(self, filter_processor: FilterProcessor):
+    def __init__(
+        self,
+        filter_processor: FilterProcessor,
+        buffer_size: int = 4,
+        source: Optional[Union[int, str]] = None,
+        passthrough: Optional[bool] = None,
+        jpeg_quality: int = 95,
+        metrics: Optional[PipelineMetrics] = None,
+    ):
         """
         Initializes the video stream and sets up the camera for streaming.
+
+        Args:
+            filter_processor (FilterProcessor): Processor used to crop the prediction image.
+            buffer_size (int): Number of slots in the latest-frame ring buffer.
+            source (Optional[Union[int, str]]): Camera index or video file/URL. Defaults to
+                the CAMERA_SOURCE environment variable, or camera 0.
+            passthrough (Optional[bool]): Keep the camera's MJPG bytes instead of decoding
+                every frame. Defaults to the CAMERA_PASSTHROUGH environment variable.
+            jpeg_quality (int): JPEG quality of the encoded prediction image.
+            metrics (Optional[PipelineMetrics]): Where capture and encoding stages are
+                recorded. Defaults to a private instance.
         """
+        if source is None:
+            source = os.getenv("CAMERA_SOURCE", "0")
+            source = int(source) if source.isdigit() else source
+        if passthrough is None:
+            passthrough = os.getenv("CAMERA_PASSTHROUGH", "false").lower() in (
+                "1",
+                "true",
+            )
+        self.source = source
+        self.passthrough = passthrough
         self.status = False
-        self.frame = None
-        self.buffer = None
-        self.predict_image = None
+        self.frame_buffer = FrameBuffer(size=buffer_size)
+        self.broadcaster = FrameBroadcaster(self.generate_frames)
+        self.artifacts = FrameArtifactCache()
+        self.jpeg_quality = jpeg_quality
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
         self.setup_cam()
         self.filter_processor = filter_processor
 
+    @property
+    def frame(self) -> Optional[np.ndarray]:
+        """
+        Returns a copy of the most recently captured frame, or None if nothing was captured yet.
+        """
+        record = self.frame_buffer.latest()
+        return record.pixels() if record is not None else None
+
+    @property
+    def viewer_count(self) -> int:
+        """
+        Returns the number of clients currently watching the preview.
+        """
+        return self.broadcaster.subscriber_count
+
     def run_camera_stream(self) -> None:
         """
-        Runs the camera stream and handles frame generation and any runtime errors.
+        Runs the capture loop and handles any runtime errors.
         """
         try:
-            for frame in self.generate_frames():
-                pass
+            self.capture_frames()
         except RuntimeError:
             print("Erro na câmera, finalizando o stream.")
             self.shutdown_camera()
@@ -32,10 +86,24 @@ class Stream:
     def setup_cam(self) -> None:
         """
         Sets up the camera by initializing the video capture device.
+
+        In passthrough mode the device is asked for MJPG and OpenCV is told not to
+        decode it, so `read()` returns the compressed bytes. If the source does not
+        deliver MJPG the stream falls back to decoded frames.
         """
-        self.camera = cv2.VideoCapture(0)
+        self.camera = cv2.VideoCapture(self.source)
+        if self.passthrough:
+            self.camera.set(cv2.CAP_PROP_FOURCC, MJPG_FOURCC)
         self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
         self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
+        if self.passthrough:
+            if int(self.camera.get(cv2.CAP_PROP_FOURCC)) != MJPG_FOURCC:
+                print("Camera não suporta MJPG, usando frames decodificados.")
+                self.passthrough = False
+                return
+            # V4L2 returns the raw buffer, FFmpeg (recorded files) returns the packet.
+            self.camera.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+            self.camera.set(cv2.CAP_PROP_FORMAT, -1)
 
     def check_camera(self) -> None:
         """
@@ -46,60 +114,102 @@ class Stream:
         if not self.camera.isOpened():
             raise RuntimeError("Could not start camera.")
 
-    def generate_frames(self) -> bytes:
+    def capture_frames(self) -> None:
+        """
+        Reads frames from the camera and publishes them into the ring buffer.
+
+        This is the only place that reads from the capture device. It runs until the
+        camera is shut down or fails repeatedly. Frames are captured whether or not
+        anyone watches the preview, since inference reads them from the buffer.
+
+        Raises:
+            RuntimeError: If the camera cannot be started.
+        """
         self.check_camera()
         self.set_status(True)
         consecutive_errors = 0
 
-        while True:
-            try:
-                success, self.frame = self.camera.read()
-                if not success or self.frame is None:
-                    print("Failed to capture frame or frame is None.")
-                    consecutive_errors += 1
-                    if consecutive_errors > 10:
-                        break
-                    continue
-                consecutive_errors = 0
-                #self.frame = self.filter_processor.apply_black_edges(self.frame)
-                #self.frame = self.filter_processor.apply_filters(self.frame)
-
-                if not isinstance(self.frame, np.ndarray) or self.frame.size == 0:
-                    print(
-                        f"Invalid frame after processing: {type(self.frame)}, size: {self.frame.size}"
-                    )
+        try:
+            while self.status:
+                try:
+                    with self.metrics.time("capture"):
+                        success, frame = self.camera.read()
+                    if not success or frame is None:
+                        print("Failed to capture frame or frame is None.")
+                        self.metrics.count_frame("dropped")
+                        consecutive_errors += 1
+                        if consecutive_errors > 10:
+                            break
+                        continue
+
+                    if not isinstance(frame, np.ndarray) or frame.size == 0:
+                        print(f"Invalid frame captured: {type(frame)}")
+                        self.metrics.count_frame("dropped")
+                        consecutive_errors += 1
+                        if consecutive_errors > 5:
+                            break
+                        continue
+
+                    if self.passthrough and frame.ndim < 3:
+                        self.frame_buffer.publish_encoded(frame.tobytes())
+                    else:
+                        self.frame_buffer.publish(frame)
+                    self.metrics.count_frame("captured")
+                    consecutive_errors = 0
+                except Exception as e:
+                    print(f"Error capturing frame: {e}")
                     consecutive_errors += 1
                     if consecutive_errors > 5:
                         break
-                    continue
+        finally:
+            self.set_status(False)
+
+    def generate_frames(self) -> bytes:
+        """
+        Yields the captured frames as multipart JPEG chunks.
+
+        Frames are read from the ring buffer, so this never touches the capture device.
+        Viewers should consume `broadcaster.frames()`, which runs this generator once
+        and shares every encoded chunk. Frames captured in passthrough mode are sent
+        as delivered by the camera, without a decode/encode round trip.
+
+        Yields:
+            bytes: A multipart chunk containing one JPEG encoded frame.
+        """
+        last_seq = -1
+        consecutive_errors = 0
+
+        while True:
+            record = self.frame_buffer.wait_for_frame(last_seq)
+            if record is None:
+                if not self.status:
+                    break
+                continue
+            last_seq = record.seq
 
-                ret, self.buffer = cv2.imencode(".jpg", self.frame)
-                if not ret or self.buffer is None:
+            if record.jpeg is not None:
+                jpeg = record.jpeg
+            else:
+                ret, buffer = cv2.imencode(".jpg", record.image)
+                if not ret or buffer is None:
                     print("Failed to encode frame to JPEG.")
                     consecutive_errors += 1
                     if consecutive_errors > 5:
                         break
                     continue
-
-                consecutive_errors = 0
-            except Exception as e:
-                print(f"Error processing frame: {e}")
-                consecutive_errors += 1
-                if consecutive_errors > 5:
-                    break
-                continue
+                jpeg = buffer.tobytes()
+            consecutive_errors = 0
 
             yield (
-                b"--frame\r\n"
-                b"Content-Type: image/jpeg\r\n\r\n"
-                + self.buffer.tobytes()
-                + b"\r\n\r\n"
+                b"--frame\r\n" b"Content-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n\r\n"
             )
 
     def shutdown_camera(self) -> None:
         """
-        Shuts down the camera by releasing the video capture device.
+        Stops the capture loop and releases the video capture device.
         """
+        self.set_status(False)
+        self.broadcaster.stop()
         self.camera.release()
 
     def set_status(self, status) -> None:
@@ -120,22 +230,125 @@ class Stream:
         """
         return self.status
 
+    def get_frame_jpeg(
+        self, coordinates: Optional[Tuple[int, ...]] = None
+    ) -> FrameRecord:
+        """
+        Returns the cropped prediction image of the latest frame as JPEG bytes.
+
+        The crop and the JPEG encoding are cached per frame, so every consumer of the
+        same frame shares a single computation of each.
+
+        Args:
+            coordinates (Optional[Tuple[int, ...]]): Crop coordinates. Defaults to the
+                current prediction crop.
+
+        Returns:
+            FrameRecord: The frame sequence number, capture timestamp and JPEG bytes.
+
+        Raises:
+            RuntimeError: If no frame has been captured yet.
+        """
+        if coordinates is None:
+            coordinates = self.filter_processor.get_crop_coordinates()
+        key = ("predict", coordinates, self.jpeg_quality)
+        cached = self.artifacts.peek(self.frame_buffer.latest_seq, key)
+        if cached is not None:
+            return cached
+
+        record = self._latest_record()
+        return self.artifacts.get_or_create(
+            record.seq,
+            key,
+            lambda: FrameRecord(
+                record.seq,
+                record.timestamp,
+                None,
+                self._predict_jpeg(record, coordinates),
+            ),
+        )
+
     def get_frame(self) -> str:
         """
-        Returns the current frame encoded in base64 format.
+        Returns the cropped prediction image of the latest frame, encoded in base64 format.
 
         Returns:
             str: The current frame as a base64 encoded string.
+
+        Raises:
+            RuntimeError: If no frame has been captured yet.
         """
-        array_frame = self.filter_processor.apply_crop_predict_image(self.frame)
-        ret, self.predict_image = cv2.imencode(".jpg", self.frame)
-        return self._convert_frame()
+        return self.frame_to_base64(self.get_frame_jpeg())
 
-    def _convert_frame(self) -> str:
+    def frame_to_base64(self, frame: FrameRecord) -> str:
         """
-        Converts the current frame to base64 format.
+        Returns the base64 text of an encoded frame, computing it at most once per frame.
+
+        Args:
+            frame (FrameRecord): A frame returned by `get_frame_jpeg`.
+
+        Returns:
+            str: The base64 encoded string of the frame.
+        """
+        # Keyed on the record identity, so lookups never hash the JPEG bytes. The cached
+        # pair holds the record, so its id cannot be reused while the entry lives.
+        _, text = self.artifacts.get_or_create(
+            frame.seq,
+            ("base64", id(frame)),
+            lambda: (frame, self._convert_frame(frame.jpeg)),
+        )
+        return text
+
+    def _latest_record(self) -> FrameRecord:
+        record = self.frame_buffer.latest()
+        if record is None:
+            raise RuntimeError("No frame captured yet.")
+        return record
+
+    def _predict_jpeg(self, record: FrameRecord, coordinates: Tuple[int, ...]) -> bytes:
+        """
+        Returns the JPEG bytes of the prediction image of a frame, encoding it at most once.
+
+        Camera bytes captured in passthrough mode are reused as-is when the crop covers
+        exactly the whole frame.
+        """
+        return self.artifacts.get_or_create(
+            record.seq,
+            ("jpeg", coordinates, self.jpeg_quality),
+            lambda: self._encode_predict_image(record, coordinates),
+        )
+
+    def _encode_predict_image(
+        self, record: FrameRecord, coordinates: Tuple[int, ...]
+    ) -> bytes:
+        if record.jpeg is not None:
+            height, width = read_jpeg_size(record.jpeg) or (None, None)
+            if coordinates == (0, 0, width, height):
+                return record.jpeg
+
+        pixels = self.artifacts.get_or_create(record.seq, ("pixels",), record.pixels)
+        cropped = self.artifacts.get_or_create(
+            record.seq,
+            ("crop", coordinates),
+            lambda: self.filter_processor.apply_crop_predict_image(pixels, coordinates),
+        )
+        with self.metrics.time("encode"):
+            ret, buffer = cv2.imencode(
+                ".jpg", cropped, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+            )
+        if not ret or buffer is None:
+            raise RuntimeError("Failed to encode frame to JPEG.")
+        return buffer.tobytes()
+
+    def _convert_frame(self, jpeg: bytes) -> str:
+        """
+        Converts an encoded frame to base64 format.
+
+        Args:
+            jpeg (bytes): The JPEG encoded frame.
 
         Returns:
-            str: The base64 encoded string of the current frame.
+            str: The base64 encoded string of the frame.
         """
-        return base64.b64encode(self.predict_image).decode("utf-8")
\ No newline at end of file
+        with self.metrics.time("base64"):
+            return base64.b64encode(jpeg).decode("utf-8")
@@ -0,0 +1,121 @@
+import struct
+from typing import NamedTuple, Tuple
+
+FRAME_SUBPROTOCOL = "sv-frame.v1"
+FRAME_MAGIC = b"SVFP"
+FRAME_VERSION = 1
+
+CONTENT_JPEG = 1
+CONTENT_RAW = 2
+
+# magic, versão, tipo de conteúdo, tamanho do cabeçalho, id do frame, timestamp,
+# altura, largura, canais, 3 bytes reservados e tamanho do payload
+_HEADER = struct.Struct("<4sBBHQdHHB3xI")
+FRAME_HEADER_SIZE = _HEADER.size
+
+
+class FrameHeader(NamedTuple):
+    """
+    Cabeçalho de um frame no protocolo binário.
+
+    Atributos:<br>
+    - frame_id (int): Identificador sequencial do frame.<br>
+    - timestamp (float): Momento da captura, em segundos desde a época Unix.<br>
+    - content_type (int): CONTENT_JPEG para bytes JPEG ou CONTENT_RAW para pixels RGB/cinza de 8 bits.<br>
+    - height (int): Altura da imagem.<br>
+    - width (int): Largura da imagem.<br>
+    - channels (int): Número de canais da imagem.<br>
+    """
+
+    frame_id: int
+    timestamp: float
+    content_type: int
+    height: int
+    width: int
+    channels: int
+
+
+def pack_frame(
+    payload: bytes,
+    frame_id: int,
+    timestamp: float,
+    content_type: int = CONTENT_JPEG,
+    shape: Tuple[int, ...] = (0, 0, 3),
+) -> bytes:
+    """
+    Monta uma mensagem binária com o cabeçalho do protocolo seguido do payload.
+
+    Args:
+        payload (bytes): Bytes JPEG ou pixels crus da imagem.
+        frame_id (int): Identificador sequencial do frame.
+        timestamp (float): Momento da captura, em segundos desde a época Unix.
+        content_type (int, optional): Tipo do payload. Default é CONTENT_JPEG.
+        shape (Tuple[int, ...], optional): Formato (altura, largura, canais) da imagem. Default é (0, 0, 3).
+
+    Returns:
+        bytes: Mensagem pronta para ser enviada como frame binário do WebSocket.
+
+    Examples:
+        >>> message = pack_frame(b"jpeg", frame_id=7, timestamp=1.5, shape=(2, 3, 3))
+        >>> unpack_frame(message)[0].frame_id
+        7
+    """
+    height, width = shape[:2]
+    channels = shape[2] if len(shape) > 2 else 1
+    header = _HEADER.pack(
+        FRAME_MAGIC,
+        FRAME_VERSION,
+        content_type,
+        FRAME_HEADER_SIZE,
+        frame_id,
+        timestamp,
+        height,
+        width,
+        channels,
+        len(payload),
+    )
+    return header + payload
+
+
+def unpack_frame(message: bytes) -> Tuple[FrameHeader, memoryview]:
+    """
+    Lê uma mensagem binária do protocolo, sem copiar o payload.
+
+    Args:
+        message (bytes): Mensagem recebida do WebSocket.
+
+    Returns:
+        Tuple[FrameHeader, memoryview]: Cabeçalho e payload da mensagem.
+
+    Raises:
+        ValueError: Se a mensagem não pertencer ao protocolo, for de uma versão não suportada ou estiver truncada.
+
+    Examples:
+        >>> header, payload = unpack_frame(pack_frame(b"jpeg", 1, 0.0))
+        >>> bytes(payload)
+        b'jpeg'
+    """
+    if len(message) < FRAME_HEADER_SIZE:
+        raise ValueError("Mensagem menor que o cabeçalho do protocolo.")
+    (
+        magic,
+        version,
+        content_type,
+        header_size,
+        frame_id,
+        timestamp,
+        height,
+        width,
+        channels,
+        payload_length,
+    ) = _HEADER.unpack_from(message)
+    if magic != FRAME_MAGIC:
+        raise ValueError("Mensagem não pertence ao protocolo de frames.")
+    if version != FRAME_VERSION:
+        raise ValueError(f"Versão do protocolo não suportada: {version}.")
+    if len(message) < header_size + payload_length:
+        raise ValueError("Payload truncado.")
+
+    payload = memoryview(message)[header_size : header_size + payload_length]
+    header = FrameHeader(frame_id, timestamp, content_type, height, width, channels)
+    return header, payload
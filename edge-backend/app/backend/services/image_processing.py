@@ -1,9 +1,18 @@
-from typing import Any, Callable, Dict, Tuple
+import inspect
+import threading
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 import cv2
 import numpy as np
 
-from app.backend.models.ImageFilter import FilterType
+from app.backend.models.ImageFilter import FilterSpec, FilterType
+
+SHARPENING_KERNEL = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype=np.float32)
+SHARPENING_KERNEL.flags.writeable = False
+
+# Os objetos CLAHE guardam buffers internos, então cada thread usa os seus.
+_clahe_cache = threading.local()
 
 
 def resize_image(
@@ -39,6 +48,50 @@ def resize_image(
     return resized_img
 
 
+def read_jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Lê as dimensões de uma imagem JPEG a partir do cabeçalho, sem decodificar os pixels.
+
+    Args:
+        data (bytes): Bytes da imagem JPEG.
+
+    Returns:
+        Optional[Tuple[int, int]]: Tupla (altura, largura), ou None se os bytes não forem um JPEG válido.
+
+    Examples:
+        >>> img = cv2.imread('app/tests/resources/images/sample.jpg')
+        >>> data = cv2.imencode('.jpg', img)[1].tobytes()
+        >>> read_jpeg_size(data) == img.shape[:2]
+        True
+    """
+    if data[:2] != b"\xff\xd8":
+        return None
+
+    index = 2
+    size = len(data)
+    while index + 4 <= size:
+        if data[index] != 0xFF:
+            return None
+        marker = data[index + 1]
+        # Bytes de preenchimento e marcadores sem segmento
+        if marker == 0xFF:
+            index += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            index += 2
+            continue
+        # Marcadores SOF (exceto DHT, JPG e DAC) carregam altura e largura
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            if index + 9 > size:
+                return None
+            height = int.from_bytes(data[index + 5 : index + 7], "big")
+            width = int.from_bytes(data[index + 7 : index + 9], "big")
+            return height, width
+        index += 2 + int.from_bytes(data[index + 2 : index + 4], "big")
+
+    return None
+
+
 def apply_crop(
     img: np.ndarray,
     crop_coords: Tuple[int, int, int, int] = (0, 0, 100, 100),
@@ -121,12 +174,7 @@ def apply_sharpening(img: np.ndarray, **kwargs: Any) -> np.ndarray:
         >>> img = cv2.imread('app/tests/resources/images/sample.jpg')
         >>> sharpened_img = apply_sharpening(img)
     """
-    # Define o kernel de sharpening
-    kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype=np.float32)
-
-    # Aplica o kernel à imagem
-    sharpened_img = cv2.filter2D(src=img, ddepth=-1, kernel=kernel)
-    return sharpened_img
+    return cv2.filter2D(src=img, ddepth=-1, kernel=SHARPENING_KERNEL)
 
 
 def apply_brightness(
@@ -151,6 +199,44 @@ def apply_brightness(
     return cv2.convertScaleAbs(img, alpha=1, beta=adjustment)
 
 
+def _get_clahe(clip_limit: float) -> Any:
+    """
+    Retorna o objeto CLAHE da thread atual para o limite de corte, criando-o no primeiro uso.
+
+    Args:
+        clip_limit (float): Limite de corte do CLAHE.
+
+    Returns:
+        cv2.CLAHE: Objeto CLAHE com grade de 8x8.
+    """
+    cache = getattr(_clahe_cache, "objects", None)
+    if cache is None:
+        cache = _clahe_cache.objects = {}
+    clahe = cache.get(clip_limit)
+    if clahe is None:
+        clahe = cache[clip_limit] = cv2.createCLAHE(
+            clipLimit=clip_limit, tileGridSize=(8, 8)
+        )
+    return clahe
+
+
+def _equalize_lightness(img: np.ndarray, clip_limit: float) -> np.ndarray:
+    """
+    Aplica CLAHE ao canal de luminosidade da imagem no espaço LAB.
+
+    Args:
+        img (np.ndarray): Imagem de entrada.
+        clip_limit (float): Limite de corte do CLAHE.
+
+    Returns:
+        np.ndarray: Imagem com a luminosidade equalizada.
+    """
+    lab_img = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
+    l, a, b = cv2.split(lab_img)
+    new_l = _get_clahe(clip_limit).apply(l)
+    return cv2.cvtColor(cv2.merge((new_l, a, b)), cv2.COLOR_LAB2BGR)
+
+
 def apply_contrast(img: np.ndarray, **kwargs: Any) -> np.ndarray:
     """
     Melhora o contraste da imagem usando CLAHE (Contrast Limited Adaptive Histogram Equalization).
@@ -166,11 +252,7 @@ def apply_contrast(img: np.ndarray, **kwargs: Any) -> np.ndarray:
         >>> img = cv2.imread('app/tests/resources/images/sample.jpg')
         >>> contrasted_img = apply_contrast(img)
     """
-    lab_img = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab_img)
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    new_l = clahe.apply(l)
-    return cv2.cvtColor(cv2.merge((new_l, a, b)), cv2.COLOR_LAB2BGR)
+    return _equalize_lightness(img, 3.0)
 
 
 def apply_exposure(
@@ -304,11 +386,7 @@ def apply_histogram_equalization(
         >>> img = cv2.imread('app/tests/resources/images/sample.jpg')
         >>> equalized_img = apply_histogram_equalization(img, clipLimit=2.0)
     """
-    lab_img = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab_img)
-    clahe = cv2.createCLAHE(clipLimit=clipLimit, tileGridSize=(8, 8))
-    new_l = clahe.apply(l)
-    return cv2.cvtColor(cv2.merge((new_l, a, b)), cv2.COLOR_LAB2BGR)
+    return _equalize_lightness(img, clipLimit)
 
 
 def apply_normalization(
@@ -371,6 +449,24 @@ def apply_color_segmentation(
     return result
 
 
+@lru_cache(maxsize=32)
+def _rotation_matrix(h: int, w: int, angle: float) -> np.ndarray:
+    """
+    Calcula a matriz de rotação em torno do centro da imagem, uma vez por formato e ângulo.
+
+    Args:
+        h (int): Altura da imagem.
+        w (int): Largura da imagem.
+        angle (float): Ângulo de rotação em graus.
+
+    Returns:
+        np.ndarray: Matriz afim 2x3, somente leitura.
+    """
+    matrix = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    matrix.flags.writeable = False
+    return matrix
+
+
 def apply_rotation(img: np.ndarray, angle: float = 0, **kwargs: Any) -> np.ndarray:
     """
     Rotaciona a imagem com base no ângulo fornecido.
@@ -388,31 +484,23 @@ def apply_rotation(img: np.ndarray, angle: float = 0, **kwargs: Any) -> np.ndarr
         >>> rotated_img = apply_rotation(img, angle=90)
     """
     (h, w) = img.shape[:2]
-    center = (w // 2, h // 2)
-    rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-    return cv2.warpAffine(img, rotation_matrix, (w, h))
+    return cv2.warpAffine(img, _rotation_matrix(h, w, angle), (w, h))
 
 
-def apply_perspective_distortion(
-    img: np.ndarray, preset: str = "none", intensity: float = 0, **kwargs: Any
-) -> np.ndarray:
+@lru_cache(maxsize=32)
+def _perspective_matrix(h: int, w: int, preset: str, intensity: float) -> np.ndarray:
     """
-    Aplica distorção de perspectiva com base no preset e intensidade fornecidos.
+    Calcula a matriz de perspectiva de um preset, uma vez por formato, preset e intensidade.
 
     Args:
-        img (np.ndarray): Imagem de entrada.
-        preset (str, optional): Tipo de distorção a ser aplicada. Default é "none".
-        intensity (float, optional): Intensidade da distorção. Default é 0.
-        **kwargs: Argumentos adicionais (não utilizados aqui).
+        h (int): Altura da imagem.
+        w (int): Largura da imagem.
+        preset (str): Tipo de distorção a ser aplicada.
+        intensity (float): Intensidade da distorção.
 
     Returns:
-        np.ndarray: Imagem com distorção de perspectiva aplicada.
-
-    Examples:
-        >>> img = cv2.imread('app/tests/resources/images/sample.jpg')
-        >>> distorted_img = apply_perspective_distortion(img, preset='expandTopLeft', intensity=10)
+        np.ndarray: Matriz de perspectiva 3x3, somente leitura.
     """
-    h, w = img.shape[:2]
     basePoints = np.float32([[0, 0], [w, 0], [0, h], [w, h]])
 
     if preset == "expandTopLeft":
@@ -450,8 +538,34 @@ def apply_perspective_distortion(
     else:
         dstPoints = basePoints
 
-    perspective_matrix = cv2.getPerspectiveTransform(basePoints, dstPoints)
-    return cv2.warpPerspective(img, perspective_matrix, (w, h))
+    matrix = cv2.getPerspectiveTransform(basePoints, dstPoints)
+    matrix.flags.writeable = False
+    return matrix
+
+
+def apply_perspective_distortion(
+    img: np.ndarray, preset: str = "none", intensity: float = 0, **kwargs: Any
+) -> np.ndarray:
+    """
+    Aplica distorção de perspectiva com base no preset e intensidade fornecidos.
+
+    Args:
+        img (np.ndarray): Imagem de entrada.
+        preset (str, optional): Tipo de distorção a ser aplicada. Default é "none".
+        intensity (float, optional): Intensidade da distorção. Default é 0.
+        **kwargs: Argumentos adicionais (não utilizados aqui).
+
+    Returns:
+        np.ndarray: Imagem com distorção de perspectiva aplicada.
+
+    Examples:
+        >>> img = cv2.imread('app/tests/resources/images/sample.jpg')
+        >>> distorted_img = apply_perspective_distortion(img, preset='expandTopLeft', intensity=10)
+    """
+    h, w = img.shape[:2]
+    return cv2.warpPerspective(
+        img, _perspective_matrix(h, w, preset, intensity), (w, h)
+    )
 
 
 filter_functions: Dict[FilterType, Callable[[np.ndarray, Any], np.ndarray]] = {
@@ -472,10 +586,71 @@ filter_functions: Dict[FilterType, Callable[[np.ndarray, Any], np.ndarray]] = {
 }
 
 
+def _bind_filter(
+    filter_spec: FilterSpec,
+) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    """
+    Liga a função de um filtro aos seus parâmetros, mantendo só os que a função usa.
+
+    Args:
+        filter_spec (FilterSpec): Especificação do filtro.
+
+    Returns:
+        Optional[Callable[[np.ndarray], np.ndarray]]: Função que recebe só a imagem, ou None se o
+            tipo de filtro não for suportado.
+    """
+    func = filter_functions.get(filter_spec.filter_type)
+    if func is None:
+        return None
+    parameters = inspect.signature(func).parameters
+    kwargs = {
+        name: value
+        for name, value in filter_spec.model_dump(exclude={"filter_type"}).items()
+        if name in parameters
+    }
+    return partial(func, **kwargs) if kwargs else func
+
+
+def compile_filters(
+    filter_specs: Iterable[FilterSpec],
+) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Compila uma receita de filtros em uma função que processa uma imagem.
+
+    Os parâmetros de cada filtro são ligados uma única vez. O kernel de sharpening, os objetos
+    CLAHE e as matrizes de rotação e perspectiva ficam em cache por formato de imagem, então
+    cada frame custa apenas o processamento dos pixels.
+
+    Args:
+        filter_specs (Iterable[FilterSpec]): Especificações dos filtros, na ordem de aplicação.
+
+    Returns:
+        Callable[[np.ndarray], np.ndarray]: Função que redimensiona a imagem e aplica os filtros.
+
+    Examples:
+        >>> from app.backend.models.ImageFilter import FilterType, FilterSpec  # Import necessário
+        >>> img = cv2.imread('app/tests/resources/images/sample.jpg')
+        >>> pipeline = compile_filters([FilterSpec(filter_type=FilterType.blur, ksize=5)])
+        >>> processed_img = pipeline(img)
+    """
+    steps = tuple(step for step in map(_bind_filter, filter_specs) if step is not None)
+
+    def pipeline(img: np.ndarray) -> np.ndarray:
+        img = resize_image(img)
+        for step in steps:
+            img = step(img)
+        return img
+
+    return pipeline
+
+
 def process_image_with_filters(img: np.ndarray, filter_specs: Any) -> np.ndarray:
     """
     Processa uma imagem aplicando uma série de filtros especificados.
 
+    Compila a receita a cada chamada; para aplicar a mesma receita a vários frames, use
+    `compile_filters` uma vez.
+
     Args:
         img (np.ndarray): Imagem de entrada.
         filter_specs (Any): Especificações dos filtros a serem aplicados.
@@ -489,14 +664,4 @@ def process_image_with_filters(img: np.ndarray, filter_specs: Any) -> np.ndarray
         >>> filters = [FilterSpec(filter_type=FilterType.blur, ksize=5)]
         >>> processed_img = process_image_with_filters(img, filters)
     """
-    img = resize_image(img)
-
-    for filter_spec in filter_specs:
-        func = filter_functions.get(
-            filter_spec.filter_type
-        )  # Usando a notação de atributo
-        if func:
-            # Usando model_dump para obter os atributos como dicionário, excluindo filter_type
-            img = func(img, **filter_spec.model_dump(exclude={"filter_type"}))
-
-    return img
+    return compile_filters(filter_specs)(img)
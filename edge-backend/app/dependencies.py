@@ -1,9 +1,21 @@
-from .sql_app.db_manager import SessionLocal
+from fastapi.concurrency import run_in_threadpool
 
+from .sql_app.db_manager import AsyncSessionLocal, SessionLocal
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+async def get_db():
+    """
+    Yields the database session of a request.
+
+    The session is asynchronous when the async engine is available, and synchronous
+    otherwise. `utils.interface_log` accepts both.
+    """
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+        return
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -3,12 +3,18 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routes import Crop, Filter, Model, Predict, Video
-from app.utils import start_system, stop_stream
+from app.routes import Crop, Filter, History, Metrics, Model, Predict, Video
+from app.utils import (
+    inference_log_maintenance,
+    inference_log_writer,
+    start_system,
+    stop_stream,
+)
 
-from .sql_app import models
+from .sql_app import maintenance, models
 from .sql_app.db_manager import engine
 
+maintenance.prepare_inference_log_storage(engine)
 models.Base.metadata.create_all(bind=engine)
 
 
@@ -16,6 +22,9 @@ models.Base.metadata.create_all(bind=engine)
 async def lifespan(app: FastAPI):
     start_system()
     yield
+    await Predict.predictor.close()
+    inference_log_writer.close()
+    inference_log_maintenance.stop()
     stop_stream()
 
 
@@ -33,6 +42,8 @@ app.add_middleware(
 
 app.include_router(Crop.router)
 app.include_router(Filter.router)
+app.include_router(History.router)
+app.include_router(Metrics.router)
 app.include_router(Model.router)
 app.include_router(Predict.router)
 app.include_router(Video.router)
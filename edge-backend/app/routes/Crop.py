@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.backend.models.Crop import CropDataModel, GlobalCropData
 from app.dependencies import get_db
@@ -10,14 +10,14 @@ router = APIRouter(tags=["Crop"])
 
 @router.post("/crop/")
 async def video_crop_definitions(
-    crop_data: CropDataModel, db: Session = Depends(get_db)
+    crop_data: CropDataModel, db: AsyncSession = Depends(get_db)
 ) -> str:
     """
     Handles POST requests to set video cropping coordinates and logs the interaction.
 
     Args:
         crop_data (CropDataModel): The cropping data model containing the coordinates.
-        db (Session): Database session dependency injected by FastAPI.
+        db (AsyncSession): Database session dependency injected by FastAPI.
 
     Returns:
         str: A response string confirming the coordinates.
@@ -26,5 +26,5 @@ async def video_crop_definitions(
         GlobalCropData.set_coordinates(crop_data.model_dump())
     finally:
         response = f"Coordinates: {GlobalCropData.get_coordinates()}"
-        interface_log(response, db)
+        await interface_log(response, db)
     return response
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.backend.models.PredictFilter import FilterDataModel
 from app.dependencies import get_db
@@ -10,14 +10,14 @@ router = APIRouter(tags=["Filter"])
 
 @router.post("/filter/")
 async def change_filter(
-    filter_value: FilterDataModel, db: Session = Depends(get_db)
+    filter_value: FilterDataModel, db: AsyncSession = Depends(get_db)
 ) -> str:
     """
     Handles POST requests to change filter settings and logs the interaction.
 
     Args:
         filter_value (FilterDataModel): The filter settings model containing new settings.
-        db (Session): Database session dependency injected by FastAPI.
+        db (AsyncSession): Database session dependency injected by FastAPI.
 
     Returns:
         str: A response string confirming the new filter settings.
@@ -26,5 +26,5 @@ async def change_filter(
         filter.set_filter(filter_value.model_dump())
     finally:
         response = f"Filtro definido como: {filter.get_filter()}"
-        interface_log(response, db)
+        await interface_log(response, db)
     return response
@@ -0,0 +1,189 @@
+import base64
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Literal, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.dependencies import get_db
+from app.sql_app import crud, maintenance
+from app.utils import run_query
+
+router = APIRouter(tags=["History"])
+
+INTERVALS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+MAX_INTERVALS = 10000
+DEFAULT_REJECT_CLASSES = os.getenv("REJECT_CLASSES", "nok")
+
+
+def _time_range(
+    start: Optional[datetime], end: Optional[datetime], default: timedelta
+) -> Tuple[datetime, datetime]:
+    end = crud.as_utc(end) if end is not None else datetime.now(timezone.utc)
+    start = crud.as_utc(start) if start is not None else end - default
+    if start >= end:
+        raise HTTPException(status_code=422, detail="O início deve ser anterior ao fim")
+    return start, end
+
+
+def _encode_cursor(log: Dict) -> str:
+    value = f"{log['created_at'].isoformat()}|{log['id']}"
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, log_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return crud.as_utc(datetime.fromisoformat(created_at)), int(log_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _cached_response(request: Request, content: Dict, closed: bool) -> Response:
+    """
+    Returns the content with an ETag, or an empty 304 response if the client has it.
+
+    Args:
+        request (Request): The request, whose If-None-Match header is checked.
+        content (Dict): The JSON content.
+        closed (bool): Whether the content can no longer change. Open ranges must be
+            revalidated on every use, which costs a 304 while nothing changed.
+
+    Returns:
+        Response: The JSON response or the 304 response.
+    """
+    body = json.dumps(
+        content, default=datetime.isoformat, separators=(",", ":")
+    ).encode()
+    etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=3600" if closed else "no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _load_aggregates(
+    db: Session, *args, **kwargs
+) -> Tuple[Optional[datetime], List[Dict]]:
+    watermark = maintenance.get_watermark(db.connection(), maintenance.ROLLUP_TASK)
+    return watermark, crud.get_inference_aggregates(db, *args, **kwargs)
+
+
+@router.get("/history/aggregates")
+async def inference_aggregates(
+    request: Request,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: Literal["minute", "hour", "day"] = "hour",
+    camera_id: Optional[int] = None,
+    model_name: Optional[str] = None,
+    reject_classes: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Returns the inferences per class and interval, their confidence and the reject rate.
+
+    Computed from the per-minute rollups, so the cost depends on the range and not on
+    the number of inferences. Minutes not rolled up yet, after "complete_until", are
+    missing.
+
+    Args:
+        request (Request): The request, used for ETag revalidation.
+        start (Optional[datetime]): Start of the range. Defaults to one day before the end.
+        end (Optional[datetime]): End of the range, excluded. Defaults to now.
+        interval (str): Length of each interval, "minute", "hour" or "day".
+        camera_id (Optional[int]): Only inferences of this camera.
+        model_name (Optional[str]): Only inferences of this model.
+        reject_classes (Optional[List[str]]): Classes counted as rejects. Defaults to the
+            REJECT_CLASSES environment variable, comma separated, or "nok".
+        db (AsyncSession): Database session dependency injected by FastAPI.
+
+    Returns:
+        Response: The intervals with inferences, oldest first, under "intervals".
+
+    Raises:
+        HTTPException: If the range is empty or holds too many intervals.
+    """
+    start, end = _time_range(start, end, timedelta(days=1))
+    step = INTERVALS[interval]
+    if (end - start) / step > MAX_INTERVALS:
+        raise HTTPException(status_code=422, detail="Intervalos demais, use um maior")
+    if reject_classes is None:
+        reject_classes = [name for name in DEFAULT_REJECT_CLASSES.split(",") if name]
+    watermark, aggregates = await run_query(
+        db, _load_aggregates, start, end, step, reject_classes, camera_id, model_name
+    )
+    content = {
+        "start": start,
+        "end": end,
+        "interval": interval,
+        "complete_until": watermark,
+        "reject_classes": sorted(reject_classes),
+        "intervals": aggregates,
+    }
+    return _cached_response(
+        request, content, watermark is not None and end <= watermark
+    )
+
+
+@router.get("/history/logs")
+async def inference_logs(
+    request: Request,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    class_name: Optional[str] = None,
+    camera_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Lists the raw inference logs of a time range, oldest first, one page at a time.
+
+    Args:
+        request (Request): The request, used for ETag revalidation.
+        start (Optional[datetime]): Start of the range. Defaults to one hour before the end.
+        end (Optional[datetime]): End of the range, excluded. Defaults to now.
+        cursor (Optional[str]): The "next_cursor" of the previous page.
+        limit (int): Maximum number of logs in the page, up to 1000.
+        class_name (Optional[str]): Only logs of this class.
+        camera_id (Optional[int]): Only logs of this camera.
+        db (AsyncSession): Database session dependency injected by FastAPI.
+
+    Returns:
+        Response: The logs under "logs", and the cursor of the next page under
+        "next_cursor", or None on the last page.
+
+    Raises:
+        HTTPException: If the range is empty or the cursor is invalid.
+    """
+    start, end = _time_range(start, end, timedelta(hours=1))
+    after = _decode_cursor(cursor) if cursor else None
+    logs = await run_query(
+        db,
+        crud.list_inference_logs,
+        start,
+        end,
+        after,
+        limit + 1,
+        class_name,
+        camera_id,
+    )
+    next_cursor = _encode_cursor(logs[limit - 1]) if len(logs) > limit else None
+    content = {"logs": logs[:limit], "next_cursor": next_cursor}
+    # Logs are written with a delay of up to a few seconds after their timestamp.
+    closed = end < datetime.now(timezone.utc) - timedelta(minutes=5)
+    return _cached_response(request, content, closed)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    """
+    Exposes the pipeline stage histograms and frame counters for Prometheus scraping.
+
+    Returns:
+        PlainTextResponse: The metrics in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(
+        metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
+@router.get("/metrics/summary")
+def metrics_summary() -> dict:
+    """
+    Returns the frame counters and the latency percentiles of each pipeline stage.
+
+    Returns:
+        dict: Counters under "frames" and per-stage latencies, in ms, under "stages".
+    """
+    return metrics.summary()
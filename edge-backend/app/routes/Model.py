@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.backend.models.FileHandler import (
     FileHandler,
@@ -23,14 +23,14 @@ async def check_model_loaded() -> JSONResponse:
 
 @router.post("/upload-model/")
 async def upload_model(
-    file: UploadFile = File(...), db: Session = Depends(get_db)
+    file: UploadFile = File(...), db: AsyncSession = Depends(get_db)
 ) -> JSONResponse:
     """
     Handles POST requests to upload a model file, validates it, and updates the system model settings.
 
     Args:
         file (UploadFile): The model file to be uploaded.
-        db (Session): Database session dependency injected by FastAPI.
+        db (AsyncSession): Database session dependency injected by FastAPI.
 
     Returns:
         JSONResponse: A response confirming the successful upload of the file.
@@ -42,7 +42,7 @@ async def upload_model(
         file_handler.validate_zip_file(file)
     except InvalidFileTypeError as e:
         error_message = str(e)
-        interface_log(error_message, db)
+        await interface_log(error_message, db)
         raise HTTPException(status_code=400, detail=error_message)
 
     try:
@@ -54,9 +54,9 @@ async def upload_model(
         filter.reset_filter_result()
     except ModelTypeNotSupportedError as e:
         error_message = str(e)
-        interface_log(f"Arquivo: '{file.filename}'. {error_message}", db)
+        await interface_log(f"Arquivo: '{file.filename}'. {error_message}", db)
         raise HTTPException(status_code=415, detail=error_message)
 
     success_message = f"Arquivo '{file.filename}' carregado corretamente"
-    interface_log(success_message, db)
+    await interface_log(success_message, db)
     return JSONResponse(content={"Arquivo": file.filename})
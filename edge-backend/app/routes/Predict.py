@@ -1,8 +1,6 @@
-from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
 
 from app.backend.models.Predictor import Predictor
-from app.dependencies import get_db
 
 router = APIRouter(tags=["Prediction"])
 
@@ -11,14 +9,14 @@ predictor = Predictor()
 
 # Endpoint para receber o sinal do Node-RED
 @router.post("/continuous-inference")
-async def start_process(request: Request, db: Session = Depends(get_db)):
-    response = await predictor.continuous_inference(request, db)
+async def start_process(request: Request):
+    response = await predictor.continuous_inference(request)
     return response
 
 
 @router.get("/inference-now")
-async def predict_now(db: Session = Depends(get_db)):
-    response = await predictor.infere_now(db)
+async def predict_now():
+    response = await predictor.infere_now()
     return response
 
 
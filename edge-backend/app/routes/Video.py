@@ -12,10 +12,13 @@ def video_feed() -> StreamingResponse:
     """
     Streams video frames to the client using multipart streaming response.
 
+    Every client shares the frames encoded by the stream broadcaster.
+
     Returns:
         StreamingResponse: A streaming response that continuously sends video frames to the client.
     """
     GlobalCropData.set_base_coordinates()
     return StreamingResponse(
-        stream.generate_frames(), media_type="multipart/x-mixed-replace; boundary=frame"
+        stream.broadcaster.frames(),
+        media_type="multipart/x-mixed-replace; boundary=frame",
     )
@@ -1,29 +1,361 @@
+import csv
+import io
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, literal, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from . import models, schemas
 
+INFERENCE_LOG_COLUMNS = (
+    "created_at",
+    "id",
+    "class_id",
+    "score",
+    "model_id",
+    "camera_id",
+)
+UNKNOWN_MODEL = "desconhecido"
+
+_id_lock = threading.Lock()
+_last_id_time = 0
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 
-def create_inference_log(
-    db: Session, Inferencia: schemas.Inferencia
-) -> models.Inferencia:
+def as_utc(moment: datetime) -> datetime:
     """
-    Creates a log entry for an inference in the database.
+    Returns a datetime in UTC. Naive values, as read back from SQLite, are taken as UTC.
+    """
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def next_inference_log_id(camera_id: int = 0) -> int:
+    """
+    Returns a new inference log id, increasing over time.
+
+    The id holds the microseconds since the epoch followed by 8 bits of the camera id,
+    so devices sharing a database do not collide and a log keeps its id when its
+    write is retried.
+
+    Args:
+        camera_id (int): The camera the log belongs to, between 0 and 255.
+
+    Returns:
+        int: A 63 bit id.
+    """
+    global _last_id_time
+    with _id_lock:
+        now = max(time.time_ns() // 1000, _last_id_time + 1)
+        _last_id_time = now
+    return (now << 8) | (camera_id & 0xFF)
+
+
+def get_lookup_ids(db: Session, table, names: Iterable[str]) -> Dict[str, int]:
+    """
+    Returns the ids of names in a lookup table, inserting the missing ones.
 
     Args:
         db (Session): The database session.
-        Inferencia (schemas.Inferencia): The inference data.
+        table: The lookup model, `models.ClasseInferencia` or `models.ModeloInferencia`.
+        names (Iterable[str]): The names to look up.
 
     Returns:
-        models.Inferencia: The created database entry.
+        Dict[str, int]: The id of each name.
     """
-    db_inference = models.Inferencia(
-        class_predicted=Inferencia["classification"],
-        accuracy_predicted=Inferencia["confidence-score"],
+    names = set(names)
+    ids = dict(
+        db.execute(select(table.name, table.id).where(table.name.in_(names))).all()
     )
-    db.add(db_inference)
+    missing = names - ids.keys()
+    if missing:
+        try:
+            db.execute(insert(table), [{"name": name} for name in sorted(missing)])
+            db.commit()
+        except IntegrityError:
+            # Another writer inserted the same name first.
+            db.rollback()
+        ids = dict(
+            db.execute(select(table.name, table.id).where(table.name.in_(names))).all()
+        )
+    return ids
+
+
+def create_inference_logs(db: Session, rows: List[Dict]) -> None:
+    """
+    Inserts several inference log entries in a single transaction.
+
+    The rows are sent as one multi-row INSERT and are not read back. On PostgreSQL and
+    SQLite entries already stored with the same `created_at` and `id` are skipped, so a
+    batch can be written again after a failure without duplicates.
+
+    Args:
+        db (Session): The database session.
+        rows (List[Dict]): Values of INFERENCE_LOG_COLUMNS for each entry.
+    """
+    dialect_insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        statement = insert(models.Inferencia)
+    else:
+        statement = dialect_insert(models.Inferencia).on_conflict_do_nothing()
+    db.execute(statement, rows)
+    db.commit()
+
+
+def copy_inference_logs(db: Session, rows: List[Dict]) -> None:
+    """
+    Inserts several inference log entries with PostgreSQL COPY, in a single transaction.
+
+    The rows are copied to a temporary table first, then moved to the log table,
+    skipping the entries already stored with the same `created_at` and `id`.
+
+    Args:
+        db (Session): A session bound to a PostgreSQL database using psycopg2.
+        rows (List[Dict]): Values of INFERENCE_LOG_COLUMNS for each entry.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            [
+                r"\N" if row[column] is None else row[column]
+                for column in INFERENCE_LOG_COLUMNS
+            ]
+        )
+    buffer.seek(0)
+    table = models.Inferencia.__tablename__
+    staging = f"{table}_copia"
+    columns = ", ".join(INFERENCE_LOG_COLUMNS)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} "
+            f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        cursor.copy_expert(
+            f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+            "ON CONFLICT DO NOTHING"
+        )
+    finally:
+        cursor.close()
     db.commit()
-    db.refresh(db_inference)
-    return db_inference
+
+
+def list_inference_logs(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = 100,
+    class_name: Optional[str] = None,
+    camera_id: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Lists the raw inference logs of a time range, oldest first, one page at a time.
+
+    Pages are selected by keyset on (created_at, id), which follows the primary key,
+    so every page costs the same however deep it is.
+
+    Args:
+        db (Session): The database session.
+        start (datetime): Start of the range, in UTC, included.
+        end (datetime): End of the range, in UTC, excluded.
+        after (Optional[Tuple[datetime, int]]): `created_at` and `id` of the last log
+            of the previous page.
+        limit (int): Maximum number of logs returned.
+        class_name (Optional[str]): Only logs of this class.
+        camera_id (Optional[int]): Only logs of this camera.
+
+    Returns:
+        List[Dict]: The logs, with class and model names.
+    """
+    logs = models.Inferencia
+    query = (
+        select(
+            logs.created_at,
+            logs.id,
+            models.ClasseInferencia.name.label("class_name"),
+            logs.score,
+            models.ModeloInferencia.name.label("model_name"),
+            logs.camera_id,
+        )
+        .join(models.ClasseInferencia, logs.class_id == models.ClasseInferencia.id)
+        .join(models.ModeloInferencia, logs.model_id == models.ModeloInferencia.id)
+        .where(logs.created_at >= start, logs.created_at < end)
+        .order_by(logs.created_at, logs.id)
+        .limit(limit)
+    )
+    if after is not None:
+        created_at, log_id = after
+        query = query.where(
+            tuple_(logs.created_at, logs.id)
+            > tuple_(
+                literal(created_at, logs.created_at.type), literal(log_id, logs.id.type)
+            )
+        )
+    if class_name is not None:
+        query = query.where(models.ClasseInferencia.name == class_name)
+    if camera_id is not None:
+        query = query.where(logs.camera_id == camera_id)
+    return [
+        {**row._asdict(), "created_at": as_utc(row.created_at)}
+        for row in db.execute(query)
+    ]
+
+
+def score_quantile(
+    histogram: Sequence[int], q: float, low: float, high: float
+) -> float:
+    """
+    Estimates a quantile of the confidence scores from a rollup histogram.
+
+    The scores are taken as evenly spread inside their bin, and the estimate is kept
+    between the lowest and highest score seen.
+
+    Args:
+        histogram (Sequence[int]): Scores per bin, the bins splitting [0, 1] evenly.
+        q (float): The quantile, between 0 and 1.
+        low (float): The lowest score.
+        high (float): The highest score.
+
+    Returns:
+        float: The estimated score.
+    """
+    width = 1 / len(histogram)
+    rank = q * sum(histogram)
+    seen = 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            estimate = width * (index + (rank - seen) / count)
+            return min(max(estimate, low), high)
+        seen += count
+    return high
+
+
+def _score_summary(stats: Dict) -> Dict:
+    count = stats["count"]
+    histogram = stats["histogram"]
+    return {
+        "count": count,
+        "mean_score": stats["sum"] / count,
+        "min_score": stats["min"],
+        "max_score": stats["max"],
+        "p50_score": score_quantile(histogram, 0.5, stats["min"], stats["max"]),
+        "p95_score": score_quantile(histogram, 0.95, stats["min"], stats["max"]),
+    }
+
+
+def _merge_scores(stats: Optional[Dict], count, total, low, high, histogram) -> Dict:
+    if stats is None:
+        return {
+            "count": count,
+            "sum": total,
+            "min": low,
+            "max": high,
+            "histogram": list(histogram),
+        }
+    stats["count"] += count
+    stats["sum"] += total
+    stats["min"] = min(stats["min"], low)
+    stats["max"] = max(stats["max"], high)
+    stats["histogram"] = [a + b for a, b in zip(stats["histogram"], histogram)]
+    return stats
+
+
+def get_inference_aggregates(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    interval: timedelta,
+    reject_classes: Iterable[str] = (),
+    camera_id: Optional[int] = None,
+    model_name: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Aggregates the per-minute rollups of a time range into longer intervals.
+
+    Intervals are aligned on the epoch in UTC, so the same interval always has the same
+    boundaries. The raw logs are not read.
+
+    Args:
+        db (Session): The database session.
+        start (datetime): Start of the range, in UTC, included.
+        end (datetime): End of the range, in UTC, excluded.
+        interval (timedelta): Length of each interval, a whole number of minutes.
+        reject_classes (Iterable[str]): Classes counted as rejects.
+        camera_id (Optional[int]): Only inferences of this camera.
+        model_name (Optional[str]): Only inferences of this model.
+
+    Returns:
+        List[Dict]: One entry per interval with inferences, oldest first, with the
+        totals, the reject rate and the score statistics of each class.
+    """
+    rollups = models.InferenciaMinuto
+    query = (
+        select(
+            rollups.bucket,
+            models.ClasseInferencia.name,
+            rollups.count,
+            rollups.score_sum,
+            rollups.score_min,
+            rollups.score_max,
+            rollups.score_histogram,
+        )
+        .join(models.ClasseInferencia, rollups.class_id == models.ClasseInferencia.id)
+        .where(rollups.bucket >= start, rollups.bucket < end)
+        .order_by(rollups.bucket)
+    )
+    if camera_id is not None:
+        query = query.where(rollups.camera_id == camera_id)
+    if model_name is not None:
+        query = query.where(
+            rollups.model_id
+            == select(models.ModeloInferencia.id)
+            .where(models.ModeloInferencia.name == model_name)
+            .scalar_subquery()
+        )
+    reject_classes = set(reject_classes)
+    intervals: Dict[datetime, Dict] = {}
+    for bucket, class_name, *scores in db.execute(query):
+        offset = (as_utc(bucket) - _EPOCH) // interval
+        interval_start = _EPOCH + offset * interval
+        entry = intervals.setdefault(
+            interval_start, {"total": None, "rejects": 0, "classes": {}}
+        )
+        entry["total"] = _merge_scores(entry["total"], *scores)
+        entry["classes"][class_name] = _merge_scores(
+            entry["classes"].get(class_name), *scores
+        )
+        if class_name in reject_classes:
+            entry["rejects"] += scores[0]
+    aggregates = []
+    for interval_start, entry in intervals.items():
+        total = _score_summary(entry["total"])
+        aggregates.append(
+            {
+                "start": interval_start,
+                **total,
+                "reject_count": entry["rejects"],
+                "reject_rate": entry["rejects"] / total["count"],
+                "classes": {
+                    name: _score_summary(stats)
+                    for name, stats in sorted(entry["classes"].items())
+                },
+            }
+        )
+    return aggregates
 
 
 def create_interface_log(db: Session, Interface: schemas.Interface) -> models.Interface:
@@ -42,3 +374,25 @@ def create_interface_log(db: Session, Interface: schemas.Interface) -> models.In
     db.commit()
     db.refresh(db_interface_click)
     return db_interface_click
+
+
+async def create_interface_log_async(
+    db: AsyncSession, Interface: schemas.Interface
+) -> models.Interface:
+    """
+    Creates a log entry for a user interface interaction, without blocking the event loop.
+
+    The entry is not read back after the commit, so database defaults such as
+    `created_at` are not loaded.
+
+    Args:
+        db (AsyncSession): The async database session.
+        Interface (schemas.Interface): The interface interaction data.
+
+    Returns:
+        models.Interface: The created database entry.
+    """
+    db_interface_click = models.Interface(**Interface)
+    db.add(db_interface_click)
+    await db.commit()
+    return db_interface_click
@@ -1,18 +1,103 @@
 import os
+from typing import Optional
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 """
 This module configures the database connection using SQLAlchemy. It establishes settings for the database engine, session, and base model for ORM mappings.
+
+Routes use an async engine (asyncpg on PostgreSQL, aiosqlite on SQLite) so database
+round trips never block the event loop. Setting DATABASE_ASYNC=false, or a missing async
+driver, keeps the synchronous engine only, which is also used by background threads.
 """
 
 env = os.getenv("ENV")
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
 SQLALCHEMY_DATABASE_URL = DATABASE_URL
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+
+def async_database_url(url: str) -> Optional[str]:
+    """
+    Returns the URL of the async driver for a database URL.
+
+    Args:
+        url (str): A synchronous SQLAlchemy URL, e.g. "postgresql://user@host/db".
+
+    Returns:
+        Optional[str]: The same URL with an async driver, or None if the backend has none.
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return None
+    return parsed.set(
+        drivername=f"{parsed.get_backend_name()}+{driver}"
+    ).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str) -> Optional[AsyncEngine]:
+    """
+    Creates the async engine used by the routes.
+
+    On PostgreSQL the pool holds DB_POOL_SIZE connections (default 5) plus up to
+    DB_MAX_OVERFLOW extra ones under bursts (default 5). Requests wait at most
+    DB_POOL_TIMEOUT seconds for a connection (default 10). SQLite uses one connection.
+
+    Args:
+        url (str): The synchronous database URL.
+
+    Returns:
+        Optional[AsyncEngine]: The engine, or None if async access is disabled or unavailable.
+    """
+    if os.getenv("DATABASE_ASYNC", "true").lower() not in ("1", "true"):
+        return None
+    async_url = async_database_url(url)
+    if async_url is None:
+        return None
+    parsed = make_url(async_url)
+    options = {}
+    if parsed.get_backend_name() == "sqlite" and parsed.database not in (
+        None,
+        "",
+        ":memory:",
+    ):
+        # aiosqlite defaults to a new connection, and thread, per session. SQLite
+        # serializes writers anyway, so one pooled connection is enough.
+        options = {
+            "poolclass": AsyncAdaptedQueuePool,
+            "pool_size": 1,
+            "max_overflow": 0,
+        }
+    elif parsed.get_backend_name() == "postgresql":
+        options = {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "pool_recycle": 1800,
+            "pool_pre_ping": True,
+        }
+    try:
+        return create_async_engine(async_url, **options)
+    except ImportError as e:
+        print(f"Driver assíncrono indisponível, usando sessões síncronas: {e}")
+        return None
+
+
+async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
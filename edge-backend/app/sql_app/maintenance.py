@@ -0,0 +1,526 @@
+import csv
+import gzip
+import math
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    cast,
+    delete,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine, Row
+
+from . import models
+from .crud import INFERENCE_LOG_COLUMNS, as_utc
+
+"""
+Storage maintenance of the inference logs: daily partitions on PostgreSQL, per-minute
+rollups and retention of the raw logs. Other databases keep a single table, whose old
+rows are deleted instead of dropped.
+"""
+
+SCORE_BINS = 20
+
+LOG_TABLE = models.Inferencia.__tablename__
+LEGACY_TABLE = f"{LOG_TABLE}_legado"
+PARTITION_PREFIX = f"{LOG_TABLE}_p"
+DEFAULT_PARTITION = f"{LOG_TABLE}_padrao"
+ROLLUP_TASK = "rollup"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{8}})$")
+
+# The old free text schema, only read while its rows are moved to LOG_TABLE.
+_LEGACY_LOGS = Table(
+    LEGACY_TABLE,
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("accuracy_predicted", String),
+    Column("class_predicted", String),
+    Column("created_at", DateTime(timezone=True)),
+)
+
+
+def is_partitioned(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql"
+
+
+def day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def floor_minute(moment: datetime) -> datetime:
+    return as_utc(moment).replace(second=0, microsecond=0)
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def prepare_inference_log_storage(engine: Engine) -> None:
+    """
+    Renames an inference log table with the old free text schema out of the way.
+
+    Must run before the tables are created. The old rows are kept in LEGACY_TABLE until
+    `InferenceLogMaintenance` moves them to the new table, see `read_legacy_logs`.
+
+    Args:
+        engine (Engine): The database engine.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(LOG_TABLE):
+        return
+    columns = {column["name"] for column in inspector.get_columns(LOG_TABLE)}
+    if "accuracy_predicted" not in columns:
+        return
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE {LOG_TABLE} RENAME TO {LEGACY_TABLE}"))
+        if is_partitioned(connection):
+            connection.execute(
+                text(
+                    f"ALTER INDEX IF EXISTS {LOG_TABLE}_pkey RENAME TO {LEGACY_TABLE}_pkey"
+                )
+            )
+    print(
+        f"Logs de inferência no formato antigo mantidos na tabela {LEGACY_TABLE} "
+        "até serem migrados."
+    )
+
+
+def has_legacy_logs(connection: Connection) -> bool:
+    return inspect(connection).has_table(LEGACY_TABLE)
+
+
+def read_legacy_logs(connection: Connection, after_id: int, limit: int) -> List[Row]:
+    """
+    Returns a batch of rows of the old inference log table, in id order.
+
+    Args:
+        connection (Connection): The database connection.
+        after_id (int): Only rows with a greater id are returned.
+        limit (int): Maximum number of rows.
+
+    Returns:
+        List[Row]: Rows with id, class_predicted, accuracy_predicted and created_at.
+    """
+    return connection.execute(
+        select(_LEGACY_LOGS)
+        .where(_LEGACY_LOGS.c.id > after_id)
+        .order_by(_LEGACY_LOGS.c.id)
+        .limit(limit)
+    ).all()
+
+
+def parse_legacy_log(row: Row) -> Optional[Tuple[datetime, str, float]]:
+    """
+    Converts a row of the old table, whose score was stored as text.
+
+    Returns:
+        Optional[Tuple[datetime, str, float]]: The time, class name and score, or None
+            if the row has no class, no time or a score that is not a number.
+    """
+    if row.class_predicted is None or row.created_at is None:
+        return None
+    try:
+        score = float(row.accuracy_predicted)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(score):
+        return None
+    return as_utc(row.created_at), row.class_predicted, score
+
+
+def legacy_log_id(created_at: datetime, previous: int) -> int:
+    """
+    Returns the id of a moved log, in the layout of `crud.next_inference_log_id`.
+
+    Old rows only have a time, often with a resolution of one second, so the
+    microseconds are bumped past the previous id to keep the ids unique.
+
+    Args:
+        created_at (datetime): Time of the log.
+        previous (int): The id given to the previous moved log, or 0.
+
+    Returns:
+        int: The new id, with camera 0.
+    """
+    micros = (as_utc(created_at) - _EPOCH) // timedelta(microseconds=1)
+    return max(micros, (previous >> 8) + 1) << 8
+
+
+def last_legacy_log_id(connection: Connection) -> int:
+    """
+    Returns the greatest id among the logs already moved, so an interrupted move resumes
+    without reusing ids.
+    """
+    logs = models.Inferencia.__table__
+    newest = select(func.max(_LEGACY_LOGS.c.created_at)).scalar_subquery()
+    return (
+        connection.scalar(
+            select(func.max(logs.c.id)).where(logs.c.created_at <= newest)
+        )
+        or 0
+    )
+
+
+def move_legacy_logs(
+    connection: Connection, logs: List[Dict], legacy_ids: List[int]
+) -> None:
+    """
+    Inserts converted logs and deletes their rows from the old table, in one transaction.
+
+    Args:
+        connection (Connection): The database connection.
+        logs (List[Dict]): Rows for LOG_TABLE, with every column of INFERENCE_LOG_COLUMNS.
+        legacy_ids (List[int]): Ids of the old rows they came from.
+    """
+    if logs:
+        connection.execute(insert(models.Inferencia.__table__), logs)
+    connection.execute(delete(_LEGACY_LOGS).where(_LEGACY_LOGS.c.id.in_(legacy_ids)))
+
+
+def drop_legacy_logs(connection: Connection) -> bool:
+    """
+    Drops the old inference log table once every row was moved.
+
+    Returns:
+        bool: Whether the table was dropped. Rows that could not be converted keep it.
+    """
+    if connection.scalar(select(func.count()).select_from(_LEGACY_LOGS)):
+        return False
+    _LEGACY_LOGS.drop(connection)
+    return True
+
+
+def list_partitions(connection: Connection) -> Dict[date, str]:
+    """
+    Returns the daily partitions of the inference log table, by day.
+
+    Args:
+        connection (Connection): A PostgreSQL connection.
+    """
+    names = connection.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = :parent"
+        ),
+        {"parent": LOG_TABLE},
+    )
+    partitions = {}
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[datetime.strptime(match.group(1), "%Y%m%d").date()] = name
+    return partitions
+
+
+def ensure_partitions(
+    connection: Connection, first_day: date, last_day: date
+) -> List[str]:
+    """
+    Creates the missing daily partitions between two days, and the default partition.
+
+    Rows already written to the default partition for a new day are moved into it.
+    Does nothing on databases without partitioning.
+
+    Args:
+        connection (Connection): The database connection.
+        first_day (date): First day to cover.
+        last_day (date): Last day to cover, included.
+
+    Returns:
+        List[str]: Names of the partitions created.
+    """
+    if not is_partitioned(connection):
+        return []
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {LOG_TABLE} DEFAULT"
+        )
+    )
+    existing = list_partitions(connection)
+    created = []
+    day = first_day
+    while day <= last_day:
+        if day not in existing:
+            _create_partition(connection, day)
+            created.append(partition_name(day))
+        day += timedelta(days=1)
+    return created
+
+
+def _create_partition(connection: Connection, day: date) -> None:
+    name = partition_name(day)
+    start, end = day_start(day), day_start(day + timedelta(days=1))
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    in_range = "WHERE created_at >= :start AND created_at < :end"
+    params = {"start": start, "end": end}
+    if not connection.scalar(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} {in_range})"), params
+    ):
+        connection.execute(
+            text(f"CREATE TABLE {name} PARTITION OF {LOG_TABLE} FOR VALUES {bounds}")
+        )
+        return
+    # A partition cannot be attached over rows of the default partition.
+    connection.execute(
+        text(
+            f"CREATE TABLE {name} (LIKE {LOG_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        params,
+    )
+    connection.execute(
+        text(f"ALTER TABLE {LOG_TABLE} ATTACH PARTITION {name} FOR VALUES {bounds}")
+    )
+
+
+def archive_logs(
+    connection: Connection, start: datetime, end: datetime, path: str
+) -> int:
+    """
+    Writes the inference logs of a time range to a gzip compressed CSV file.
+
+    Args:
+        connection (Connection): The database connection.
+        start (datetime): Start of the range, included.
+        end (datetime): End of the range, excluded.
+        path (str): The file to write. Nothing is written for an empty range.
+
+    Returns:
+        int: The number of logs written.
+    """
+    table = models.Inferencia.__table__
+    result = connection.execution_options(stream_results=True, yield_per=5000).execute(
+        select(*(table.c[column] for column in INFERENCE_LOG_COLUMNS))
+        .where(table.c.created_at >= start, table.c.created_at < end)
+        .order_by(table.c.created_at, table.c.id)
+    )
+    count = 0
+    temporary = f"{path}.tmp"
+    with gzip.open(temporary, "wt", newline="") as archive:
+        writer = csv.writer(archive)
+        writer.writerow(INFERENCE_LOG_COLUMNS)
+        for row in result:
+            created_at, *values = row
+            writer.writerow([as_utc(created_at).isoformat(), *values])
+            count += 1
+    if count:
+        os.replace(temporary, path)
+    else:
+        os.remove(temporary)
+    return count
+
+
+def drop_logs_before(
+    connection: Connection, cutoff: date, archive_dir: Optional[str] = None
+) -> List[date]:
+    """
+    Removes the inference logs of every day before a cutoff, archiving them first.
+
+    On PostgreSQL whole partitions are dropped, which frees their disk space at once.
+
+    Args:
+        connection (Connection): The database connection.
+        cutoff (date): First day to keep.
+        archive_dir (Optional[str]): Directory of the archives, one file per day.
+            Logs are discarded when not set.
+
+    Returns:
+        List[date]: The days removed.
+    """
+    table = models.Inferencia.__table__
+    if is_partitioned(connection):
+        days = sorted(day for day in list_partitions(connection) if day < cutoff)
+    else:
+        oldest = connection.scalar(select(func.min(table.c.created_at)))
+        days = []
+        if oldest is not None:
+            day = as_utc(oldest).date()
+            days = [day + timedelta(days=n) for n in range((cutoff - day).days)]
+    removed = []
+    for day in days:
+        start, end = day_start(day), day_start(day + timedelta(days=1))
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+            path = os.path.join(archive_dir, f"{LOG_TABLE}_{day:%Y%m%d}.csv.gz")
+            archive_logs(connection, start, end, path)
+        if is_partitioned(connection):
+            connection.execute(text(f"DROP TABLE {partition_name(day)}"))
+        elif (
+            connection.execute(
+                delete(table).where(
+                    table.c.created_at >= start, table.c.created_at < end
+                )
+            ).rowcount
+            == 0
+        ):
+            continue
+        removed.append(day)
+    if is_partitioned(connection):
+        # Stray rows of the default partition, e.g. written with a wrong clock.
+        connection.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+            {"cutoff": day_start(cutoff)},
+        )
+    return removed
+
+
+def _minute_bucket(connection: Connection, column):
+    if connection.dialect.name == "postgresql":
+        return func.date_trunc("minute", column)
+    return func.strftime("%Y-%m-%d %H:%M:00", column)
+
+
+def _score_bin(connection: Connection, column):
+    if connection.dialect.name == "postgresql":
+        score_bin = cast(func.floor(column * SCORE_BINS), Integer)
+        return func.least(func.greatest(score_bin, 0), SCORE_BINS - 1)
+    # SQLite: the two-argument min and max are scalar functions.
+    return func.min(func.max(cast(column * SCORE_BINS, Integer), 0), SCORE_BINS - 1)
+
+
+def rollup_minutes(connection: Connection, start: datetime, end: datetime) -> int:
+    """
+    Computes the per-minute, per-class rollups of a time range from the raw logs.
+
+    Existing rollups of the range are replaced, so a range can be computed again when
+    late logs arrive.
+
+    Args:
+        connection (Connection): The database connection.
+        start (datetime): Start of the range, on a minute boundary.
+        end (datetime): End of the range, excluded, on a minute boundary.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    logs = models.Inferencia.__table__
+    rollups = models.InferenciaMinuto.__table__
+    bucket = _minute_bucket(connection, logs.c.created_at).label("bucket")
+    score_bin = _score_bin(connection, logs.c.score).label("score_bin")
+    keys = (bucket, logs.c.camera_id, logs.c.model_id, logs.c.class_id)
+    query = (
+        select(
+            *keys,
+            score_bin,
+            func.count(),
+            func.sum(logs.c.score),
+            func.min(logs.c.score),
+            func.max(logs.c.score),
+        )
+        .where(logs.c.created_at >= start, logs.c.created_at < end)
+        .group_by(*keys, score_bin)
+    )
+    rows: Dict[tuple, Dict] = {}
+    for (
+        minute,
+        camera_id,
+        model_id,
+        class_id,
+        bin_,
+        count,
+        total,
+        low,
+        high,
+    ) in connection.execute(query):
+        if isinstance(minute, str):
+            minute = datetime.strptime(minute, "%Y-%m-%d %H:%M:%S")
+        key = (as_utc(minute), camera_id, model_id, class_id)
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = {
+                "bucket": key[0],
+                "camera_id": camera_id,
+                "model_id": model_id,
+                "class_id": class_id,
+                "count": 0,
+                "score_sum": 0.0,
+                "score_min": low,
+                "score_max": high,
+                "score_histogram": [0] * SCORE_BINS,
+            }
+        row["count"] += count
+        row["score_sum"] += total
+        row["score_min"] = min(row["score_min"], low)
+        row["score_max"] = max(row["score_max"], high)
+        row["score_histogram"][bin_] += count
+    connection.execute(
+        delete(rollups).where(rollups.c.bucket >= start, rollups.c.bucket < end)
+    )
+    if rows:
+        connection.execute(insert(rollups), list(rows.values()))
+    return len(rows)
+
+
+def drop_rollups_before(connection: Connection, cutoff: datetime) -> int:
+    """
+    Deletes the rollups of the minutes before a cutoff.
+
+    Returns:
+        int: The number of rollup rows deleted.
+    """
+    rollups = models.InferenciaMinuto.__table__
+    return connection.execute(delete(rollups).where(rollups.c.bucket < cutoff)).rowcount
+
+
+def oldest_log_time(connection: Connection) -> Optional[datetime]:
+    created_at = connection.scalar(select(func.min(models.Inferencia.created_at)))
+    return None if created_at is None else as_utc(created_at)
+
+
+def get_watermark(connection: Connection, task: str) -> Optional[datetime]:
+    watermark = connection.scalar(
+        select(models.EstadoManutencao.watermark).where(
+            models.EstadoManutencao.task == task
+        )
+    )
+    return None if watermark is None else as_utc(watermark)
+
+
+def set_watermark(connection: Connection, task: str, watermark: datetime) -> None:
+    state = models.EstadoManutencao.__table__
+    updated = connection.execute(
+        state.update().where(state.c.task == task).values(watermark=watermark)
+    ).rowcount
+    if not updated:
+        connection.execute(insert(state).values(task=task, watermark=watermark))
+
+
+def rewind_watermark(connection: Connection, task: str, moment: datetime) -> None:
+    """
+    Moves a watermark back so the minute of a late log is processed again.
+
+    Args:
+        connection (Connection): The database connection.
+        task (str): The task name.
+        moment (datetime): Time of the late log.
+    """
+    state = models.EstadoManutencao.__table__
+    minute = floor_minute(moment)
+    connection.execute(
+        state.update()
+        .where(state.c.task == task, state.c.watermark > minute)
+        .values(watermark=minute)
+    )
@@ -1,26 +1,133 @@
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import (
+    JSON,
+    REAL,
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    PrimaryKeyConstraint,
+    SmallInteger,
+    String,
+)
 from sqlalchemy.sql import func
 
 from .db_manager import Base
 
+# SQLite only generates keys for INTEGER PRIMARY KEY columns.
+LookupId = SmallInteger().with_variant(Integer(), "sqlite")
+
+
+class ClasseInferencia(Base):
+    """
+    Represents a class predicted by a model, referenced by id from the inference logs.
+
+    Attributes:
+        id (SmallInteger): The primary key.
+        name (String): The class name returned by the model, unique.
+    """
+
+    __tablename__ = "classesinferencia"
+
+    id = Column(LookupId, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False, unique=True)
+
+
+class ModeloInferencia(Base):
+    """
+    Represents a loaded model, referenced by id from the inference logs.
+
+    Attributes:
+        id (SmallInteger): The primary key.
+        name (String): The uploaded model file name, unique.
+    """
+
+    __tablename__ = "modelosinferencia"
+
+    id = Column(LookupId, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False, unique=True)
+
 
 class Inferencia(Base):
     """
     Represents an inference log in the database.
 
+    On PostgreSQL the table is partitioned by day on `created_at`; the partitions are
+    created and dropped by `InferenceLogMaintenance`. The primary key starts with
+    `created_at`, so it also serves time range queries.
+
     Attributes:
-        id (Integer): The primary key.
-        accuracy_predicted (String): The predicted accuracy as a string.
-        class_predicted (String): The predicted class.
-        created_at (DateTime): Timestamp of when the record was created, set automatically.
+        created_at (DateTime): Timestamp of the inference.
+        id (BigInteger): Time ordered id assigned by the writer, see `crud.next_inference_log_id`.
+        class_id (SmallInteger): The predicted class.
+        score (REAL): The confidence score of the prediction.
+        model_id (SmallInteger): The model that made the prediction.
+        camera_id (SmallInteger): The camera the frame came from.
     """
 
     __tablename__ = "logsinferencia"
+    __table_args__ = (
+        PrimaryKeyConstraint("created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True)
-    accuracy_predicted = Column(String)
-    class_predicted = Column(String)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    id = Column(BigInteger, nullable=False, autoincrement=False)
+    class_id = Column(SmallInteger, ForeignKey("classesinferencia.id"), nullable=False)
+    score = Column(REAL, nullable=False)
+    model_id = Column(SmallInteger, ForeignKey("modelosinferencia.id"), nullable=False)
+    camera_id = Column(SmallInteger, nullable=False, server_default="0")
+
+
+class InferenciaMinuto(Base):
+    """
+    Represents the inferences of one class in one minute, computed from the raw logs.
+
+    Attributes:
+        bucket (DateTime): Start of the minute.
+        camera_id (SmallInteger): The camera the frames came from.
+        model_id (SmallInteger): The model that made the predictions.
+        class_id (SmallInteger): The predicted class.
+        count (Integer): Number of inferences.
+        score_sum (Float): Sum of the confidence scores.
+        score_min (REAL): Lowest confidence score.
+        score_max (REAL): Highest confidence score.
+        score_histogram (JSON): Inferences per confidence bin, see
+            `maintenance.SCORE_BINS`.
+    """
+
+    __tablename__ = "logsinferencia_minuto"
+    __table_args__ = (
+        PrimaryKeyConstraint("bucket", "camera_id", "model_id", "class_id"),
+    )
+
+    bucket = Column(DateTime(timezone=True), nullable=False)
+    camera_id = Column(SmallInteger, nullable=False)
+    model_id = Column(SmallInteger, ForeignKey("modelosinferencia.id"), nullable=False)
+    class_id = Column(SmallInteger, ForeignKey("classesinferencia.id"), nullable=False)
+    count = Column(Integer, nullable=False)
+    score_sum = Column(Float, nullable=False)
+    score_min = Column(REAL, nullable=False)
+    score_max = Column(REAL, nullable=False)
+    score_histogram = Column(JSON, nullable=False)
+
+
+class EstadoManutencao(Base):
+    """
+    Represents the progress of a maintenance task of the inference logs.
+
+    Attributes:
+        task (String): The primary key, the task name.
+        watermark (DateTime): Everything before it has been processed.
+    """
+
+    __tablename__ = "estadomanutencao"
+
+    task = Column(String, primary_key=True)
+    watermark = Column(DateTime(timezone=True), nullable=False)
 
 
 class Interface(Base):
@@ -19,14 +19,20 @@ class Inferencia(LogBase):
     Schema for inference log entries, extending the LogBase with specific inference details.
 
     Attributes:
-        id (int): The primary key identifier.
-        accuracy_predicted (str): The predicted accuracy as a string.
-        class_predicted (str): The predicted class.
+        id (int): The time ordered identifier.
+        class_id (int): The predicted class.
+        score (float): The confidence score of the prediction.
+        model_id (int): The model that made the prediction.
+        camera_id (int): The camera the frame came from.
     """
 
     id: int
-    accuracy_predicted: str
-    class_predicted: str
+    class_id: int
+    score: float
+    model_id: int
+    camera_id: int
+
+    model_config = {"protected_namespaces": ()}
 
     class ConfigDict:
         from_attributes = True
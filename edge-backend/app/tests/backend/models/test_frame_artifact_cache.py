@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import Mock
+
+from app.backend.models.FrameArtifactCache import FrameArtifactCache
+
+
+class TestFrameArtifactCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = FrameArtifactCache()
+
+    def test_builds_artifact_once_per_frame_and_key(self):
+        factory = Mock(return_value="encoded")
+
+        first = self.cache.get_or_create(1, ("jpeg", (0, 0, 10, 10), 95), factory)
+        second = self.cache.get_or_create(1, ("jpeg", (0, 0, 10, 10), 95), factory)
+
+        self.assertEqual(first, "encoded")
+        self.assertEqual(second, "encoded")
+        factory.assert_called_once()
+
+    def test_different_keys_are_cached_separately(self):
+        self.cache.get_or_create(1, ("jpeg", 95), lambda: "high")
+        self.cache.get_or_create(1, ("jpeg", 50), lambda: "low")
+
+        self.assertEqual(self.cache.peek(1, ("jpeg", 95)), "high")
+        self.assertEqual(self.cache.peek(1, ("jpeg", 50)), "low")
+
+    def test_new_frame_evicts_previous_artifacts(self):
+        self.cache.get_or_create(1, "crop", lambda: "old")
+        self.cache.get_or_create(2, "jpeg", lambda: "new")
+
+        self.assertIsNone(self.cache.peek(1, "crop"))
+        self.assertIsNone(self.cache.peek(2, "crop"))
+        self.assertEqual(self.cache.peek(2, "jpeg"), "new")
+
+    def test_older_frame_does_not_evict_newer(self):
+        self.cache.get_or_create(2, "jpeg", lambda: "new")
+
+        self.assertEqual(self.cache.get_or_create(1, "jpeg", lambda: "old"), "old")
+        self.assertEqual(self.cache.peek(2, "jpeg"), "new")
+
+    def test_nested_artifacts(self):
+        result = self.cache.get_or_create(
+            1,
+            "base64",
+            lambda: self.cache.get_or_create(1, "jpeg", lambda: "jpeg") + "-b64",
+        )
+
+        self.assertEqual(result, "jpeg-b64")
+        self.assertEqual(self.cache.peek(1, "jpeg"), "jpeg")
+
+    def test_clear(self):
+        self.cache.get_or_create(1, "jpeg", lambda: "jpeg")
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.peek(1, "jpeg"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.backend.models.FrameBroadcaster import FrameBroadcaster
+
+
+class CountingSource:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.produced = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.release.wait(2.0)
+        for chunk in self.chunks:
+            self.produced += 1
+            yield chunk
+
+
+class TestFrameBroadcaster(unittest.IsolatedAsyncioTestCase):
+    async def test_viewers_share_each_encoded_chunk(self):
+        source = CountingSource([b"a", b"b", b"c"])
+        broadcaster = FrameBroadcaster(source, queue_size=3)
+        first = broadcaster.subscribe()
+        second = broadcaster.subscribe()
+        source.release.set()
+
+        received_first = [await first.queue.get() for _ in range(3)]
+        received_second = [await second.queue.get() for _ in range(3)]
+        broadcaster.stop()
+
+        self.assertEqual(received_first, [b"a", b"b", b"c"])
+        self.assertEqual(received_second, [b"a", b"b", b"c"])
+        self.assertEqual(source.produced, 3)
+
+    async def test_slow_viewer_drops_oldest(self):
+        source = CountingSource([b"1", b"2", b"3", b"4"])
+        broadcaster = FrameBroadcaster(source, queue_size=2)
+        subscriber = broadcaster.subscribe()
+        source.release.set()
+
+        while source.produced < 4:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+        broadcaster.unsubscribe(subscriber)
+        broadcaster.stop()
+
+        self.assertEqual(subscriber.queue.get_nowait(), b"3")
+        self.assertEqual(subscriber.queue.get_nowait(), b"4")
+        self.assertEqual(subscriber.dropped, 2)
+
+    async def test_frames_unsubscribes_on_stop(self):
+        source = CountingSource([b"frame"])
+        broadcaster = FrameBroadcaster(source)
+        source.release.set()
+
+        frames = broadcaster.frames()
+        self.assertEqual(await frames.__anext__(), b"frame")
+        self.assertEqual(broadcaster.subscriber_count, 1)
+
+        broadcaster.stop()
+        with self.assertRaises(StopAsyncIteration):
+            await frames.__anext__()
+        self.assertEqual(broadcaster.subscriber_count, 0)
+
+    async def test_source_is_idle_without_viewers(self):
+        produced = []
+
+        def endless_source():
+            while True:
+                time.sleep(0.005)
+                produced.append(1)
+                yield b"frame"
+
+        broadcaster = FrameBroadcaster(endless_source)
+        subscriber = broadcaster.subscribe()
+        self.assertEqual(await subscriber.queue.get(), b"frame")
+
+        broadcaster.unsubscribe(subscriber)
+        await asyncio.sleep(0.05)
+        produced_while_idle = len(produced)
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(len(produced), produced_while_idle)
+
+        subscriber = broadcaster.subscribe()
+        self.assertEqual(await subscriber.queue.get(), b"frame")
+        self.assertGreater(len(produced), produced_while_idle)
+        broadcaster.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
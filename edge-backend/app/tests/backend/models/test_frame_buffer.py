@@ -0,0 +1,91 @@
+import threading
+import unittest
+
+import cv2
+import numpy as np
+
+from app.backend.models.FrameBuffer import FrameBuffer
+
+
+class TestFrameBuffer(unittest.TestCase):
+    def setUp(self):
+        self.frame_buffer = FrameBuffer(size=3)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            FrameBuffer(size=1)
+
+    def test_empty_buffer(self):
+        self.assertEqual(self.frame_buffer.latest_seq, -1)
+        self.assertIsNone(self.frame_buffer.latest())
+
+    def test_publish_assigns_sequence_and_timestamp(self):
+        first = self.frame_buffer.publish(np.zeros((4, 4, 3), dtype=np.uint8))
+        second = self.frame_buffer.publish(np.ones((4, 4, 3), dtype=np.uint8))
+        record = self.frame_buffer.latest()
+
+        self.assertEqual((first, second), (0, 1))
+        self.assertEqual(record.seq, 1)
+        self.assertGreater(record.timestamp, 0)
+        np.testing.assert_array_equal(record.image, np.ones((4, 4, 3)))
+
+    def test_slots_are_preallocated_and_reused(self):
+        for value in range(3):
+            self.frame_buffer.publish(np.full((4, 4, 3), value, dtype=np.uint8))
+        slots = list(self.frame_buffer._slots)
+
+        self.frame_buffer.publish(np.full((4, 4, 3), 9, dtype=np.uint8))
+
+        self.assertTrue(all(a is b for a, b in zip(slots, self.frame_buffer._slots)))
+        np.testing.assert_array_equal(self.frame_buffer.latest().image, 9)
+
+    def test_resolution_change_reallocates(self):
+        self.frame_buffer.publish(np.zeros((4, 4, 3), dtype=np.uint8))
+        self.frame_buffer.publish(np.zeros((8, 8, 3), dtype=np.uint8))
+
+        self.assertEqual(self.frame_buffer.latest().image.shape, (8, 8, 3))
+
+    def test_latest_returns_private_copy(self):
+        self.frame_buffer.publish(np.zeros((4, 4, 3), dtype=np.uint8))
+        record = self.frame_buffer.latest()
+        record.image[:] = 255
+
+        np.testing.assert_array_equal(self.frame_buffer.latest().image, 0)
+
+    def test_publish_encoded_shares_bytes(self):
+        image = np.full((8, 8, 3), 200, dtype=np.uint8)
+        jpeg = cv2.imencode(".jpg", image)[1].tobytes()
+
+        self.frame_buffer.publish_encoded(jpeg)
+        record = self.frame_buffer.latest()
+
+        self.assertIsNone(record.image)
+        self.assertIs(record.jpeg, jpeg)
+        self.assertEqual(record.pixels().shape, (8, 8, 3))
+
+    def test_reallocation_drops_encoded_frames(self):
+        jpeg = cv2.imencode(".jpg", np.zeros((8, 8, 3), dtype=np.uint8))[1].tobytes()
+        self.frame_buffer.publish_encoded(jpeg)
+        self.frame_buffer.publish(np.zeros((4, 4, 3), dtype=np.uint8))
+
+        self.assertEqual(self.frame_buffer._slot_jpeg, [None] * 3)
+
+    def test_wait_for_frame_timeout(self):
+        self.assertIsNone(self.frame_buffer.wait_for_frame(-1, timeout=0.01))
+
+    def test_wait_for_frame_wakes_on_publish(self):
+        publisher = threading.Timer(
+            0.05,
+            self.frame_buffer.publish,
+            args=(np.zeros((4, 4, 3), dtype=np.uint8),),
+        )
+        publisher.start()
+        record = self.frame_buffer.wait_for_frame(-1, timeout=2.0)
+        publisher.join()
+
+        self.assertIsNotNone(record)
+        self.assertEqual(record.seq, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
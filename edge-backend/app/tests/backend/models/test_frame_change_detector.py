@@ -0,0 +1,60 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from app.backend.models.FrameChangeDetector import FrameChangeDetector
+
+
+def encode(image):
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+class TestFrameChangeDetector(unittest.TestCase):
+    def setUp(self):
+        self.detector = FrameChangeDetector(threshold=3, max_age=60)
+        self.image = cv2.imread("app/tests/resources/images/sample.jpg")
+
+    def test_signature_is_small_grayscale(self):
+        signature = self.detector.signature(encode(self.image))
+        self.assertEqual(signature.shape, (32, 32))
+
+    def test_signature_of_invalid_data(self):
+        self.assertIsNone(self.detector.signature(b"not a jpeg"))
+
+    def test_first_frame_is_never_reused(self):
+        signature = self.detector.signature(encode(self.image))
+        self.assertFalse(self.detector.is_unchanged(signature))
+
+    def test_same_scene_is_unchanged(self):
+        self.detector.remember(self.detector.signature(encode(self.image)))
+        noisy = cv2.add(self.image, np.full_like(self.image, 1))
+        self.assertTrue(
+            self.detector.is_unchanged(self.detector.signature(encode(noisy)))
+        )
+
+    def test_changed_scene(self):
+        self.detector.remember(self.detector.signature(encode(self.image)))
+        changed = self.image.copy()
+        height, width = changed.shape[:2]
+        changed[: height // 2, : width // 2] = 255
+        self.assertFalse(
+            self.detector.is_unchanged(self.detector.signature(encode(changed)))
+        )
+
+    def test_max_age_forces_inference(self):
+        detector = FrameChangeDetector(threshold=3, max_age=0)
+        signature = detector.signature(encode(self.image))
+        detector.remember(signature)
+        self.assertFalse(detector.is_unchanged(signature))
+
+    def test_reset(self):
+        signature = self.detector.signature(encode(self.image))
+        self.detector.remember(signature)
+        self.detector.reset()
+        self.assertFalse(self.detector.is_unchanged(signature))
+        self.assertIsNone(self.detector.difference(signature))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import csv
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from app.backend.models.ImageArchiver import INDEX_FILE, ImageArchiver
+
+NOW = datetime(2026, 10, 18, 12, 30, 5, 123456, tzinfo=timezone.utc)
+OK = {"classification": "ok", "confidence-score": 0.91}
+NOK = {"classification": "nok", "confidence-score": 0.77}
+
+
+def jpeg(n, size=100):
+    return bytes([n % 256]) * size
+
+
+class TestImageArchiver(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_archiver(self, **kwargs):
+        kwargs.setdefault("max_bytes", 10**6)
+        kwargs.setdefault("max_age_days", 3650)
+        kwargs.setdefault("sample_every", 1)
+        kwargs.setdefault("reject_classes", ["nok"])
+        return ImageArchiver(self.root, **kwargs)
+
+    def read_index(self, day="2026-10-18"):
+        with open(os.path.join(self.root, day, INDEX_FILE), newline="") as index:
+            return list(csv.DictReader(index))
+
+    def stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(directory, name), self.root)
+            for directory, _, names in os.walk(self.root)
+            for name in names
+            if name.endswith(".jpg")
+        )
+
+    async def test_images_are_sharded_by_day_and_class(self):
+        archiver = self.make_archiver()
+        path = await archiver.archive(jpeg(1), NOK, NOW)
+        prefix = os.path.join(self.root, "2026-10-18", "nok", "123005_123456_")
+        self.assertTrue(path.startswith(prefix))
+        with open(path, "rb") as image:
+            self.assertEqual(image.read(), jpeg(1))
+        entry = self.read_index()[0]
+        self.assertEqual(entry["class"], "nok")
+        self.assertEqual(float(entry["score"]), 0.77)
+        self.assertEqual(os.path.join(self.root, "2026-10-18", entry["file"]), path)
+
+    async def test_sampling_keeps_every_reject_and_one_in_n(self):
+        archiver = self.make_archiver(sample_every=3)
+        kept = [await archiver.archive(jpeg(n), OK, NOW) is not None for n in range(7)]
+        self.assertEqual(kept, [True, False, False, True, False, False, True])
+        for n in range(3):
+            self.assertIsNotNone(await archiver.archive(jpeg(10 + n), NOK, NOW))
+        self.assertEqual(archiver.stats["sampled_out"], 4)
+
+    async def test_identical_images_are_stored_once(self):
+        archiver = self.make_archiver()
+        first = await archiver.archive(jpeg(1), OK, NOW)
+        second = await archiver.archive(jpeg(1), OK, NOW + timedelta(seconds=1))
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertEqual(len(self.read_index()), 2)
+        self.assertEqual(archiver.stats["duplicates"], 1)
+
+    async def test_hashes_are_reloaded_after_a_restart(self):
+        await self.make_archiver().archive(jpeg(1), OK, NOW)
+        archiver = self.make_archiver()
+        await archiver.archive(jpeg(1), OK, NOW + timedelta(seconds=1))
+        self.assertEqual(len(self.stored_files()), 1)
+
+    async def test_size_budget_evicts_oldest_images(self):
+        archiver = self.make_archiver(max_bytes=450)
+        for n in range(4):
+            await archiver.archive(
+                jpeg(n), OK, NOW - timedelta(days=1) + timedelta(seconds=n)
+            )
+        await archiver.archive(jpeg(9), OK, NOW)
+        files = self.stored_files()
+        self.assertEqual(len(files), 4)
+        self.assertTrue(files[-1].startswith("2026-10-18"))
+        self.assertEqual(len(self.read_index("2026-10-17")), 3)
+        self.assertEqual(archiver.stats["evicted"], 1)
+
+    async def test_old_days_are_removed(self):
+        archiver = self.make_archiver(max_age_days=2)
+        now = datetime.now(timezone.utc)
+        await self.make_archiver().archive(jpeg(1), OK, now - timedelta(days=5))
+        await archiver.archive(jpeg(2), OK, now)
+        days = sorted(os.listdir(self.root))
+        self.assertEqual(days, [now.strftime("%Y-%m-%d")])
+
+    async def test_disabled_archiver_writes_nothing(self):
+        archiver = ImageArchiver(root=None)
+        if archiver.enabled:
+            self.skipTest("IMAGE_ARCHIVE_DIR is set")
+        self.assertIsNone(await archiver.archive(jpeg(1), NOK, NOW))
+
+
+if __name__ == "__main__":
+    unittest.main()
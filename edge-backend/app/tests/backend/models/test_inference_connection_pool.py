@@ -0,0 +1,135 @@
+import asyncio
+import unittest
+
+from app.backend.models.InferenceConnectionPool import (
+    ConnectionUnavailableError,
+    InferenceConnectionPool,
+    InferenceRejectedError,
+)
+
+
+class FakeConnection:
+    def __init__(self, healthy=True):
+        self.open = True
+        self.healthy = healthy
+        self.pings = 0
+
+    async def ping(self):
+        self.pings += 1
+        pong = asyncio.get_running_loop().create_future()
+        if self.healthy:
+            pong.set_result(None)
+        return pong
+
+    async def close(self):
+        self.open = False
+
+
+class FakeConnector:
+    def __init__(self):
+        self.connections = []
+        self.fail = False
+
+    async def __call__(self, route, subprotocols=None):
+        if self.fail:
+            raise OSError("connection refused")
+        connection = FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+
+class TestInferenceConnectionPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.connector = FakeConnector()
+        self.pool = InferenceConnectionPool(
+            connect=self.connector,
+            health_check_timeout=0.05,
+            min_backoff=10.0,
+        )
+
+    async def test_reuses_connection(self):
+        async with self.pool.acquire("ws://model") as first:
+            pass
+        async with self.pool.acquire("ws://model") as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(len(self.connector.connections), 1)
+
+    async def test_routes_have_separate_connections(self):
+        async with self.pool.acquire("ws://model") as model:
+            pass
+        async with self.pool.acquire("ws://saveimage") as saveimage:
+            pass
+        self.assertIsNot(model, saveimage)
+
+    async def test_error_discards_connection(self):
+        with self.assertRaises(RuntimeError):
+            async with self.pool.acquire("ws://model") as first:
+                raise RuntimeError("recv failed")
+        self.assertFalse(first.open)
+        async with self.pool.acquire("ws://model") as second:
+            pass
+        self.assertIsNot(first, second)
+
+    async def test_rejection_keeps_connection(self):
+        with self.assertRaises(InferenceRejectedError):
+            async with self.pool.acquire("ws://model") as first:
+                raise InferenceRejectedError("overloaded")
+        self.assertTrue(first.open)
+        async with self.pool.acquire("ws://model") as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(len(self.connector.connections), 1)
+
+    async def test_closed_connection_is_replaced(self):
+        async with self.pool.acquire("ws://model") as first:
+            first.open = False
+        async with self.pool.acquire("ws://model") as second:
+            pass
+        self.assertIsNot(first, second)
+
+    async def test_idle_connection_is_health_checked(self):
+        self.pool.health_check_interval = 0.0
+        async with self.pool.acquire("ws://model") as first:
+            first.healthy = False
+        async with self.pool.acquire("ws://model") as second:
+            pass
+        self.assertEqual(first.pings, 1)
+        self.assertFalse(first.open)
+        self.assertIsNot(first, second)
+
+    async def test_failed_connect_backs_off(self):
+        self.connector.fail = True
+        with self.assertRaises(OSError):
+            async with self.pool.acquire("ws://model"):
+                pass
+        self.connector.fail = False
+        with self.assertRaises(ConnectionUnavailableError):
+            async with self.pool.acquire("ws://model"):
+                pass
+        self.assertEqual(self.connector.connections, [])
+
+    async def test_reset_retires_connections(self):
+        async with self.pool.acquire("ws://model") as idle:
+            pass
+        async with self.pool.acquire("ws://model") as in_use:
+            await self.pool.reset()
+        self.assertIs(idle, in_use)
+        self.assertFalse(in_use.open)
+        async with self.pool.acquire("ws://model") as fresh:
+            pass
+        self.assertIsNot(in_use, fresh)
+
+    async def test_reset_clears_backoff(self):
+        self.connector.fail = True
+        with self.assertRaises(OSError):
+            async with self.pool.acquire("ws://model"):
+                pass
+        self.connector.fail = False
+        await self.pool.reset()
+        async with self.pool.acquire("ws://model") as connection:
+            self.assertTrue(connection.open)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.backend.models.InferenceLogJournal import ROW_BYTES, InferenceLogJournal
+from app.backend.models.InferenceLogWriter import InferenceLogWriter
+from app.sql_app import maintenance, models
+
+RESULT = {"classification": "ok", "confidence-score": 0.93}
+
+
+def make_row(log_id, created_at=None):
+    return {
+        "created_at": created_at or datetime.now(timezone.utc),
+        "id": log_id,
+        "class_name": "ok",
+        "score": 0.9,
+        "model_name": "modelo.zip",
+        "camera_id": 0,
+    }
+
+
+class TestInferenceLogJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "journal", "logs.db")
+        self.journals = []
+
+    def tearDown(self):
+        for journal in self.journals:
+            journal.close()
+        self.directory.cleanup()
+
+    def open_journal(self, **kwargs):
+        journal = InferenceLogJournal(self.path, **kwargs)
+        self.journals.append(journal)
+        return journal
+
+    def test_rows_survive_a_restart(self):
+        journal = self.open_journal()
+        journal.append(make_row(1))
+        journal.append(make_row(2))
+        journal.close()
+        self.journals.remove(journal)
+        reopened = self.open_journal()
+        self.assertEqual(reopened.pending, 2)
+        rows = [row for _, row in reopened.read(10)]
+        self.assertEqual([row["id"] for row in rows], [1, 2])
+        self.assertIsNotNone(rows[0]["created_at"].tzinfo)
+
+    def test_acknowledged_rows_are_removed(self):
+        journal = self.open_journal()
+        for log_id in range(5):
+            journal.append(make_row(log_id))
+        entries = journal.read(3)
+        journal.acknowledge(entries[-1][0])
+        self.assertEqual(journal.pending, 2)
+        self.assertEqual([row["id"] for _, row in journal.read(10)], [3, 4])
+
+    def test_disk_budget_drops_oldest_rows(self):
+        journal = self.open_journal(max_bytes=3 * ROW_BYTES)
+        for log_id in range(5):
+            journal.append(make_row(log_id))
+        self.assertEqual(journal.pending, 3)
+        self.assertEqual(journal.dropped, 2)
+        self.assertEqual([row["id"] for _, row in journal.read(10)], [2, 3, 4])
+
+    def test_append_is_fast(self):
+        journal = self.open_journal()
+        start = time.perf_counter()
+        for log_id in range(200):
+            journal.append(make_row(log_id))
+        self.assertLess((time.perf_counter() - start) / 200, 0.005)
+
+
+class TestInferenceLogWriterJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.directory.name, 'logs.db')}"
+        )
+        models.Base.metadata.create_all(self.engine)
+        self.sessions = sessionmaker(bind=self.engine)
+        self.journal = InferenceLogJournal(
+            os.path.join(self.directory.name, "journal.db")
+        )
+        self.writer = InferenceLogWriter(
+            self.sessions, batch_size=2, flush_interval_ms=20, journal=self.journal
+        )
+
+    def tearDown(self):
+        self.writer.close()
+        self.journal.close()
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def count_rows(self):
+        with self.sessions() as db:
+            return db.scalar(select(func.count()).select_from(models.Inferencia))
+
+    def wait_for_rows(self, expected, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.count_rows() != expected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.count_rows()
+
+    def test_rows_wait_in_the_journal_while_the_database_is_down(self):
+        with patch(
+            "app.sql_app.crud.create_inference_logs",
+            side_effect=OSError("connection refused"),
+        ):
+            for _ in range(5):
+                self.writer.add(RESULT)
+            time.sleep(0.1)
+            self.assertEqual(self.journal.pending, 5)
+        self.assertEqual(self.wait_for_rows(5), 5)
+        self.assertEqual(self.journal.pending, 0)
+
+    def test_rows_left_by_a_previous_run_are_written(self):
+        self.journal.append(make_row(1))
+        self.journal.append(make_row(2))
+        self.writer.start()
+        self.assertEqual(self.wait_for_rows(2), 2)
+
+    def test_rewritten_batch_is_not_duplicated(self):
+        row = make_row(42)
+        self.journal.append(row)
+        self.writer.flush()
+        self.journal.append(row)
+        self.writer.flush()
+        self.assertEqual(self.count_rows(), 1)
+
+    def test_close_writes_pending_rows_and_closes_the_journal(self):
+        self.writer.add(RESULT)
+        self.writer.close()
+        self.assertEqual(self.count_rows(), 1)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            self.journal.read(1)
+
+    def test_late_rows_rewind_the_rollups(self):
+        now = datetime.now(timezone.utc)
+        with self.engine.begin() as connection:
+            maintenance.set_watermark(connection, maintenance.ROLLUP_TASK, now)
+        late = now - timedelta(hours=2)
+        self.journal.append(make_row(7, created_at=late))
+        self.writer.flush()
+        with self.engine.connect() as connection:
+            watermark = maintenance.get_watermark(connection, maintenance.ROLLUP_TASK)
+        self.assertEqual(watermark, maintenance.floor_minute(late))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,291 @@
+import csv
+import gzip
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.backend.models.InferenceLogMaintenance import InferenceLogMaintenance
+from app.sql_app import crud, maintenance, models
+
+NOW = datetime(2026, 10, 18, 12, 30, 20, tzinfo=timezone.utc)
+
+
+class TestInferenceLogMaintenance(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.directory.name, 'logs.db')}"
+        )
+        models.Base.metadata.create_all(self.engine)
+        self.sessions = sessionmaker(bind=self.engine)
+        with self.sessions() as db:
+            self.classes = crud.get_lookup_ids(
+                db, models.ClasseInferencia, ["ok", "nok"]
+            )
+            self.model_id = crud.get_lookup_ids(
+                db, models.ModeloInferencia, ["modelo.zip"]
+            )["modelo.zip"]
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def make_maintenance(self, **kwargs):
+        kwargs.setdefault("retention_days", 7)
+        kwargs.setdefault("rollup_retention_days", 30)
+        kwargs.setdefault("archive_dir", "")
+        kwargs.setdefault("rollup_delay", 60)
+        return InferenceLogMaintenance(self.engine, **kwargs)
+
+    def add_logs(self, *logs):
+        rows = [
+            {
+                "created_at": created_at,
+                "id": crud.next_inference_log_id(),
+                "class_id": self.classes[class_name],
+                "score": score,
+                "model_id": self.model_id,
+                "camera_id": 0,
+            }
+            for created_at, class_name, score in logs
+        ]
+        with self.sessions() as db:
+            crud.create_inference_logs(db, rows)
+
+    def count(self, model):
+        with self.sessions() as db:
+            return db.scalar(select(func.count()).select_from(model))
+
+    def rollups(self):
+        with self.sessions() as db:
+            return db.scalars(
+                select(models.InferenciaMinuto).order_by(
+                    models.InferenciaMinuto.bucket, models.InferenciaMinuto.class_id
+                )
+            ).all()
+
+    def test_rollup_aggregates_each_minute_and_class(self):
+        minute = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+        self.add_logs(
+            (minute + timedelta(seconds=1), "ok", 0.9),
+            (minute + timedelta(seconds=30), "ok", 0.7),
+            (minute + timedelta(seconds=59), "nok", 1.0),
+            (minute + timedelta(seconds=61), "ok", 0.52),
+        )
+        with self.engine.begin() as connection:
+            written = maintenance.rollup_minutes(
+                connection, minute, minute + timedelta(minutes=2)
+            )
+        self.assertEqual(written, 3)
+        first_ok, first_nok, second_ok = sorted(
+            self.rollups(),
+            key=lambda row: (row.bucket, row.class_id != self.classes["ok"]),
+        )
+        self.assertEqual(maintenance.as_utc(first_ok.bucket), minute)
+        self.assertEqual(first_ok.count, 2)
+        self.assertAlmostEqual(first_ok.score_sum, 1.6, places=5)
+        self.assertAlmostEqual(first_ok.score_min, 0.7, places=5)
+        self.assertAlmostEqual(first_ok.score_max, 0.9, places=5)
+        self.assertEqual(first_ok.score_histogram[14], 1)
+        self.assertEqual(first_ok.score_histogram[18], 1)
+        self.assertEqual(first_nok.score_histogram[-1], 1)
+        self.assertEqual(
+            maintenance.as_utc(second_ok.bucket), minute + timedelta(minutes=1)
+        )
+        self.assertEqual(second_ok.score_histogram[10], 1)
+
+    def test_run_rolls_up_closed_minutes_once(self):
+        self.add_logs(
+            (NOW - timedelta(minutes=5), "ok", 0.9),
+            (NOW - timedelta(minutes=4), "ok", 0.8),
+            (NOW - timedelta(seconds=10), "ok", 0.8),
+        )
+        job = self.make_maintenance()
+        job.run_once(NOW)
+        self.assertEqual(sum(row.count for row in self.rollups()), 2)
+        job.run_once(NOW)
+        self.assertEqual(sum(row.count for row in self.rollups()), 2)
+        job.run_once(NOW + timedelta(minutes=2))
+        self.assertEqual(sum(row.count for row in self.rollups()), 3)
+        with self.engine.connect() as connection:
+            watermark = maintenance.get_watermark(connection, maintenance.ROLLUP_TASK)
+        self.assertEqual(watermark, datetime(2026, 10, 18, 12, 31, tzinfo=timezone.utc))
+
+    def test_long_gaps_are_rolled_up_in_chunks(self):
+        self.add_logs(
+            (NOW - timedelta(hours=5), "ok", 0.9),
+            (NOW - timedelta(hours=1), "nok", 0.6),
+        )
+        self.make_maintenance(rollup_chunk=timedelta(minutes=30)).run_once(NOW)
+        self.assertEqual(len(self.rollups()), 2)
+
+    def test_retention_removes_old_days_and_keeps_rollups(self):
+        self.add_logs(
+            (NOW - timedelta(days=10), "ok", 0.9),
+            (NOW - timedelta(days=9), "nok", 0.4),
+            (NOW - timedelta(days=1), "ok", 0.8),
+        )
+        result = self.make_maintenance().run_once(NOW)
+        self.assertEqual(result["days_removed"], [date(2026, 10, 8), date(2026, 10, 9)])
+        self.assertEqual(self.count(models.Inferencia), 1)
+        self.assertEqual(len(self.rollups()), 3)
+
+    def test_expired_logs_are_archived(self):
+        archive_dir = os.path.join(self.directory.name, "arquivo")
+        self.add_logs(
+            (NOW - timedelta(days=10), "ok", 0.9),
+            (NOW - timedelta(days=10), "nok", 0.4),
+        )
+        self.make_maintenance(archive_dir=archive_dir).run_once(NOW)
+        path = os.path.join(archive_dir, "logsinferencia_20261008.csv.gz")
+        with gzip.open(path, "rt", newline="") as archive:
+            rows = list(csv.reader(archive))
+        self.assertEqual(rows[0], list(crud.INFERENCE_LOG_COLUMNS))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(self.count(models.Inferencia), 0)
+
+    def test_logs_not_rolled_up_are_kept(self):
+        self.add_logs((NOW - timedelta(days=10), "ok", 0.9))
+        self.make_maintenance().enforce_retention(NOW)
+        self.assertEqual(self.count(models.Inferencia), 1)
+
+    def test_old_rollups_are_removed(self):
+        self.add_logs(
+            (NOW - timedelta(days=40), "ok", 0.9), (NOW - timedelta(days=2), "ok", 0.9)
+        )
+        self.make_maintenance().run_once(NOW)
+        self.assertEqual(len(self.rollups()), 1)
+
+    def test_partitions_are_postgresql_only(self):
+        with self.engine.begin() as connection:
+            self.assertEqual(
+                maintenance.ensure_partitions(
+                    connection, date(2026, 10, 18), date(2026, 10, 20)
+                ),
+                [],
+            )
+        self.assertEqual(
+            maintenance.partition_name(date(2026, 10, 8)), "logsinferencia_p20261008"
+        )
+
+    def test_legacy_table_is_kept_aside(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE logsinferencia (id INTEGER PRIMARY KEY, "
+                    "accuracy_predicted VARCHAR, class_predicted VARCHAR, created_at DATETIME)"
+                )
+            )
+        maintenance.prepare_inference_log_storage(engine)
+        models.Base.metadata.create_all(engine)
+        tables = inspect(engine).get_table_names()
+        self.assertIn(maintenance.LEGACY_TABLE, tables)
+        columns = {
+            column["name"] for column in inspect(engine).get_columns("logsinferencia")
+        }
+        self.assertIn("class_id", columns)
+
+    def make_legacy_engine(self, *rows):
+        engine = create_engine(
+            f"sqlite:///{os.path.join(self.directory.name, 'legado.db')}"
+        )
+        self.addCleanup(engine.dispose)
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE logsinferencia (id INTEGER PRIMARY KEY, "
+                    "accuracy_predicted VARCHAR, class_predicted VARCHAR, created_at DATETIME)"
+                )
+            )
+            for class_predicted, accuracy_predicted, created_at in rows:
+                connection.execute(
+                    text(
+                        "INSERT INTO logsinferencia (accuracy_predicted, class_predicted, "
+                        "created_at) VALUES (:accuracy, :class_name, :created_at)"
+                    ),
+                    {
+                        "accuracy": accuracy_predicted,
+                        "class_name": class_predicted,
+                        "created_at": created_at,
+                    },
+                )
+        maintenance.prepare_inference_log_storage(engine)
+        models.Base.metadata.create_all(engine)
+        return engine
+
+    def test_legacy_logs_are_moved_and_rolled_up(self):
+        minute = datetime(2026, 10, 17, 8, 15)
+        engine = self.make_legacy_engine(
+            ("ok", "0.9", minute),
+            ("nok", "0.25", minute),
+            ("ok", "0.7", minute + timedelta(minutes=1)),
+        )
+        job = InferenceLogMaintenance(
+            engine, archive_dir="", rollup_delay=60, legacy_batch=2
+        )
+        with engine.begin() as connection:
+            maintenance.set_watermark(connection, maintenance.ROLLUP_TASK, NOW)
+
+        result = job.run_once(NOW)
+
+        self.assertEqual(result["legacy_logs_moved"], 3)
+        self.assertNotIn(maintenance.LEGACY_TABLE, inspect(engine).get_table_names())
+        with sessionmaker(bind=engine)() as db:
+            classes = dict(
+                db.execute(
+                    select(models.ClasseInferencia.id, models.ClasseInferencia.name)
+                ).all()
+            )
+            model = db.scalar(select(models.ModeloInferencia.name))
+            logs = db.scalars(
+                select(models.Inferencia).order_by(models.Inferencia.id)
+            ).all()
+            rollups = db.scalars(select(models.InferenciaMinuto)).all()
+        self.assertEqual(model, crud.UNKNOWN_MODEL)
+        self.assertEqual(
+            [(classes[log.class_id], round(log.score, 5)) for log in logs],
+            [("ok", 0.9), ("nok", 0.25), ("ok", 0.7)],
+        )
+        self.assertEqual(len({log.id for log in logs}), 3)
+        self.assertEqual(
+            maintenance.as_utc(logs[0].created_at), maintenance.as_utc(minute)
+        )
+        self.assertEqual(sum(row.count for row in rollups), 3)
+        self.assertEqual(len(rollups), 3)
+
+    def test_unreadable_legacy_logs_are_kept(self):
+        minute = datetime(2026, 10, 17, 8, 15)
+        engine = self.make_legacy_engine(
+            ("ok", "0.9", minute),
+            (None, "0.5", minute),
+            ("ok", "alta", minute),
+        )
+        job = InferenceLogMaintenance(engine, archive_dir="", rollup_delay=60)
+
+        self.assertEqual(job.move_legacy_logs(NOW), 1)
+        self.assertEqual(job.move_legacy_logs(NOW), 0)
+        with engine.connect() as connection:
+            kept = connection.execute(
+                text(
+                    "SELECT class_predicted, accuracy_predicted "
+                    f"FROM {maintenance.LEGACY_TABLE} ORDER BY id"
+                )
+            ).all()
+        self.assertEqual([tuple(row) for row in kept], [(None, "0.5"), ("ok", "alta")])
+
+    def test_legacy_log_ids_are_unique_and_time_ordered(self):
+        moment = datetime(2026, 10, 17, 8, 15, tzinfo=timezone.utc)
+        first = maintenance.legacy_log_id(moment, 0)
+        second = maintenance.legacy_log_id(moment, first)
+        self.assertEqual(first >> 8, int(moment.timestamp() * 1_000_000))
+        self.assertEqual(second >> 8, (first >> 8) + 1)
+        self.assertEqual(second & 0xFF, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.backend.models.InferenceLogWriter import InferenceLogWriter
+from app.sql_app import crud, models
+
+RESULT = {"classification": "ok", "confidence-score": 0.93}
+
+
+class TestInferenceLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.directory.name, 'logs.db')}"
+        )
+        models.Base.metadata.create_all(self.engine)
+        self.sessions = sessionmaker(bind=self.engine)
+        self.writer = None
+
+    def tearDown(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def make_writer(self, **kwargs):
+        kwargs.setdefault("batch_size", 10)
+        kwargs.setdefault("flush_interval_ms", 60000)
+        self.writer = InferenceLogWriter(self.sessions, **kwargs)
+        return self.writer
+
+    def count_rows(self):
+        with self.sessions() as db:
+            return db.scalar(select(func.count()).select_from(models.Inferencia))
+
+    def wait_for_rows(self, expected, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.count_rows() != expected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.count_rows()
+
+    def test_rows_wait_for_a_full_batch(self):
+        writer = self.make_writer()
+        for _ in range(9):
+            writer.add(RESULT)
+        time.sleep(0.05)
+        self.assertEqual(self.count_rows(), 0)
+        writer.add(RESULT)
+        self.assertEqual(self.wait_for_rows(10), 10)
+        self.assertEqual(writer.pending, 0)
+
+    def test_flush_after_interval(self):
+        writer = self.make_writer(flush_interval_ms=50)
+        writer.add(RESULT)
+        self.assertEqual(self.wait_for_rows(1), 1)
+
+    def test_close_flushes_buffered_rows(self):
+        writer = self.make_writer()
+        for _ in range(3):
+            writer.add(RESULT)
+        writer.close()
+        self.assertEqual(self.count_rows(), 3)
+
+    def test_rows_keep_their_values(self):
+        writer = self.make_writer(camera_id=3)
+        writer.add(RESULT, "modelo.zip")
+        writer.flush()
+        with self.sessions() as db:
+            row = db.scalars(select(models.Inferencia)).one()
+            class_name = db.get(models.ClasseInferencia, row.class_id).name
+            model_name = db.get(models.ModeloInferencia, row.model_id).name
+        self.assertEqual(class_name, "ok")
+        self.assertEqual(model_name, "modelo.zip")
+        self.assertAlmostEqual(row.score, 0.93, places=6)
+        self.assertEqual(row.camera_id, 3)
+        self.assertEqual(row.id & 0xFF, 3)
+        self.assertIsNotNone(row.created_at)
+
+    def test_class_names_share_lookup_rows(self):
+        writer = self.make_writer()
+        writer.add(RESULT)
+        writer.add({"classification": "nok", "confidence-score": 0.6})
+        writer.flush()
+        writer.add(RESULT)
+        writer.flush()
+        with self.sessions() as db:
+            names = db.scalars(select(models.ClasseInferencia.name)).all()
+            ids = db.scalars(select(models.Inferencia.id)).all()
+        self.assertEqual(sorted(names), ["nok", "ok"])
+        self.assertEqual(len(set(ids)), 3)
+
+    def test_batch_is_a_single_insert(self):
+        writer = self.make_writer()
+        for _ in range(5):
+            writer.add(RESULT)
+        with patch(
+            "app.sql_app.crud.create_inference_logs", wraps=crud.create_inference_logs
+        ) as create_logs:
+            writer.flush()
+        create_logs.assert_called_once()
+        self.assertEqual(len(create_logs.call_args.args[1]), 5)
+
+    def test_failed_flush_keeps_rows(self):
+        writer = self.make_writer(batch_size=2, flush_interval_ms=20)
+        with patch(
+            "app.sql_app.crud.create_inference_logs", side_effect=OSError("disk full")
+        ):
+            writer.add(RESULT)
+            writer.add(RESULT)
+            time.sleep(0.1)
+            self.assertEqual(writer.pending, 2)
+        self.assertEqual(self.wait_for_rows(2), 2)
+
+    def test_buffer_is_bounded(self):
+        writer = self.make_writer(batch_size=100, max_buffer=3)
+        for _ in range(5):
+            writer.add(RESULT)
+        self.assertEqual(writer.pending, 3)
+        self.assertEqual(writer.dropped, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import unittest
+
+from app.backend.models.InferenceScheduler import InferenceScheduler
+from app.backend.models.PipelineMetrics import PipelineMetrics
+
+
+class FakePipeline:
+    def __init__(self, frames=6, delay=0.02):
+        self.frames = frames
+        self.delay = delay
+        self.prepared = 0
+        self.published = []
+        self.active = {"prepare": 0, "infer": 0, "publish": 0}
+        self.max_overlap = 0
+        self.fail_on = None
+
+    def running(self):
+        return self.prepared < self.frames
+
+    async def _stage(self, name):
+        self.active[name] += 1
+        self.max_overlap = max(
+            self.max_overlap, sum(1 for v in self.active.values() if v)
+        )
+        await asyncio.sleep(self.delay)
+        self.active[name] -= 1
+
+    async def prepare(self):
+        self.prepared += 1
+        await self._stage("prepare")
+        return self.prepared
+
+    async def infer(self, frame):
+        await self._stage("infer")
+        if frame == self.fail_on:
+            raise RuntimeError("inference failed")
+        return {"frame": frame}
+
+    async def publish(self, result):
+        await self._stage("publish")
+        self.published.append(result["frame"])
+
+
+class TestInferenceScheduler(unittest.IsolatedAsyncioTestCase):
+    def scheduler(self, pipeline, **kwargs):
+        kwargs.setdefault("target_fps", 0)
+        kwargs.setdefault("max_in_flight", 3)
+        return InferenceScheduler(
+            pipeline.prepare, pipeline.infer, pipeline.publish, **kwargs
+        )
+
+    async def test_stages_overlap_and_keep_order(self):
+        pipeline = FakePipeline()
+        await self.scheduler(pipeline).run(pipeline.running)
+        self.assertEqual(pipeline.published, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(pipeline.max_overlap, 3)
+
+    async def test_pipeline_is_faster_than_sequential(self):
+        pipeline = FakePipeline(frames=10, delay=0.02)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await self.scheduler(pipeline).run(pipeline.running)
+        # Sequentially this would take 10 * 3 * 20 ms = 600 ms.
+        self.assertLess(loop.time() - start, 0.45)
+
+    async def test_single_slot_runs_sequentially(self):
+        pipeline = FakePipeline(frames=3)
+        await self.scheduler(pipeline, max_in_flight=1).run(pipeline.running)
+        self.assertEqual(pipeline.published, [1, 2, 3])
+        self.assertEqual(pipeline.max_overlap, 1)
+
+    async def test_failed_frame_is_skipped(self):
+        pipeline = FakePipeline(frames=4)
+        pipeline.fail_on = 2
+        metrics = PipelineMetrics(enabled=True)
+        await self.scheduler(pipeline, metrics=metrics).run(pipeline.running)
+        self.assertEqual(pipeline.published, [1, 3, 4])
+        summary = metrics.summary()
+        self.assertEqual(summary["frames"]["failed"], 1)
+        self.assertEqual(summary["stages"]["total"]["count"], 3)
+
+    async def test_failed_inference_backs_off(self):
+        pipeline = FakePipeline(frames=1000, delay=0.001)
+        attempts = []
+
+        async def failing_infer(frame):
+            attempts.append(frame)
+            raise ConnectionError("inference service unavailable")
+
+        scheduler = InferenceScheduler(
+            pipeline.prepare, failing_infer, pipeline.publish, target_fps=0
+        )
+        task = asyncio.ensure_future(scheduler.run(pipeline.running))
+        await asyncio.sleep(0.25)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        # Without a pause each attempt would take about a millisecond.
+        self.assertLessEqual(len(attempts), 3)
+        self.assertEqual(pipeline.published, [])
+
+    async def test_target_rate_is_respected(self):
+        pipeline = FakePipeline(frames=5, delay=0.001)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await self.scheduler(pipeline, target_fps=50).run(pipeline.running)
+        self.assertGreaterEqual(loop.time() - start, 0.08)
+
+    async def test_missed_target_is_reported(self):
+        pipeline = FakePipeline(frames=4, delay=0.03)
+        metrics = PipelineMetrics(enabled=True)
+        scheduler = self.scheduler(
+            pipeline, target_fps=100, max_in_flight=1, metrics=metrics
+        )
+        await scheduler.run(pipeline.running)
+        self.assertGreater(scheduler.missed, 0)
+        self.assertEqual(metrics.summary()["frames"]["late"], scheduler.missed)
+
+    async def test_no_new_frame_is_not_published(self):
+        pipeline = FakePipeline(frames=3)
+        prepare = pipeline.prepare
+
+        async def prepare_with_gaps():
+            frame = await prepare()
+            return None if frame == 2 else frame
+
+        scheduler = InferenceScheduler(
+            prepare_with_gaps, pipeline.infer, pipeline.publish, target_fps=0
+        )
+        await scheduler.run(pipeline.running)
+        self.assertEqual(pipeline.published, [1, 3])
+
+    async def test_cancel_stops_every_stage(self):
+        pipeline = FakePipeline(frames=1000)
+        task = asyncio.ensure_future(self.scheduler(pipeline).run(pipeline.running))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        published = len(pipeline.published)
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(pipeline.published), published)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -34,6 +34,11 @@ class TestModelHandler(unittest.TestCase):
         self.handler.loaded_model_type = ModelType.KERAS
         self.assertFalse(self.handler.check_is_local_model())
 
+    def test_load_model_type_bumps_version(self):
+        self.handler.load_model_type(ModelType.KERAS)
+        self.handler.load_model_type(ModelType.KERAS)
+        self.assertEqual(self.handler.model_version, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from asyncua.ua import VariantType
+
+from app.backend.models.OPC import OPCUA
+
+
+def make_client(*args, **kwargs):
+    client = MagicMock()
+    client.connect = AsyncMock()
+    client.disconnect = AsyncMock()
+    client.check_connection = AsyncMock()
+    client.write_values = AsyncMock()
+    client.get_node = MagicMock(side_effect=lambda node_id: f"node:{node_id}")
+    return client
+
+
+@patch("app.backend.models.OPC.Client", side_effect=make_client)
+class TestOPCUA(unittest.IsolatedAsyncioTestCase):
+    predictions = {"classification": "ok", "confidence-score": "0.9"}
+
+    async def test_session_is_reused(self, _):
+        opcua = OPCUA()
+        client = opcua.client
+        await opcua.send_values_OPC(self.predictions)
+        await opcua.send_values_OPC(self.predictions)
+        client.connect.assert_awaited_once()
+        client.disconnect.assert_not_awaited()
+        self.assertEqual(client.write_values.await_count, 2)
+
+    async def test_values_are_written_in_one_request(self, _):
+        opcua = OPCUA()
+        await opcua.send_values_OPC(self.predictions)
+        nodes, values = opcua.client.write_values.await_args.args
+        self.assertEqual(
+            nodes, ["node:ns=1;s=classePrevista", "node:ns=1;s=valorPrevisto"]
+        )
+        self.assertEqual(values[0].Value.Value, "ok")
+        self.assertEqual(values[1].Value.VariantType, VariantType.Float)
+
+    async def test_node_handles_are_cached(self, _):
+        opcua = OPCUA()
+        await opcua.send_values_OPC(self.predictions)
+        await opcua.send_values_OPC(self.predictions)
+        self.assertEqual(opcua.client.get_node.call_count, 2)
+
+    async def test_lost_session_reconnects(self, _):
+        opcua = OPCUA()
+        await opcua.send_values_OPC(self.predictions)
+        first = opcua.client
+        first.check_connection.side_effect = ConnectionError("watchdog")
+        await opcua.send_values_OPC(self.predictions)
+        first.disconnect.assert_awaited_once()
+        self.assertIsNot(opcua.client, first)
+        opcua.client.connect.assert_awaited_once()
+        opcua.client.write_values.assert_awaited_once()
+
+    async def test_failed_connect_backs_off(self, _):
+        opcua = OPCUA()
+        opcua.client.connect.side_effect = OSError("refused")
+        await opcua.send_values_OPC(self.predictions)
+        await opcua.send_values_OPC(self.predictions)
+        opcua.client.connect.assert_not_awaited()
+        self.assertEqual(opcua._failures, 1)
+
+    async def test_close_disconnects(self, _):
+        opcua = OPCUA()
+        await opcua.send_values_OPC(self.predictions)
+        client = opcua.client
+        await opcua.close()
+        client.disconnect.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
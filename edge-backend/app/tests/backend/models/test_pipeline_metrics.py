@@ -0,0 +1,91 @@
+import unittest
+
+from app.backend.models.PipelineMetrics import Histogram, PipelineMetrics
+
+
+class TestHistogram(unittest.TestCase):
+    def test_observe(self):
+        histogram = Histogram(buckets=(0.01, 0.1))
+        for seconds in (0.005, 0.05, 0.05, 0.5):
+            histogram.observe(seconds)
+        self.assertEqual(histogram.counts, [1, 2, 1])
+        self.assertEqual(histogram.cumulative_counts(), [1, 3, 4])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 0.605)
+        self.assertEqual(histogram.max, 0.5)
+
+    def test_bound_is_inclusive(self):
+        histogram = Histogram(buckets=(0.01, 0.1))
+        histogram.observe(0.01)
+        self.assertEqual(histogram.counts, [1, 0, 0])
+
+    def test_quantile(self):
+        histogram = Histogram(buckets=(0.01, 0.1))
+        for _ in range(10):
+            histogram.observe(0.05)
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.03)
+        self.assertLessEqual(histogram.quantile(0.99), 0.05)
+        self.assertIsNone(Histogram().quantile(0.5))
+
+
+class TestPipelineMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = PipelineMetrics(enabled=True)
+
+    def test_timer_records_stage(self):
+        with self.metrics.time("encode"):
+            pass
+        self.assertEqual(self.metrics.summary()["stages"]["encode"]["count"], 1)
+
+    def test_timer_records_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.metrics.time("inference"):
+                raise ValueError
+        self.assertEqual(self.metrics.summary()["stages"]["inference"]["count"], 1)
+
+    def test_frame_counters(self):
+        self.metrics.count_frame("captured", 3)
+        self.metrics.count_frame("reused")
+        frames = self.metrics.summary()["frames"]
+        self.assertEqual(frames["captured"], 3)
+        self.assertEqual(frames["reused"], 1)
+        self.assertEqual(frames["failed"], 0)
+
+    def test_disabled_records_nothing(self):
+        metrics = PipelineMetrics(enabled=False)
+        with metrics.time("encode"):
+            pass
+        metrics.count_frame("captured")
+        summary = metrics.summary()
+        self.assertEqual(summary["stages"], {})
+        self.assertEqual(summary["frames"]["captured"], 0)
+
+    def test_render_prometheus(self):
+        self.metrics.observe("db_log", 0.002)
+        self.metrics.count_frame("inferred")
+        text = self.metrics.render_prometheus()
+        self.assertIn("# TYPE edge_stage_duration_seconds histogram", text)
+        self.assertIn(
+            'edge_stage_duration_seconds_bucket{stage="db_log",le="0.001"} 0', text
+        )
+        self.assertIn(
+            'edge_stage_duration_seconds_bucket{stage="db_log",le="0.0025"} 1', text
+        )
+        self.assertIn(
+            'edge_stage_duration_seconds_bucket{stage="db_log",le="+Inf"} 1', text
+        )
+        self.assertIn('edge_stage_duration_seconds_count{stage="db_log"} 1', text)
+        self.assertIn('edge_frames_total{event="inferred"} 1', text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_reset(self):
+        self.metrics.observe("crop", 0.001)
+        self.metrics.count_frame("captured")
+        self.metrics.reset()
+        summary = self.metrics.summary()
+        self.assertEqual(summary["stages"], {})
+        self.assertEqual(summary["frames"]["captured"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
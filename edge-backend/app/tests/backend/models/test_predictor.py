@@ -0,0 +1,168 @@
+import json
+import time
+import unittest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock, patch
+
+import cv2
+import numpy as np
+
+from app.backend.models.FrameBuffer import FrameRecord
+from app.backend.models.Predictor import PredictionResult, Predictor
+from app.backend.services.frame_protocol import FRAME_SUBPROTOCOL
+
+PREDICTION = {"classification": "ok", "confidence-score": 0.9}
+
+
+class StubConnection:
+    def __init__(self):
+        self.subprotocol = FRAME_SUBPROTOCOL
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def recv(self):
+        return json.dumps(PREDICTION)
+
+
+class StubConnectionPool:
+    def __init__(self):
+        self.connection = StubConnection()
+        self.routes = []
+        self.resets = 0
+
+    @asynccontextmanager
+    async def acquire(self, route):
+        self.routes.append(route)
+        yield self.connection
+
+    async def reset(self):
+        self.resets += 1
+
+    async def close(self):
+        pass
+
+
+class StubDispatcher:
+    def __init__(self):
+        self.results = []
+
+    def dispatch(self, result):
+        self.results.append(result)
+
+    async def close(self):
+        pass
+
+
+def make_frame(seq=0, value=120):
+    image = np.full((48, 64, 3), value, dtype=np.uint8)
+    jpeg = cv2.imencode(".jpg", image)[1].tobytes()
+    return FrameRecord(seq, time.monotonic(), None, jpeg)
+
+
+class TestPredictor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patches = {
+            "OPCUA": Mock(),
+            "model_handler": Mock(model_version=1),
+            "file_handler": Mock(model_name="model.tflite"),
+            "filter": Mock(compare_results=lambda predictions: dict(predictions)),
+            "image_archiver": Mock(enabled=True, archive=AsyncMock()),
+            "inference_log_writer": Mock(),
+            "stream": Mock(),
+        }
+        for name, value in patches.items():
+            patcher = patch(f"app.backend.models.Predictor.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.model_handler = patches["model_handler"]
+        self.model_handler.get_classification_route.return_value = "ws://model"
+        self.image_archiver = patches["image_archiver"]
+        self.inference_log_writer = patches["inference_log_writer"]
+        self.stream = patches["stream"]
+
+        self.predictor = Predictor()
+        self.pool = StubConnectionPool()
+        self.dispatcher = StubDispatcher()
+        self.predictor.connection_pool = self.pool
+        self.predictor.dispatcher = self.dispatcher
+
+    def prepare(self, frame):
+        return frame, self.predictor.change_detector.signature(frame.jpeg)
+
+    async def test_unchanged_frame_reuses_the_last_inference(self):
+        self.stream.get_frame_jpeg.return_value = make_frame()
+
+        first = await self.predictor._infere_and_save(reuse_unchanged=True)
+        second = await self.predictor._infere_and_save(reuse_unchanged=True)
+
+        self.assertFalse(first["reused"])
+        self.assertTrue(second["reused"])
+        self.assertEqual(second["classification"], first["classification"])
+        self.assertEqual(len(self.pool.connection.sent), 1)
+        self.assertEqual(self.pool.routes, ["ws://model"])
+        self.assertEqual(
+            [result.inference["reused"] for result in self.dispatcher.results],
+            [False, True],
+        )
+
+    async def test_changed_frame_runs_the_model(self):
+        await self.predictor._infer_frame(self.prepare(make_frame(0, 20)), True)
+        result = await self.predictor._infer_frame(
+            self.prepare(make_frame(1, 220)), True
+        )
+
+        self.assertFalse(result.inference["reused"])
+        self.assertEqual(len(self.pool.connection.sent), 2)
+
+    async def test_reuse_is_only_used_when_requested(self):
+        prepared = self.prepare(make_frame())
+        await self.predictor._infer_frame(prepared)
+        result = await self.predictor._infer_frame(prepared)
+
+        self.assertFalse(result.inference["reused"])
+        self.assertEqual(len(self.pool.connection.sent), 2)
+
+    async def test_reused_results_are_not_logged_or_archived(self):
+        frame = make_frame()
+        reused = PredictionResult({**PREDICTION, "reused": True}, frame)
+
+        await self.predictor._log_result(reused)
+        await self.predictor._archive_image(reused)
+
+        self.inference_log_writer.add.assert_not_called()
+        self.image_archiver.archive.assert_not_called()
+
+    async def test_inferred_results_are_logged_and_archived(self):
+        frame = make_frame()
+        inferred = PredictionResult({**PREDICTION, "reused": False}, frame)
+
+        await self.predictor._log_result(inferred)
+        await self.predictor._archive_image(inferred)
+
+        self.inference_log_writer.add.assert_called_once_with(
+            inferred.inference, "model.tflite"
+        )
+        self.image_archiver.archive.assert_awaited_once()
+        self.assertIs(self.image_archiver.archive.await_args.args[0], frame.jpeg)
+
+    async def test_model_version_change_resets_the_detector(self):
+        prepared = self.prepare(make_frame())
+        await self.predictor._infer_frame(prepared, reuse_unchanged=True)
+
+        self.model_handler.model_version = 2
+        result = await self.predictor._infer_frame(prepared, reuse_unchanged=True)
+
+        self.assertFalse(result.inference["reused"])
+        self.assertEqual(self.pool.resets, 1)
+        self.assertEqual(len(self.pool.connection.sent), 2)
+        self.assertEqual(self.predictor._model_version, 2)
+
+        result = await self.predictor._infer_frame(prepared, reuse_unchanged=True)
+        self.assertTrue(result.inference["reused"])
+        self.assertEqual(self.pool.resets, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
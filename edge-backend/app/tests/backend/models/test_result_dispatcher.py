@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+
+from app.backend.models.PipelineMetrics import PipelineMetrics
+from app.backend.models.ResultDispatcher import ResultDispatcher
+
+
+class RecordingSink:
+    def __init__(self, failures=0, delay=0.0):
+        self.received = []
+        self.failures = failures
+        self.delay = delay
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, result):
+        await self.release.wait()
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("sink unavailable")
+        self.received.append(result)
+
+
+class TestResultDispatcher(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.metrics = PipelineMetrics(enabled=True)
+        self.dispatcher = ResultDispatcher(metrics=self.metrics)
+
+    async def asyncTearDown(self):
+        await self.dispatcher.close(timeout=1)
+
+    def sink_counters(self, name):
+        return self.metrics.summary()["sinks"][name]
+
+    async def test_delivers_to_every_sink(self):
+        first, second = RecordingSink(), RecordingSink()
+        self.dispatcher.add_sink("first", first)
+        self.dispatcher.add_sink("second", second)
+        for result in range(3):
+            self.dispatcher.dispatch(result)
+        await self.dispatcher.close()
+        self.assertEqual(first.received, [0, 1, 2])
+        self.assertEqual(second.received, [0, 1, 2])
+        self.assertEqual(self.sink_counters("first")["delivered"], 3)
+
+    async def test_slow_sink_does_not_block_others(self):
+        slow, fast = RecordingSink(), RecordingSink()
+        slow.release.clear()
+        self.dispatcher.add_sink("slow", slow)
+        self.dispatcher.add_sink("fast", fast)
+        self.dispatcher.dispatch("result")
+        await asyncio.sleep(0.01)
+        self.assertEqual(fast.received, ["result"])
+        self.assertEqual(slow.received, [])
+        self.assertEqual(self.dispatcher.queue_depths()["slow"], 0)
+        slow.release.set()
+
+    async def test_drop_oldest(self):
+        sink = RecordingSink()
+        sink.release.clear()
+        self.dispatcher.add_sink("latest", sink, max_queue=2, drop="oldest")
+        for result in range(5):
+            self.dispatcher.dispatch(result)
+        await asyncio.sleep(0)
+        sink.release.set()
+        await self.dispatcher.close()
+        self.assertEqual(sink.received, [3, 4])
+        self.assertEqual(self.sink_counters("latest")["dropped"], 3)
+
+    async def test_drop_newest(self):
+        sink = RecordingSink()
+        sink.release.clear()
+        self.dispatcher.add_sink("first", sink, max_queue=2, drop="newest")
+        for result in range(5):
+            self.dispatcher.dispatch(result)
+        await asyncio.sleep(0)
+        sink.release.set()
+        await self.dispatcher.close()
+        self.assertEqual(sink.received, [0, 1])
+        self.assertEqual(self.sink_counters("first")["dropped"], 3)
+
+    async def test_retries_then_delivers(self):
+        sink = RecordingSink(failures=2)
+        self.dispatcher.add_sink("db", sink, retries=2, retry_delay=0.001)
+        self.dispatcher.dispatch("result")
+        await self.dispatcher.close()
+        self.assertEqual(sink.received, ["result"])
+        counters = self.sink_counters("db")
+        self.assertEqual(counters["retried"], 2)
+        self.assertEqual(counters["failed"], 0)
+
+    async def test_gives_up_after_retries(self):
+        sink = RecordingSink(failures=5)
+        self.dispatcher.add_sink("db", sink, retries=1, retry_delay=0.001)
+        self.dispatcher.dispatch("lost")
+        self.dispatcher.dispatch("kept")
+        await self.dispatcher.close()
+        counters = self.sink_counters("db")
+        self.assertEqual(counters["failed"], 2)
+        self.assertEqual(counters["retried"], 2)
+        sink.failures = 0
+        self.dispatcher.dispatch("after")
+        await self.dispatcher.close()
+        self.assertEqual(sink.received, ["after"])
+
+    async def test_queue_depth_metric(self):
+        sink = RecordingSink()
+        sink.release.clear()
+        self.dispatcher.add_sink("opc", sink, max_queue=4)
+        for result in range(3):
+            self.dispatcher.dispatch(result)
+        await asyncio.sleep(0)
+        self.assertEqual(self.sink_counters("opc")["queue_depth"], 2)
+        self.assertIn(
+            'edge_sink_queue_depth{sink="opc"} 2', self.metrics.render_prometheus()
+        )
+        sink.release.set()
+
+    def test_unknown_drop_policy(self):
+        with self.assertRaises(ValueError):
+            self.dispatcher.add_sink("db", RecordingSink(), drop="random")
+
+
+if __name__ == "__main__":
+    unittest.main()
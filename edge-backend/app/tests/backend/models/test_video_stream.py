@@ -1,3 +1,6 @@
+import base64
+import os
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 
@@ -16,8 +19,7 @@ class TestStream(unittest.TestCase):
     def test_stream_initialization(self):
         self.assertFalse(self.stream.status)
         self.assertIsNone(self.stream.frame)
-        self.assertIsNone(self.stream.buffer)
-        self.assertIsNone(self.stream.predict_image)
+        self.assertEqual(self.stream.frame_buffer.latest_seq, -1)
         self.assertIsInstance(self.stream.filter_processor, FilterProcessor)
 
     @patch("cv2.VideoCapture")
@@ -56,25 +58,104 @@ class TestStream(unittest.TestCase):
     @patch("cv2.imencode")
     def test_get_frame(self, mock_imencode):
         mock_frame = np.zeros((100, 100, 3), dtype=np.uint8)
-        self.stream.frame = mock_frame
-        self.stream.filter_processor.apply_crop_predict_image.return_value = mock_frame
-        mock_imencode.return_value = (True, b"mock_encoded_image")
+        cropped_frame = np.ones((50, 50, 3), dtype=np.uint8)
+        self.stream.frame_buffer.publish(mock_frame)
+        self.stream.filter_processor.get_crop_coordinates.return_value = (0, 0, 50, 50)
+        self.stream.filter_processor.apply_crop_predict_image.return_value = (
+            cropped_frame
+        )
+        mock_imencode.return_value = (True, np.frombuffer(b"jpeg", dtype=np.uint8))
 
         result = self.stream.get_frame()
 
-        self.stream.filter_processor.apply_crop_predict_image.assert_called_once_with(
-            mock_frame
+        crop_call = self.stream.filter_processor.apply_crop_predict_image.call_args
+        np.testing.assert_array_equal(crop_call.args[0], mock_frame)
+        self.assertEqual(crop_call.args[1], (0, 0, 50, 50))
+        self.assertIs(mock_imencode.call_args.args[1], cropped_frame)
+        self.assertEqual(base64.b64decode(result), b"jpeg")
+
+    @patch("cv2.imencode")
+    def test_get_frame_is_cached_per_frame(self, mock_imencode):
+        self.stream.frame_buffer.publish(np.zeros((10, 10, 3), dtype=np.uint8))
+        self.stream.filter_processor.get_crop_coordinates.return_value = (0, 0, 5, 5)
+        self.stream.filter_processor.apply_crop_predict_image.return_value = np.zeros(
+            (5, 5, 3), dtype=np.uint8
+        )
+        mock_imencode.return_value = (True, np.frombuffer(b"jpeg", dtype=np.uint8))
+
+        first = self.stream.get_frame()
+        second = self.stream.get_frame()
+
+        self.assertIs(first, second)
+        self.stream.filter_processor.apply_crop_predict_image.assert_called_once()
+        mock_imencode.assert_called_once()
+
+        self.stream.filter_processor.get_crop_coordinates.return_value = (1, 1, 5, 5)
+        self.stream.get_frame()
+        self.assertEqual(mock_imencode.call_count, 2)
+
+        self.stream.frame_buffer.publish(np.zeros((10, 10, 3), dtype=np.uint8))
+        self.stream.get_frame()
+        self.assertEqual(mock_imencode.call_count, 3)
+
+    @patch("cv2.imencode")
+    def test_base64_is_cached_per_encoded_frame(self, mock_imencode):
+        self.stream.frame_buffer.publish(np.zeros((10, 10, 3), dtype=np.uint8))
+        self.stream.filter_processor.apply_crop_predict_image.return_value = np.zeros(
+            (5, 5, 3), dtype=np.uint8
+        )
+        mock_imencode.side_effect = [
+            (True, np.frombuffer(b"first", dtype=np.uint8)),
+            (True, np.frombuffer(b"second", dtype=np.uint8)),
+        ]
+        first = self.stream.get_frame_jpeg((0, 0, 5, 5))
+        second = self.stream.get_frame_jpeg((1, 1, 5, 5))
+
+        self.assertIs(
+            self.stream.frame_to_base64(first), self.stream.frame_to_base64(first)
         )
-        mock_imencode.assert_called_once_with(".jpg", mock_frame)
-        self.assertIsInstance(result, str)
+        self.assertEqual(
+            base64.b64decode(self.stream.frame_to_base64(second)), b"second"
+        )
+        keys = self.stream.artifacts._artifacts.keys()
+        self.assertFalse(any(isinstance(part, bytes) for key in keys for part in key))
+
+    def test_get_frame_without_capture(self):
+        with self.assertRaises(RuntimeError):
+            self.stream.get_frame()
+
+    def test_capture_frames_publishes_to_buffer(self):
+        mock_frame = np.full((100, 100, 3), 7, dtype=np.uint8)
+        self.stream.camera = Mock()
+        self.stream.camera.isOpened.return_value = True
+
+        def read():
+            if self.stream.frame_buffer.latest_seq >= 2:
+                self.stream.set_status(False)
+            return True, mock_frame
+
+        self.stream.camera.read.side_effect = read
+        self.stream.capture_frames()
+
+        self.assertFalse(self.stream.status)
+        self.assertEqual(self.stream.frame_buffer.latest_seq, 3)
+        np.testing.assert_array_equal(self.stream.frame, mock_frame)
+
+    def test_capture_frames_failure(self):
+        self.stream.camera = Mock()
+        self.stream.camera.isOpened.return_value = True
+        self.stream.camera.read.return_value = (False, None)
+
+        self.stream.capture_frames()
+
+        self.assertEqual(self.stream.camera.read.call_count, 11)
+        self.assertFalse(self.stream.status)
 
     @patch("cv2.imencode")
     def test_generate_frames(self, mock_imencode):
         mock_frame = np.zeros((100, 100, 3), dtype=np.uint8)
         self.stream.camera = Mock()
-        self.stream.camera.read.return_value = (True, mock_frame)
-        self.stream.filter_processor.apply_black_edges.return_value = mock_frame
-        self.stream.filter_processor.apply_filters.return_value = mock_frame
+        self.stream.frame_buffer.publish(mock_frame)
 
         # Create a mock numpy array that has a tobytes method
         mock_buffer = Mock()
@@ -85,7 +166,6 @@ class TestStream(unittest.TestCase):
         generator = self.stream.generate_frames()
         frame = next(generator)
 
-        self.assertTrue(self.stream.status)
         self.assertIsInstance(frame, bytes)
         self.assertTrue(
             frame.startswith(b"--frame\r\nContent-Type: image/jpeg\r\n\r\n")
@@ -93,23 +173,98 @@ class TestStream(unittest.TestCase):
         self.assertTrue(frame.endswith(b"\r\n\r\n"))
         self.assertIn(b"mock_encoded_image", frame)
 
-        # Verify that the mock methods were called
-        self.stream.camera.read.assert_called_once()
-        self.stream.filter_processor.apply_black_edges.assert_called_once_with(
-            mock_frame
-        )
-        self.stream.filter_processor.apply_filters.assert_called_once_with(mock_frame)
-        mock_imencode.assert_called_once_with(".jpg", mock_frame)
+        # Consumers read from the ring buffer, never from the device
+        self.stream.camera.read.assert_not_called()
+        mock_imencode.assert_called_once()
         mock_buffer.tobytes.assert_called_once()
 
-    def test_generate_frames_failure(self):
-        self.stream.camera = Mock()
-        self.stream.camera.read.return_value = (False, None)
+    def test_generate_frames_stops_without_capture(self):
+        self.stream.frame_buffer.wait_for_frame = Mock(return_value=None)
 
         generator = self.stream.generate_frames()
         with self.assertRaises(StopIteration):
-            for _ in range(11):  # More than the consecutive error limit
-                next(generator)
+            next(generator)
+
+
+class TestStreamPassthrough(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.video_path = os.path.join(cls.temp_dir.name, "recorded.avi")
+        writer = cv2.VideoWriter(
+            cls.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48)
+        )
+        for value in (0, 80, 160):
+            writer.write(np.full((48, 64, 3), value, dtype=np.uint8))
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def setUp(self):
+        self.mock_filter_processor = Mock(spec=FilterProcessor)
+        self.stream = Stream(
+            self.mock_filter_processor, source=self.video_path, passthrough=True
+        )
+        self.stream.capture_frames()
+
+    def tearDown(self):
+        self.stream.shutdown_camera()
+
+    def test_capture_keeps_compressed_bytes(self):
+        record = self.stream.frame_buffer.latest()
+
+        self.assertTrue(self.stream.passthrough)
+        self.assertEqual(record.seq, 2)
+        self.assertIsNone(record.image)
+        self.assertTrue(record.jpeg.startswith(b"\xff\xd8"))
+
+    def test_frame_is_decoded_on_demand(self):
+        frame = self.stream.frame
+
+        self.assertEqual(frame.shape, (48, 64, 3))
+        self.assertAlmostEqual(float(frame.mean()), 160, delta=3)
+
+    @patch("cv2.imencode")
+    def test_generate_frames_sends_camera_bytes(self, mock_imencode):
+        record = self.stream.frame_buffer.latest()
+
+        frame = next(self.stream.generate_frames())
+
+        mock_imencode.assert_not_called()
+        self.assertIn(record.jpeg, frame)
+
+    @patch("cv2.imencode")
+    def test_get_frame_sends_camera_bytes_for_full_frame_crop(self, mock_imencode):
+        record = self.stream.frame_buffer.latest()
+        self.mock_filter_processor.get_crop_coordinates.return_value = (0, 0, 64, 48)
+
+        result = self.stream.get_frame()
+
+        mock_imencode.assert_not_called()
+        self.mock_filter_processor.apply_crop_predict_image.assert_not_called()
+        self.assertEqual(base64.b64decode(result), record.jpeg)
+
+    def test_get_frame_decodes_when_cropping(self):
+        self.mock_filter_processor.get_crop_coordinates.return_value = (0, 0, 32, 24)
+        self.mock_filter_processor.apply_crop_predict_image.side_effect = (
+            lambda image, coordinates: image[:24, :32]
+        )
+
+        result = self.stream.get_frame()
+        image = cv2.imdecode(
+            np.frombuffer(base64.b64decode(result), dtype=np.uint8), cv2.IMREAD_COLOR
+        )
+
+        self.assertEqual(image.shape, (24, 32, 3))
+
+    def test_fallback_when_source_is_not_mjpg(self):
+        with patch("cv2.VideoCapture") as mock_video_capture:
+            mock_video_capture.return_value.get.return_value = 0
+            stream = Stream(self.mock_filter_processor, source=0, passthrough=True)
+
+        self.assertFalse(stream.passthrough)
 
 
 if __name__ == "__main__":
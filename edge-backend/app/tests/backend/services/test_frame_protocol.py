@@ -0,0 +1,56 @@
+import unittest
+
+from app.backend.services.frame_protocol import (
+    CONTENT_JPEG,
+    CONTENT_RAW,
+    FRAME_HEADER_SIZE,
+    pack_frame,
+    unpack_frame,
+)
+
+
+class TestFrameProtocol(unittest.TestCase):
+    def test_round_trip(self):
+        message = pack_frame(
+            b"\xff\xd8payload",
+            frame_id=42,
+            timestamp=1700000000.25,
+            shape=(1080, 1920, 3),
+        )
+        header, payload = unpack_frame(message)
+
+        self.assertEqual(len(message), FRAME_HEADER_SIZE + 9)
+        self.assertEqual(header.frame_id, 42)
+        self.assertEqual(header.timestamp, 1700000000.25)
+        self.assertEqual(header.content_type, CONTENT_JPEG)
+        self.assertEqual(
+            (header.height, header.width, header.channels), (1080, 1920, 3)
+        )
+        self.assertEqual(bytes(payload), b"\xff\xd8payload")
+
+    def test_raw_grayscale_shape(self):
+        header, payload = unpack_frame(
+            pack_frame(bytes(6), 1, 0.0, content_type=CONTENT_RAW, shape=(2, 3))
+        )
+
+        self.assertEqual(header.content_type, CONTENT_RAW)
+        self.assertEqual(header.channels, 1)
+        self.assertEqual(len(payload), 6)
+
+    def test_rejects_foreign_message(self):
+        with self.assertRaises(ValueError):
+            unpack_frame(b"x" * FRAME_HEADER_SIZE)
+
+    def test_rejects_unknown_version(self):
+        message = bytearray(pack_frame(b"jpeg", 1, 0.0))
+        message[4] = 99
+        with self.assertRaises(ValueError):
+            unpack_frame(bytes(message))
+
+    def test_rejects_truncated_payload(self):
+        with self.assertRaises(ValueError):
+            unpack_frame(pack_frame(b"jpeg", 1, 0.0)[:-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from app.backend.models.FilterHandler import FilterHandler
+from app.backend.models.ImageFilter import FilterSpec, FilterType
+from app.backend.services import image_processing
+from app.backend.services.image_processing import compile_filters, resize_image
+
+IMAGES = os.path.join(os.path.dirname(__file__), "..", "..", "resources", "images")
+
+
+def equalize(img, clip_limit):
+    l, a, b = cv2.split(cv2.cvtColor(img, cv2.COLOR_BGR2LAB))
+    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
+    return cv2.cvtColor(cv2.merge((clahe.apply(l), a, b)), cv2.COLOR_LAB2BGR)
+
+
+class TestCompiledFilters(unittest.TestCase):
+    def setUp(self):
+        self.image = cv2.imread(os.path.join(IMAGES, "sample.jpg"))
+
+    def test_pipeline_matches_uncached_filters(self):
+        specs = [
+            FilterSpec(filter_type=FilterType.sharpening),
+            FilterSpec(filter_type=FilterType.contrast),
+            FilterSpec(filter_type=FilterType.histogram_equalization, clipLimit=4.0),
+            FilterSpec(filter_type=FilterType.rotation, angle=15),
+            FilterSpec(
+                filter_type=FilterType.perspective_distortion,
+                preset="expandTopLeft",
+                intensity=12,
+            ),
+            FilterSpec(filter_type=FilterType.blur, ksize=4),
+        ]
+        expected = resize_image(self.image)
+        kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype=np.float32)
+        expected = cv2.filter2D(expected, -1, kernel)
+        expected = equalize(equalize(expected, 3.0), 4.0)
+        h, w = expected.shape[:2]
+        rotation = cv2.getRotationMatrix2D((w // 2, h // 2), 15, 1.0)
+        expected = cv2.warpAffine(expected, rotation, (w, h))
+        base = np.float32([[0, 0], [w, 0], [0, h], [w, h]])
+        moved = np.float32([[-12, -12], [w, 0], [0, h], [w, h]])
+        perspective = cv2.getPerspectiveTransform(base, moved)
+        expected = cv2.GaussianBlur(
+            cv2.warpPerspective(expected, perspective, (w, h)), (5, 5), 0
+        )
+
+        pipeline = compile_filters(specs)
+        for _ in range(2):
+            np.testing.assert_array_equal(pipeline(self.image), expected)
+
+    def test_matrices_are_cached_per_shape(self):
+        pipeline = compile_filters(
+            [FilterSpec(filter_type=FilterType.rotation, angle=30)]
+        )
+        image_processing._rotation_matrix.cache_clear()
+        for name in ("sample.jpg", "sample.jpg", "172882635_4cc7b86731_m.jpg"):
+            pipeline(cv2.imread(os.path.join(IMAGES, name)))
+        info = image_processing._rotation_matrix.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+    def test_clahe_objects_are_reused(self):
+        self.assertIs(
+            image_processing._get_clahe(2.0), image_processing._get_clahe(2.0)
+        )
+        self.assertIsNot(
+            image_processing._get_clahe(2.0), image_processing._get_clahe(3.0)
+        )
+
+    def test_unknown_filters_are_skipped(self):
+        spec = FilterSpec.model_construct(filter_type="levels")
+        pipeline = compile_filters([spec])
+        np.testing.assert_array_equal(pipeline(self.image), resize_image(self.image))
+
+
+class TestFilterHandler(unittest.TestCase):
+    def test_load_filters_compiles_the_recipe(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "recipe.json")
+            with open(path, "w") as recipe:
+                recipe.write('[{"filter_type": "brightness", "adjustment": 40}]')
+            handler = FilterHandler(path)
+            image = np.full((400, 400, 3), 100, dtype=np.uint8)
+            np.testing.assert_array_equal(handler.pipeline(image), image)
+            handler.load_filters()
+            self.assertEqual(handler.pipeline(image).max(), 140)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import gc
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import httpx
+from sqlalchemy import func, select
+
+from app.backend.models.Crop import GlobalCropData
+from app.dependencies import get_db
+from app.main import app
+from app.sql_app import models
+from app.sql_app.db_manager import AsyncSessionLocal
+
+
+class LoopLagProbe:
+    """Measures the longest time the event loop went without running a ready task."""
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, loop.time() - start - self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.ensure_future(self._run())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+class TestEventLoopBlocking(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Debug mode, enabled by IsolatedAsyncioTestCase, slows every loop iteration.
+        asyncio.get_running_loop().set_debug(False)
+        # A full garbage collection pauses the loop too; keep it out of the measurement.
+        gc.collect()
+        gc.disable()
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        )
+        self.coordinates = GlobalCropData.get_coordinates()
+
+    async def asyncTearDown(self):
+        gc.enable()
+        await self.client.aclose()
+        app.dependency_overrides = {}
+        GlobalCropData.set_coordinates(self.coordinates)
+
+    async def post_crops(self, count):
+        return await asyncio.gather(
+            *(self.client.post("/crop/", json=self.coordinates) for _ in range(count))
+        )
+
+    async def test_probe_detects_blocking(self):
+        async with LoopLagProbe() as probe:
+            time.sleep(0.2)
+            await asyncio.sleep(0.01)
+        self.assertGreater(probe.max_lag, 0.15)
+
+    @unittest.skipIf(AsyncSessionLocal is None, "async database driver not available")
+    async def test_async_session_under_concurrent_requests(self):
+        async with AsyncSessionLocal() as db:
+            before = await db.scalar(select(func.count()).select_from(models.Interface))
+        async with LoopLagProbe() as probe:
+            responses = await self.post_crops(10)
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        async with AsyncSessionLocal() as db:
+            after = await db.scalar(select(func.count()).select_from(models.Interface))
+        self.assertEqual(after - before, 10)
+        self.assertLess(probe.max_lag, 0.1)
+
+    async def test_slow_sync_session_does_not_block(self):
+        db = MagicMock()
+        db.commit.side_effect = lambda: time.sleep(0.2)
+        app.dependency_overrides[get_db] = lambda: db
+        start = time.monotonic()
+        async with LoopLagProbe() as probe:
+            responses = await self.post_crops(5)
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(db.commit.call_count, 5)
+        self.assertLess(probe.max_lag, 0.1)
+        # The commits ran side by side in the thread pool, not one after another.
+        self.assertLess(time.monotonic() - start, 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()
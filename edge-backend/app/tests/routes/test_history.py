@@ -0,0 +1,180 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.backend.models.InferenceLogMaintenance import InferenceLogMaintenance
+from app.dependencies import get_db
+from app.main import app
+from app.sql_app import crud, models
+
+START = datetime(2026, 10, 18, 10, 0, tzinfo=timezone.utc)
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.directory.name, 'logs.db')}"
+        )
+        models.Base.metadata.create_all(self.engine)
+        self.sessions = sessionmaker(bind=self.engine)
+        app.dependency_overrides[get_db] = self.get_db
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def get_db(self):
+        with self.sessions() as db:
+            yield db
+
+    def add_logs(
+        self, count, class_name, score, start=START, step=timedelta(seconds=30)
+    ):
+        with self.sessions() as db:
+            class_id = crud.get_lookup_ids(db, models.ClasseInferencia, [class_name])[
+                class_name
+            ]
+            model_id = crud.get_lookup_ids(db, models.ModeloInferencia, ["modelo.zip"])[
+                "modelo.zip"
+            ]
+            crud.create_inference_logs(
+                db,
+                [
+                    {
+                        "created_at": start + n * step,
+                        "id": crud.next_inference_log_id(),
+                        "class_id": class_id,
+                        "score": score,
+                        "model_id": model_id,
+                        "camera_id": 0,
+                    }
+                    for n in range(count)
+                ],
+            )
+
+    def roll_up(self, now):
+        InferenceLogMaintenance(self.engine, archive_dir="", rollup_delay=0).run_once(
+            now
+        )
+
+    def aggregates(self, **params):
+        params.setdefault("start", START.isoformat())
+        params.setdefault("end", (START + timedelta(hours=2)).isoformat())
+        return self.client.get("/history/aggregates", params=params)
+
+    def test_aggregates_per_interval_and_class(self):
+        self.add_logs(6, "ok", 0.9)
+        self.add_logs(2, "nok", 0.55)
+        self.add_logs(4, "ok", 0.8, start=START + timedelta(hours=1))
+        self.roll_up(START + timedelta(hours=3))
+        response = self.aggregates(interval="hour")
+        self.assertEqual(response.status_code, 200)
+        first, second = response.json()["intervals"]
+        self.assertEqual(first["start"], START.isoformat())
+        self.assertEqual(first["count"], 8)
+        self.assertEqual(first["reject_count"], 2)
+        self.assertAlmostEqual(first["reject_rate"], 0.25)
+        self.assertEqual(first["classes"]["ok"]["count"], 6)
+        self.assertAlmostEqual(first["classes"]["ok"]["mean_score"], 0.9, places=5)
+        self.assertAlmostEqual(first["classes"]["nok"]["p50_score"], 0.55, places=5)
+        self.assertEqual(second["count"], 4)
+        self.assertEqual(second["reject_rate"], 0)
+
+    def test_aggregates_only_read_rollups(self):
+        self.add_logs(3, "ok", 0.9)
+        response = self.aggregates()
+        self.assertEqual(response.json()["intervals"], [])
+        self.assertIsNone(response.json()["complete_until"])
+
+    def test_reject_classes_can_be_chosen(self):
+        self.add_logs(3, "ok", 0.9)
+        self.add_logs(1, "nok", 0.9)
+        self.roll_up(START + timedelta(hours=3))
+        response = self.aggregates(interval="day", reject_classes=["ok", "nok"])
+        self.assertEqual(response.json()["intervals"][0]["reject_rate"], 1)
+
+    def test_aggregates_are_revalidated_with_etags(self):
+        self.add_logs(3, "ok", 0.9)
+        self.roll_up(START + timedelta(hours=3))
+        response = self.aggregates()
+        self.assertEqual(response.headers["cache-control"], "public, max-age=3600")
+        etag = response.headers["etag"]
+        cached = self.client.get(
+            "/history/aggregates",
+            params={
+                "start": START.isoformat(),
+                "end": (START + timedelta(hours=2)).isoformat(),
+            },
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+
+    def test_open_range_must_be_revalidated(self):
+        self.add_logs(3, "ok", 0.9)
+        self.roll_up(START + timedelta(minutes=30))
+        response = self.aggregates()
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+
+    def test_too_many_intervals_are_refused(self):
+        response = self.aggregates(
+            interval="minute", end=(START + timedelta(days=30)).isoformat()
+        )
+        self.assertEqual(response.status_code, 422)
+
+    def test_logs_are_paginated_by_keyset(self):
+        self.add_logs(25, "ok", 0.9, step=timedelta(seconds=0))
+        self.add_logs(5, "nok", 0.5, start=START + timedelta(seconds=1))
+        params = {
+            "start": START.isoformat(),
+            "end": (START + timedelta(minutes=10)).isoformat(),
+            "limit": 7,
+        }
+        seen, pages = [], 0
+        while True:
+            body = self.client.get("/history/logs", params=params).json()
+            seen += [(log["created_at"], log["id"]) for log in body["logs"]]
+            pages += 1
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(pages, 5)
+        self.assertEqual(seen, sorted(set(seen)))
+
+    def test_logs_can_be_filtered(self):
+        self.add_logs(3, "ok", 0.9)
+        self.add_logs(2, "nok", 0.5)
+        response = self.client.get(
+            "/history/logs",
+            params={
+                "start": START.isoformat(),
+                "end": (START + timedelta(hours=1)).isoformat(),
+                "class_name": "nok",
+            },
+        )
+        logs = response.json()["logs"]
+        self.assertEqual([log["class_name"] for log in logs], ["nok", "nok"])
+        self.assertEqual(logs[0]["model_name"], "modelo.zip")
+
+    def test_invalid_cursor_is_refused(self):
+        response = self.client.get("/history/logs", params={"cursor": "invalido"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_score_quantile_interpolates_inside_bins(self):
+        histogram = [0] * 20
+        histogram[10] = 4
+        self.assertAlmostEqual(crud.score_quantile(histogram, 0.5, 0.5, 0.55), 0.525)
+        self.assertEqual(crud.score_quantile(histogram, 1.0, 0.5, 0.52), 0.52)
+
+
+if __name__ == "__main__":
+    unittest.main()
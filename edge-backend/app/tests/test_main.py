@@ -36,6 +36,7 @@ class TestMain(unittest.TestCase):
         self.assertIn("upload_model", routes)
         self.assertIn("predict", routes)
         self.assertIn("video_feed", routes)
+        self.assertIn("prometheus_metrics", routes)
 
 
 if __name__ == "__main__":
@@ -1,36 +1,70 @@
+import os
 from threading import Thread
+from typing import Any, Callable, Union
 
-from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.backend.models.FilterHandler import FilterHandler
 from app.backend.models.FilterProcessor import FilterProcessor
+from app.backend.models.ImageArchiver import ImageArchiver
+from app.backend.models.InferenceLogJournal import InferenceLogJournal
+from app.backend.models.InferenceLogMaintenance import InferenceLogMaintenance
+from app.backend.models.InferenceLogWriter import InferenceLogWriter
 from app.backend.models.ModelHandler import ModelHandler
+from app.backend.models.PipelineMetrics import PipelineMetrics
 from app.backend.models.PredictFilter import PredictFilter
 from app.backend.models.VideoStream import Stream
-from app.dependencies import get_db
 from app.sql_app import crud
+from app.sql_app.db_manager import SessionLocal, engine
 
+metrics = PipelineMetrics()
 filter_handler = FilterHandler(recipe_path="app/core/data/recipe.json")
-filter_processor = FilterProcessor(filter_handler=filter_handler)
-stream = Stream(filter_processor=filter_processor)
+filter_processor = FilterProcessor(filter_handler=filter_handler, metrics=metrics)
+stream = Stream(filter_processor=filter_processor, metrics=metrics)
 filter = PredictFilter()
 model_handler = ModelHandler(filter_handler)
+journal_path = os.getenv("INFERENCE_JOURNAL_PATH")
+inference_log_writer = InferenceLogWriter(
+    SessionLocal,
+    journal=InferenceLogJournal(journal_path) if journal_path else None,
+    metrics=metrics,
+)
+inference_log_maintenance = InferenceLogMaintenance(engine, metrics=metrics)
+image_archiver = ImageArchiver()
 
 
 def start_system():
     camera = Thread(target=stream.run_camera_stream)
     camera.start()
+    inference_log_writer.start()
+    inference_log_maintenance.start()
 
 
 def stop_stream():
     stream.shutdown_camera()
 
 
-def interface_log(command: str, db: Session = Depends(get_db)):
+async def interface_log(command: str, db: Union[AsyncSession, Session]):
     log = {"command": command}
-    crud.create_interface_log(db, log)
+    if isinstance(db, AsyncSession):
+        await crud.create_interface_log_async(db, log)
+    else:
+        await run_in_threadpool(crud.create_interface_log, db, log)
 
 
-def inference_log(command: str, db: Session = Depends(get_db)):
-    crud.create_inference_log(db, command)
+async def run_query(db: Union[AsyncSession, Session], query: Callable, *args) -> Any:
+    """
+    Runs a function taking a synchronous session, without blocking the event loop.
+
+    Args:
+        db (Union[AsyncSession, Session]): The session from `get_db`.
+        query (Callable): Called with a synchronous session followed by `args`.
+
+    Returns:
+        Any: What the function returned.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(query, *args)
+    return await run_in_threadpool(query, db, *args)
@@ -1,10 +1,23 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Response
 from fastapi.responses import RedirectResponse
 
 from app.core.openapi import add_custom_openapi_schema
 from app.routes import manager_model_route
 
-app = FastAPI(servers=[{"url": "http://localhost:9999"}])
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Carrega e aquece o modelo antes da primeira inferência, fora do event loop
+    await asyncio.to_thread(manager_model_route.manager_model_instance.load)
+    yield
+    manager_model_route.batch_scheduler.stop()
+    manager_model_route.inference_executor.shutdown()
+
+
+app = FastAPI(servers=[{"url": "http://localhost:9999"}], lifespan=lifespan)
 
 app.include_router(manager_model_route.router)
 add_custom_openapi_schema(app)
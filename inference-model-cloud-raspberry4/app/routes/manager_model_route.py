@@ -1,12 +1,20 @@
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 
 from app.model.inference_model import InferenceModel
+from app.services.batch_scheduler import BatchScheduler
+from app.services.frame_protocol import FRAME_SUBPROTOCOL
 from app.services.inference_model_cloud import InferenceModelCloud
+from app.services.interpreter_pool import InferenceExecutor, InferenceOverloadedError
 from app.services.manager_model import ManagerModel
+from app.services.validator.model_validator import ModelValidator
 
 router = APIRouter(tags=["Manager Model Cloud"])
 
 manager_model_instance = ManagerModel()
+inference_executor = InferenceExecutor()
+batch_scheduler = BatchScheduler(inference_executor)
 model_inference = None
 
 
@@ -14,19 +22,64 @@ def get_manager_model() -> ManagerModel:
     return manager_model_instance
 
 
+@router.get("/model")
+async def model_status(manager_model: ManagerModel = Depends(get_manager_model)):
+    """
+    Informa o modelo carregado e o caminho de execução ativo.
+
+    Returns:
+        dict: Hash do modelo, precisão de entrada/saída ("float32/float32", "uint8/uint8"...),
+            quantidade de interpretadores, threads por interpretador e suporte a lotes.
+    """
+    loaded = manager_model.get_loaded_model()
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Modelo não carregado.")
+    return {
+        "digest": loaded.digest,
+        "precision": loaded.model.precision,
+        "interpreters": loaded.model.size,
+        "num_threads": loaded.model.num_threads,
+        "batching": loaded.model.supports_batch,
+    }
+
+
 @router.websocket("/inference")
 async def predict(
     websocket: WebSocket, manager_model: ManagerModel = Depends(get_manager_model)
 ):
-    await websocket.accept()
+    # Clientes que oferecem o subprotocolo enviam frames binários, os demais base64
+    subprotocol = (
+        FRAME_SUBPROTOCOL
+        if FRAME_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+        else None
+    )
+    await websocket.accept(subprotocol=subprotocol)
     try:
         global model_inference
-        model_inference = InferenceModelCloud(
-            manager_model.get_model(), manager_model.get_classes()
-        )
         while True:
-            data = await websocket.receive_text()
-            response: InferenceModel = await model_inference.predict(data)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            # O modelo é pego a cada mensagem: conexões longas enxergam o modelo novo
+            # e a inferência em andamento termina com o modelo que começou
+            loaded = manager_model.get_loaded_model()
+            ModelValidator.validate_model_loaded(loaded)
+            model_inference = InferenceModelCloud(
+                loaded.model, loaded.classes, inference_executor, batch_scheduler
+            )
+            try:
+                if message.get("bytes") is not None:
+                    response: InferenceModel = await model_inference.predict_frame(
+                        message["bytes"]
+                    )
+                else:
+                    response = await model_inference.predict(message["text"])
+            except InferenceOverloadedError as e:
+                # Recusa explícita: o cliente decide se tenta de novo ou descarta o frame
+                await websocket.send_text(
+                    json.dumps({"error": "overloaded", "detail": str(e)})
+                )
+                continue
             await websocket.send_text(response.model_dump_json(by_alias=True))
     except WebSocketDisconnect:
         print("Client disconnected")
@@ -0,0 +1,140 @@
+import asyncio
+import os
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.services.interpreter_pool import InferenceExecutor, InterpreterPool
+
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "4"))
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "5"))
+
+BatchItem = Tuple[InterpreterPool, np.ndarray, asyncio.Future]
+
+
+class BatchScheduler:
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        window_ms: float = BATCH_WINDOW_MS,
+    ):
+        """
+        Agrupa imagens de todas as conexões em lotes para uma única inferência.
+
+        O primeiro pedido abre uma janela de `window_ms` milissegundos; o lote é
+        executado ao fim da janela, assim que atingir `max_batch_size` imagens ou
+        quando não houver outro pedido admitido a caminho, o que evita a espera com
+        um único cliente. Cada chamador recebe a linha da saída correspondente à sua
+        imagem.
+
+        Args:
+            executor (InferenceExecutor): Threads onde os lotes são executados.
+            max_batch_size (int, optional): Tamanho máximo do lote. Default é `BATCH_MAX_SIZE`.
+            window_ms (float, optional): Tempo máximo de espera pelo lote, em milissegundos. Default é `BATCH_WINDOW_MS`.
+        """
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = window_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # O event loop guarda só referências fracas às tasks: sem este conjunto um lote
+        # em andamento pode ser coletado e os seus chamadores nunca recebem resposta
+        self._dispatches: Set[asyncio.Task] = set()
+        self._dispatched = 0
+
+    async def predict(self, model: InterpreterPool, image: np.ndarray) -> np.ndarray:
+        """
+        Enfileira uma imagem no próximo lote e aguarda o resultado.
+
+        Modelos com lote fixo não são agrupados: cada imagem vai direto para um
+        interpretador livre, em paralelo com as demais.
+
+        Args:
+            model (InterpreterPool): Interpretadores que devem executar a imagem.
+            image (np.ndarray): Imagem já no tamanho de entrada do modelo.
+
+        Returns:
+            np.ndarray: A saída do modelo para a imagem.
+        """
+        if self.max_batch_size == 1 or self.window <= 0 or not model.supports_batch:
+            return (await self.executor.run(model.invoke_batch, [image]))[0]
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((model, image, future))
+        return await future
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._collect())
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        batch: List[BatchItem] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_batch_size:
+                    arriving = self.executor.pending - self._dispatched - len(batch)
+                    if self._queue.empty() and arriving <= 0:
+                        break
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                # Depois de um hot reload o lote pode misturar modelos
+                models = {}
+                for item in batch:
+                    models.setdefault(id(item[0]), []).append(item)
+                for items in models.values():
+                    task = asyncio.create_task(self._dispatch(items))
+                    self._dispatches.add(task)
+                    task.add_done_callback(self._dispatches.discard)
+                batch = []
+        except asyncio.CancelledError:
+            self._fail(batch)
+            raise
+
+    async def _dispatch(self, items: List[BatchItem]) -> None:
+        model = items[0][0]
+        self._dispatched += len(items)
+        try:
+            outputs = await self.executor.run(
+                model.invoke_batch, [image for _, image, _ in items]
+            )
+        except Exception as e:
+            self._fail(items, e)
+            return
+        except asyncio.CancelledError:
+            self._fail(items)
+            raise
+        finally:
+            self._dispatched -= len(items)
+        for (_, _, future), output in zip(items, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    @staticmethod
+    def _fail(items: List[BatchItem], error: Optional[Exception] = None) -> None:
+        for _, _, future in items:
+            if not future.done():
+                future.set_exception(
+                    error or RuntimeError("Agendador de lotes encerrado.")
+                )
+
+    def stop(self) -> None:
+        """
+        Interrompe a coleta de lotes e falha os pedidos que ainda aguardavam um lote.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._fail([self._queue.get_nowait()])
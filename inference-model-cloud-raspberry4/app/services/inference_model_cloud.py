@@ -5,34 +5,94 @@ import numpy as np
 from PIL import Image
 
 from app.model.inference_model import InferenceModel
+from app.services.batch_scheduler import BatchScheduler
+from app.services.frame_protocol import (
+    CONTENT_JPEG,
+    CONTENT_RAW,
+    FrameHeader,
+    unpack_frame,
+)
+from app.services.interpreter_pool import InferenceExecutor, InterpreterPool
 from app.services.validator.model_validator import ModelValidator
 
 
-class InferenceModelCloud:
+def prepare_image(image: Image.Image, height: int, width: int) -> np.ndarray:
+    """
+    Converte uma imagem para os pixels RGB de 8 bits no tamanho de entrada do modelo.
+
+    Em JPEGs o draft decodifica já reduzido (escala DCT de 1/2, 1/4 ou 1/8), no menor
+    tamanho que ainda cobre a entrada do modelo.
+
+    Args:
+        image (Image.Image): Imagem aberta, ainda não decodificada.
+        height (int): Altura de entrada do modelo.
+        width (int): Largura de entrada do modelo.
+
+    Returns:
+        np.ndarray: Pixels no formato (altura, largura, 3).
+
+    Examples:
+        >>> prepare_image(Image.new("L", (640, 480)), 224, 224).shape
+        (224, 224, 3)
+    """
+    image.draft("RGB", (width, height))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image = image.resize((width, height))
+    return np.asarray(image)
 
-    def __init__(self, model_tflite, classes):
+
+class InferenceModelCloud:
+    def __init__(
+        self,
+        model_tflite: InterpreterPool,
+        classes,
+        executor: InferenceExecutor,
+        scheduler: BatchScheduler,
+    ):
         self.classes = classes
         self.model_tflite = model_tflite
+        self.executor = executor
+        self.scheduler = scheduler
 
     async def predict(self, data) -> InferenceModel:
         image_data = base64.b64decode(data)
-        image_file = BytesIO(image_data)
+        ModelValidator.validate_image_data(image_data)
+        async with self.executor.admit():
+            image = await self.executor.run(self._prepare_encoded, image_data)
+            return await self._classify(image)
+
+    async def predict_frame(self, message: bytes) -> InferenceModel:
+        header, payload = unpack_frame(message)
+        ModelValidator.validate_image_data(len(payload))
+        async with self.executor.admit():
+            image = await self.executor.run(self._prepare_payload, header, payload)
+            return await self._classify(image)
+
+    def _prepare_encoded(self, image_data: bytes) -> np.ndarray:
+        return self._prepare_image(Image.open(BytesIO(image_data)))
 
-        ModelValidator.validate_image_data(image_file)
-        ModelValidator.validate_model_loaded(image_file)
-        interpreter, input_details, output_details = self.model_tflite
-        input_shape = input_details[0]["shape"]
+    def _prepare_payload(self, header: FrameHeader, payload) -> np.ndarray:
+        if header.content_type == CONTENT_JPEG:
+            image = Image.open(BytesIO(payload))
+        elif header.content_type == CONTENT_RAW:
+            mode = "RGB" if header.channels == 3 else "L"
+            image = Image.frombuffer(
+                mode, (header.width, header.height), payload, "raw", mode, 0, 1
+            )
+        else:
+            raise ValueError(f"Tipo de conteúdo não suportado: {header.content_type}.")
+        return self._prepare_image(image)
 
-        image = Image.open(image_file).resize((input_shape[1], input_shape[2]))
-        image_array = np.array(image, dtype=np.float32)
-        image_array = np.expand_dims(image_array, axis=0)
+    def _prepare_image(self, image: Image.Image) -> np.ndarray:
+        height, width = self.model_tflite.input_details[0]["shape"][1:3]
+        return prepare_image(image, height, width)
 
-        interpreter.set_tensor(input_details[0]["index"], image_array)
-        interpreter.invoke()
-        output_data = interpreter.get_tensor(output_details[0]["index"])
+    async def _classify(self, image: np.ndarray) -> InferenceModel:
+        output_data = await self.scheduler.predict(self.model_tflite, image)
 
-        class_index = np.argmax(output_data)
-        accuracy = round(output_data[0][class_index] * 100, 2)
+        class_index, score = self.model_tflite.top_class(output_data)
+        accuracy = round(score * 100, 2)
         prediction = self.classes[class_index]
 
         response = InferenceModel(
@@ -0,0 +1,265 @@
+import asyncio
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import tflite_runtime.interpreter as tflite
+
+INTERPRETER_POOL_SIZE = int(os.getenv("INTERPRETER_POOL_SIZE", "2"))
+# Por padrão divide os núcleos entre os interpretadores: threads a mais que núcleos
+# fazem o XNNPACK disputar CPU e a inferência fica dezenas de vezes mais lenta
+INTERPRETER_NUM_THREADS = int(
+    os.getenv(
+        "INTERPRETER_NUM_THREADS",
+        str(max(1, (os.cpu_count() or 1) // INTERPRETER_POOL_SIZE)),
+    )
+)
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "8"))
+
+
+class InferenceOverloadedError(Exception):
+    """Exception raised when the inference queue is full."""
+
+
+class InterpreterPool:
+    def __init__(
+        self,
+        model_path: str,
+        size: int = INTERPRETER_POOL_SIZE,
+        num_threads: Optional[int] = INTERPRETER_NUM_THREADS,
+    ):
+        """
+        Cria `size` interpretadores independentes do mesmo modelo.
+
+        Cada interpretador tem os próprios tensores, então inferências em threads
+        diferentes não interferem entre si.
+
+        Args:
+            model_path (str): Caminho do arquivo .tflite.
+            size (int, optional): Quantidade de interpretadores. Default é `INTERPRETER_POOL_SIZE`.
+            num_threads (Optional[int], optional): Threads usadas por cada interpretador. Default é `INTERPRETER_NUM_THREADS`.
+        """
+        self.size = size
+        self.num_threads = num_threads
+        self._idle: queue.SimpleQueue = queue.SimpleQueue()
+        self._batch_sizes: Dict[int, int] = {}
+        for _ in range(size):
+            model = self._load(model_path)
+            self._warm_up(model)
+            self._idle.put(model)
+        self.input_details = model[1]
+        self.output_details = model[2]
+        self.supports_batch = bool(self.input_details[0]["shape_signature"][0] == -1)
+        self._input_table = self._quantization_table(self.input_details[0])
+        self._output_scale, self._output_zero_point = self.output_details[0][
+            "quantization"
+        ]
+
+    @property
+    def precision(self) -> str:
+        """
+        Descreve o caminho de execução ativo, no formato "entrada/saída".
+
+        Returns:
+            str: Por exemplo "float32/float32" ou "uint8/uint8" para modelos quantizados.
+        """
+        input_dtype = np.dtype(self.input_details[0]["dtype"]).name
+        output_dtype = np.dtype(self.output_details[0]["dtype"]).name
+        return f"{input_dtype}/{output_dtype}"
+
+    @staticmethod
+    def _quantization_table(input_detail) -> Optional[np.ndarray]:
+        """
+        Monta a tabela que converte cada valor de pixel (0 a 255) para a entrada quantizada.
+
+        Returns:
+            Optional[np.ndarray]: A tabela, ou None se os pixels podem ser copiados como estão.
+        """
+        dtype = np.dtype(input_detail["dtype"])
+        scale, zero_point = input_detail["quantization"]
+        if dtype.kind == "f" or scale == 0:
+            return None
+        if dtype == np.uint8 and np.isclose(scale, 1.0) and zero_point == 0:
+            return None
+        limits = np.iinfo(dtype)
+        values = np.round(np.arange(256) / scale + zero_point)
+        return np.clip(values, limits.min, limits.max).astype(dtype)
+
+    def _load(self, model_path: str):
+        interpreter = tflite.Interpreter(
+            model_path=model_path, num_threads=self.num_threads
+        )
+        interpreter.allocate_tensors()
+        input_details = interpreter.get_input_details()
+        output_details = interpreter.get_output_details()
+        return interpreter, input_details, output_details
+
+    @staticmethod
+    def _warm_up(model) -> None:
+        interpreter, input_details, _ = model
+        input_detail = input_details[0]
+        interpreter.set_tensor(
+            input_detail["index"],
+            np.zeros(input_detail["shape"], dtype=input_detail["dtype"]),
+        )
+        interpreter.invoke()
+
+    @contextmanager
+    def borrow(self) -> Iterator[tuple]:
+        """
+        Empresta um interpretador livre, esperando se todos estiverem em uso.
+
+        Yields:
+            tuple: Interpretador, detalhes de entrada e detalhes de saída.
+        """
+        model = self._idle.get()
+        try:
+            yield model
+        finally:
+            self._idle.put(model)
+
+    def invoke_batch(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Executa uma única inferência para várias imagens já redimensionadas.
+
+        A entrada do interpretador é redimensionada para o tamanho do lote apenas
+        quando ele muda. Modelos com lote fixo executam uma imagem por vez.
+
+        Args:
+            images (List[np.ndarray]): Imagens no formato de entrada do modelo, sem a dimensão do lote.
+
+        Returns:
+            np.ndarray: Saída do modelo, uma linha por imagem, na mesma ordem.
+        """
+        with self.borrow() as (interpreter, input_details, output_details):
+            if not self.supports_batch:
+                return np.concatenate(
+                    [
+                        self._invoke(
+                            interpreter, input_details, output_details, [image]
+                        )
+                        for image in images
+                    ]
+                )
+            batch_size = len(images)
+            if self._batch_sizes.get(id(interpreter), 1) != batch_size:
+                shape = list(input_details[0]["shape"])
+                shape[0] = batch_size
+                interpreter.resize_tensor_input(input_details[0]["index"], shape)
+                interpreter.allocate_tensors()
+                self._batch_sizes[id(interpreter)] = batch_size
+            return self._invoke(interpreter, input_details, output_details, images)
+
+    def _invoke(self, interpreter, input_details, output_details, images) -> np.ndarray:
+        # Escreve os pixels direto no tensor de entrada do interpretador, convertendo o
+        # tipo na cópia, sem montar um array intermediário por pedido
+        input_tensor = interpreter.tensor(input_details[0]["index"])()
+        for position, image in enumerate(images):
+            if self._input_table is None:
+                input_tensor[position] = image
+            else:
+                np.take(self._input_table, image, out=input_tensor[position])
+        # O TFLite não executa enquanto houver referência ao buffer interno
+        del input_tensor
+        interpreter.invoke()
+        return interpreter.get_tensor(output_details[0]["index"])
+
+    def top_class(self, output: np.ndarray) -> Tuple[int, float]:
+        """
+        Retorna a classe mais provável e a sua pontuação.
+
+        O argmax é feito sobre os valores crus da saída; em modelos quantizados apenas
+        a pontuação escolhida é convertida para float.
+
+        Args:
+            output (np.ndarray): Linha da saída do modelo para uma imagem.
+
+        Returns:
+            Tuple[int, float]: Índice da classe e pontuação entre 0 e 1.
+        """
+        class_index = int(np.argmax(output))
+        score = float(output[class_index])
+        if self._output_scale:
+            score = (score - self._output_zero_point) * self._output_scale
+        return class_index, score
+
+
+class InferenceExecutor:
+    def __init__(
+        self, workers: int = INTERPRETER_POOL_SIZE, max_queue: int = INFERENCE_MAX_QUEUE
+    ):
+        """
+        Executa as inferências em threads, fora do event loop.
+
+        O TFLite libera o GIL durante o invoke, então `workers` threads usam núcleos
+        diferentes. Pedidos além de `workers` esperam numa fila de até `max_queue`
+        itens; acima disso são recusados em vez de acumular latência.
+
+        Args:
+            workers (int, optional): Quantidade de threads. Default é `INTERPRETER_POOL_SIZE`.
+            max_queue (int, optional): Pedidos que podem aguardar uma thread livre. Default é `INFERENCE_MAX_QUEUE`.
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="inference"
+        )
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """
+        Reserva uma vaga para um pedido, do recebimento até a resposta.
+
+        Raises:
+            InferenceOverloadedError: Se já houver `workers + max_queue` pedidos pendentes.
+        """
+        if self.pending >= self.workers + self.max_queue:
+            raise InferenceOverloadedError(
+                f"Serviço sobrecarregado: {self.pending} inferências pendentes."
+            )
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    async def run(self, function: Callable, *args: Any) -> Any:
+        """
+        Executa `function(*args)` numa thread de inferência, sem controle de admissão.
+
+        Args:
+            function (Callable): Função bloqueante a executar.
+            *args (Any): Argumentos da função.
+
+        Returns:
+            Any: O retorno da função.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    async def submit(self, function: Callable, *args: Any) -> Any:
+        """
+        Executa `function(*args)` numa thread de inferência, se houver vaga.
+
+        Args:
+            function (Callable): Função bloqueante a executar.
+            *args (Any): Argumentos da função.
+
+        Returns:
+            Any: O retorno da função.
+
+        Raises:
+            InferenceOverloadedError: Se já houver `workers + max_queue` pedidos pendentes.
+        """
+        async with self.admit():
+            return await self.run(function, *args)
+
+    def shutdown(self) -> None:
+        """
+        Encerra as threads de inferência.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
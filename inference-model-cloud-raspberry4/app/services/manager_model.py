@@ -1,8 +1,28 @@
+import hashlib
 import os
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
 
-import tflite_runtime.interpreter as tflite
+from app.services.interpreter_pool import InterpreterPool
 
 MODEL_PATH = os.getenv("MODEL_PATH", "")
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "1"))
+
+
+class LoadedModel(NamedTuple):
+    """
+    Modelo carregado e pronto para inferência.
+
+    Atributos:<br>
+    - model (InterpreterPool): Interpretadores do modelo, já alocados e aquecidos.<br>
+    - classes (List[str]): Nomes das classes, na ordem da saída do modelo.<br>
+    - digest (str): Hash SHA-256 do modelo e das classes que foram carregados.<br>
+    """
+
+    model: InterpreterPool
+    classes: List[str]
+    digest: str
 
 
 class ManagerModel:
@@ -14,24 +34,125 @@ class ManagerModel:
         self.model_path = os.path.join(
             MODEL_PATH, self.path_model_in_zip, self.model_tflite_file_name
         )
+        self.reload_interval = MODEL_RELOAD_INTERVAL
+        self.loaded: Optional[LoadedModel] = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._reloader: Optional[threading.Thread] = None
 
-    def get_model(self):
-        if os.path.exists(self.model_path) and os.path.getsize(self.model_path) > 0:
-            self.model = self.get_format_tflite_model(self.model_path)
-            return self.model
-        else:
-            print(f"Erro: Arquivo do modelo não existe ou está vazio.")
+    def get_loaded_model(self) -> Optional[LoadedModel]:
+        """
+        Retorna o modelo em memória, recarregando-o em segundo plano se os arquivos mudaram.
+
+        Chamado a cada mensagem, no event loop, então só faz trabalho barato: a cada
+        `MODEL_RELOAD_INTERVAL` segundos o mtime e o tamanho dos arquivos são conferidos.
+        Se mudarem, uma thread calcula o hash do conteúdo e, se ele também mudou, carrega e
+        aquece novos interpretadores. Até a troca, o modelo atual continua sendo servido, e
+        quem já pegou o modelo antigo termina a inferência com ele.
+
+        Returns:
+            Optional[LoadedModel]: O modelo carregado, ou None se ainda não foi carregado ou
+                se o arquivo não existe ou está vazio.
+        """
+        if time.monotonic() - self._checked_at < self.reload_interval:
+            return self.loaded
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.reload_interval:
+                self._checked_at = time.monotonic()
+                signature = self._files_signature()
+                if (signature or ()) != self._signature and self._reloader is None:
+                    self._reloader = threading.Thread(
+                        target=self._reload_in_background,
+                        args=(signature,),
+                        name="model-reload",
+                        daemon=True,
+                    )
+                    self._reloader.start()
+        return self.loaded
+
+    def load(self) -> Optional[LoadedModel]:
+        """
+        Carrega o modelo de forma bloqueante, sem esperar o intervalo de verificação.
+
+        Usado na inicialização, fora do event loop, para que a primeira inferência já
+        encontre o modelo aquecido.
+
+        Returns:
+            Optional[LoadedModel]: O modelo carregado, ou None se o arquivo não existe ou está vazio.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+        self._refresh(self._files_signature())
+        return self.loaded
+
+    def _reload_in_background(self, signature: Optional[Tuple]) -> None:
+        try:
+            self._refresh(signature)
+        finally:
+            with self._lock:
+                self._reloader = None
+
+    def _refresh(self, signature: Optional[Tuple]) -> None:
+        with self._reload_lock:
+            if signature is None:
+                if self.loaded is not None or self._signature is None:
+                    print("Erro: Arquivo do modelo não existe ou está vazio.")
+                self.loaded = None
+                self._signature = ()
+                return
+            if signature == self._signature:
+                return
+
+            digest = self._files_digest()
+            if self.loaded is None or digest != self.loaded.digest:
+                try:
+                    model = InterpreterPool(self.model_path)
+                    classes = self.read_classes()
+                except Exception as e:
+                    # Arquivo possivelmente ainda sendo copiado: mantém o modelo atual
+                    # e tenta de novo na próxima verificação.
+                    print(f"Erro ao carregar o modelo: {str(e)}")
+                    return
+                self.loaded = LoadedModel(model, classes, digest)
+                print(f"Modelo carregado: {digest[:12]} ({model.precision})")
+            self._signature = signature
+
+    def _files_signature(self) -> Optional[Tuple]:
+        try:
+            model_stat = os.stat(self.model_path)
+        except OSError:
+            return None
+        if model_stat.st_size == 0:
             return None
+        try:
+            classes_stat = os.stat(self.classes_path)
+            classes_signature = (classes_stat.st_mtime_ns, classes_stat.st_size)
+        except OSError:
+            classes_signature = None
+        return (model_stat.st_mtime_ns, model_stat.st_size), classes_signature
+
+    def _files_digest(self) -> str:
+        digest = hashlib.sha256()
+        for path in (self.model_path, self.classes_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def get_model(self):
+        loaded = self.get_loaded_model()
+        return loaded.model if loaded is not None else None
 
     def get_classes(self):
+        loaded = self.get_loaded_model()
+        return loaded.classes if loaded is not None else self.read_classes()
+
+    def read_classes(self):
         with open(self.classes_path, "r") as file:
             linhas = file.readlines()
         classes = [linha.strip() for linha in linhas]
         return classes
-
-    def get_format_tflite_model(self, model_path):
-        interpreter = tflite.Interpreter(model_path=model_path)
-        interpreter.allocate_tensors()
-        input_details = interpreter.get_input_details()
-        output_details = interpreter.get_output_details()
-        return interpreter, input_details, output_details
@@ -0,0 +1,96 @@
+import base64
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.main import app
+from app.routes import manager_model_route
+from app.services.frame_protocol import (
+    CONTENT_JPEG,
+    CONTENT_RAW,
+    FRAME_SUBPROTOCOL,
+    pack_frame,
+)
+from app.services.manager_model import ManagerModel
+from benchmarks.dummy_model import CLASSES, write_model_dir
+
+SIZE = 32
+
+
+def jpeg(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class TestInferenceRoute(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        manager = ManagerModel()
+        manager.model_path = write_model_dir(cls.directory.name, size=SIZE)
+        manager.classes_path = os.path.join(cls.directory.name, "classes.txt")
+        manager.load()
+        app.dependency_overrides[
+            manager_model_route.get_manager_model
+        ] = lambda: manager
+        cls.client = TestClient(app)
+        cls.frame = pack_frame(
+            bytes(SIZE * SIZE * 3),
+            1,
+            0.0,
+            content_type=CONTENT_RAW,
+            shape=(SIZE, SIZE, 3),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        app.dependency_overrides.clear()
+        cls.directory.cleanup()
+
+    def connect(self):
+        return self.client.websocket_connect(
+            "/inference", subprotocols=[FRAME_SUBPROTOCOL]
+        )
+
+    def test_binary_frame_is_classified(self):
+        with self.connect() as ws:
+            ws.send_bytes(self.frame)
+            response = json.loads(ws.receive_text())
+        self.assertIn(response["classification"], CLASSES)
+        self.assertGreater(response["confidence-score"], 0)
+
+    def test_large_jpeg_frame_is_classified(self):
+        message = pack_frame(jpeg(640, 480), 2, 0.0, content_type=CONTENT_JPEG)
+        with self.connect() as ws:
+            ws.send_bytes(message)
+            response = json.loads(ws.receive_text())
+        self.assertIn(response["classification"], CLASSES)
+
+    def test_base64_text_is_classified(self):
+        with self.client.websocket_connect("/inference") as ws:
+            ws.send_text(base64.b64encode(jpeg(64, 64)).decode())
+            response = json.loads(ws.receive_text())
+        self.assertIn(response["classification"], CLASSES)
+
+    def test_overload_is_answered_without_closing_the_connection(self):
+        executor = manager_model_route.inference_executor
+        with self.connect() as ws:
+            executor.pending = executor.workers + executor.max_queue
+            try:
+                ws.send_bytes(self.frame)
+                response = json.loads(ws.receive_text())
+            finally:
+                executor.pending = 0
+            self.assertEqual(response["error"], "overloaded")
+            ws.send_bytes(self.frame)
+            self.assertIn("classification", json.loads(ws.receive_text()))
+
+
+if __name__ == "__main__":
+    unittest.main()
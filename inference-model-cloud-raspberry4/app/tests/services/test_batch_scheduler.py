@@ -0,0 +1,147 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from app.services.batch_scheduler import BatchScheduler
+from app.services.interpreter_pool import InferenceExecutor, InterpreterPool
+from benchmarks.dummy_model import write_model_dir
+
+SIZE = 32
+
+
+class RecordingPool(InterpreterPool):
+    """Interpretadores do modelo de teste que registram o tamanho de cada lote executado."""
+
+    def __init__(self, model_path: str):
+        super().__init__(model_path, size=1, num_threads=1)
+        self.batches = []
+
+    def invoke_batch(self, images):
+        self.batches.append(len(images))
+        return super().invoke_batch(images)
+
+
+class ConcurrentPool(InterpreterPool):
+    """Modelo de lote fixo cujas inferências só terminam quando duas rodam juntas."""
+
+    def __init__(self, model_path: str):
+        super().__init__(model_path, size=2, num_threads=1)
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.interpreters = []
+
+    def _invoke(self, interpreter, input_details, output_details, images):
+        self.interpreters.append(id(interpreter))
+        self.barrier.wait()
+        return super()._invoke(interpreter, input_details, output_details, images)
+
+
+def image(value: int) -> np.ndarray:
+    return np.full((SIZE, SIZE, 3), value, dtype=np.uint8)
+
+
+class TestBatchScheduler(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.model_path = write_model_dir(cls.directory.name, size=SIZE)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.executor = InferenceExecutor(workers=1, max_queue=8)
+        self.scheduler = BatchScheduler(self.executor, max_batch_size=4, window_ms=200)
+        self.model = RecordingPool(self.model_path)
+
+    def tearDown(self):
+        self.scheduler.stop()
+        self.executor.shutdown()
+
+    async def admitted_predict(self, model, value, delay=0.0):
+        async with self.executor.admit():
+            await asyncio.sleep(delay)
+            return await self.scheduler.predict(model, image(value))
+
+    async def test_requests_within_the_window_share_a_batch(self):
+        outputs = await asyncio.gather(
+            self.admitted_predict(self.model, 10),
+            self.admitted_predict(self.model, 20, delay=0.02),
+            self.admitted_predict(self.model, 30, delay=0.04),
+        )
+        self.assertEqual(self.model.batches, [3])
+        for output in outputs:
+            self.assertEqual(output.shape, (3,))
+            self.assertAlmostEqual(float(output.sum()), 1.0, places=5)
+
+    async def test_single_client_does_not_wait_for_the_window(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await self.admitted_predict(self.model, 10)
+        self.assertLess(loop.time() - start, 0.2)
+        self.assertEqual(self.model.batches, [1])
+
+    async def test_batch_is_split_by_model_after_a_reload(self):
+        reloaded = RecordingPool(self.model_path)
+        outputs = await asyncio.gather(
+            self.admitted_predict(self.model, 10),
+            self.admitted_predict(reloaded, 20),
+            self.admitted_predict(self.model, 30),
+        )
+        self.assertEqual(self.model.batches, [2])
+        self.assertEqual(reloaded.batches, [1])
+        self.assertEqual(len(outputs), 3)
+
+    async def test_dispatch_tasks_are_kept_until_done(self):
+        await self.admitted_predict(self.model, 10)
+        await asyncio.sleep(0)
+        self.assertEqual(self.scheduler._dispatches, set())
+
+    async def test_stop_fails_requests_waiting_for_a_batch(self):
+        async with self.executor.admit(), self.executor.admit():
+            waiting = asyncio.create_task(self.scheduler.predict(self.model, image(10)))
+            await asyncio.sleep(0.02)
+            self.scheduler.stop()
+            with self.assertRaises(RuntimeError):
+                await asyncio.wait_for(waiting, 1)
+        self.assertEqual(self.model.batches, [])
+
+
+class TestBatchSchedulerFixedBatch(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.model_path = write_model_dir(
+            cls.directory.name, size=SIZE, fixed_batch=True
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.executor = InferenceExecutor(workers=2, max_queue=8)
+        self.scheduler = BatchScheduler(self.executor, max_batch_size=4, window_ms=200)
+        self.model = ConcurrentPool(self.model_path)
+
+    def tearDown(self):
+        self.scheduler.stop()
+        self.executor.shutdown()
+
+    async def test_concurrent_requests_run_on_different_interpreters(self):
+        self.assertFalse(self.model.supports_batch)
+        outputs = await asyncio.gather(
+            self.scheduler.predict(self.model, image(10)),
+            self.scheduler.predict(self.model, image(20)),
+        )
+        self.assertEqual(len(set(self.model.interpreters)), 2)
+        self.assertIsNone(self.scheduler._task)
+        for output in outputs:
+            self.assertEqual(output.shape, (3,))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import asyncio
+import tempfile
+import unittest
+
+import numpy as np
+
+from app.services.interpreter_pool import (
+    InferenceExecutor,
+    InferenceOverloadedError,
+    InterpreterPool,
+)
+from benchmarks.dummy_model import CLASSES, write_model_dir
+
+SIZE = 32
+
+
+class TestInterpreterPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.pool = InterpreterPool(
+            write_model_dir(cls.directory.name, size=SIZE), size=2, num_threads=1
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_describes_the_model(self):
+        self.assertEqual(self.pool.precision, "float32/float32")
+        self.assertTrue(self.pool.supports_batch)
+        self.assertEqual(list(self.pool.input_details[0]["shape"][1:]), [SIZE, SIZE, 3])
+
+    def test_batch_has_one_row_per_image(self):
+        images = [
+            np.full((SIZE, SIZE, 3), value, dtype=np.uint8) for value in (0, 128, 255)
+        ]
+        outputs = self.pool.invoke_batch(images)
+        self.assertEqual(outputs.shape, (3, len(CLASSES)))
+        np.testing.assert_allclose(outputs.sum(axis=1), 1.0, rtol=1e-5)
+        single = self.pool.invoke_batch(images[1:2])
+        np.testing.assert_allclose(single[0], outputs[1], rtol=1e-5)
+
+    def test_top_class(self):
+        class_index, score = self.pool.top_class(
+            np.array([0.1, 0.7, 0.2], dtype=np.float32)
+        )
+        self.assertEqual(class_index, 1)
+        self.assertAlmostEqual(score, 0.7, places=5)
+
+
+class TestQuantizedInterpreterPool(unittest.TestCase):
+    """Compara as variantes uint8 e int8 do modelo de teste com a versão float."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.pools = {
+            quantization: InterpreterPool(
+                write_model_dir(
+                    f"{cls.directory.name}/{quantization}",
+                    size=SIZE,
+                    quantization=quantization,
+                ),
+                size=1,
+                num_threads=1,
+            )
+            for quantization in (None, "uint8", "int8")
+        }
+        random = np.random.default_rng(0)
+        cls.images = [
+            random.integers(0, 256, (SIZE, SIZE, 3), dtype=np.uint8) for _ in range(4)
+        ] + [
+            np.full((SIZE, SIZE, 3), (10, 200, 90), dtype=np.uint8),
+            np.full((SIZE, SIZE, 3), (230, 20, 40), dtype=np.uint8),
+        ]
+        cls.expected = cls.pools[None].invoke_batch(cls.images)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_describes_the_precision(self):
+        self.assertEqual(self.pools["uint8"].precision, "uint8/uint8")
+        self.assertEqual(self.pools["int8"].precision, "int8/int8")
+
+    def test_input_quantization(self):
+        # uint8 com escala 1 e zero point 0 recebe os pixels como estão
+        self.assertIsNone(self.pools["uint8"]._input_table)
+        np.testing.assert_array_equal(
+            self.pools["int8"]._input_table, np.arange(256) - 128
+        )
+        table = InterpreterPool._quantization_table(
+            {"dtype": np.uint8, "quantization": (2.0, 10)}
+        )
+        self.assertEqual(list(table[[0, 1, 2, 255]]), [10, 10, 11, 138])
+
+    def test_outputs_match_the_float_model(self):
+        for quantization in ("uint8", "int8"):
+            with self.subTest(quantization=quantization):
+                pool = self.pools[quantization]
+                outputs = pool.invoke_batch(self.images)
+                self.assertEqual(outputs.dtype, np.dtype(quantization))
+                scale, zero_point = pool.output_details[0]["quantization"]
+                np.testing.assert_allclose(
+                    (outputs.astype(np.float32) - zero_point) * scale,
+                    self.expected,
+                    atol=2 / 256,
+                )
+
+    def test_top_class_is_dequantized(self):
+        for quantization in ("uint8", "int8"):
+            with self.subTest(quantization=quantization):
+                pool = self.pools[quantization]
+                outputs = pool.invoke_batch(self.images)
+                for output, expected in zip(outputs, self.expected):
+                    class_index, score = pool.top_class(output)
+                    self.assertEqual(class_index, int(np.argmax(expected)))
+                    self.assertAlmostEqual(score, float(expected.max()), delta=2 / 256)
+
+
+class TestInferenceExecutor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.executor = InferenceExecutor(workers=1, max_queue=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    async def test_requests_beyond_the_queue_are_refused(self):
+        release = asyncio.Event()
+
+        async def hold():
+            async with self.executor.admit():
+                await release.wait()
+
+        held = [asyncio.create_task(hold()) for _ in range(2)]
+        await asyncio.sleep(0)
+        self.assertEqual(self.executor.pending, 2)
+        with self.assertRaises(InferenceOverloadedError):
+            await self.executor.submit(sum, [1, 2])
+        release.set()
+        await asyncio.gather(*held)
+        self.assertEqual(self.executor.pending, 0)
+        self.assertEqual(await self.executor.submit(sum, [1, 2]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
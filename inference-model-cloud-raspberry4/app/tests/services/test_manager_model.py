@@ -0,0 +1,69 @@
+import os
+import tempfile
+import time
+import unittest
+
+from app.services.manager_model import ManagerModel
+from benchmarks.dummy_model import write_model_dir
+
+
+class TestManagerModel(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.model_path = write_model_dir(self.directory.name, size=32)
+        self.manager = ManagerModel()
+        self.manager.model_path = self.model_path
+        self.manager.classes_path = os.path.join(self.directory.name, "classes.txt")
+        self.manager.reload_interval = 0
+
+    def tearDown(self):
+        self.wait_for_reload()
+        self.directory.cleanup()
+
+    def wait_for_reload(self):
+        reloader = self.manager._reloader
+        if reloader is not None:
+            reloader.join(5)
+
+    def touch(self, seconds=10):
+        stat = os.stat(self.model_path)
+        os.utime(
+            self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9)
+        )
+
+    def test_load_warms_the_model(self):
+        loaded = self.manager.load()
+        self.assertEqual(loaded.classes, ["empty", "ok", "nok"])
+        self.assertIs(self.manager.get_loaded_model(), loaded)
+
+    def test_content_change_is_reloaded_in_the_background(self):
+        first = self.manager.load()
+        write_model_dir(self.directory.name, size=48)
+        self.touch()
+
+        # Segura a recarga para que a thread não troque o modelo antes da conferência
+        with self.manager._reload_lock:
+            start = time.perf_counter()
+            self.assertIs(self.manager.get_loaded_model(), first)
+            self.assertLess(time.perf_counter() - start, 0.05)
+
+        self.wait_for_reload()
+        reloaded = self.manager.get_loaded_model()
+        self.assertIsNot(reloaded, first)
+        self.assertNotEqual(reloaded.digest, first.digest)
+        self.assertEqual(list(reloaded.model.input_details[0]["shape"][1:3]), [48, 48])
+
+    def test_same_content_keeps_the_model(self):
+        first = self.manager.load()
+        self.touch()
+        self.manager.get_loaded_model()
+        self.wait_for_reload()
+        self.assertIs(self.manager.get_loaded_model(), first)
+
+    def test_missing_model_is_not_loaded(self):
+        os.remove(self.model_path)
+        self.assertIsNone(self.manager.load())
+
+
+if __name__ == "__main__":
+    unittest.main()
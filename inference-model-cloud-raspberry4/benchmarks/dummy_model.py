@@ -0,0 +1,328 @@
+"""
+Gera um modelo TFLite de classificação para testes locais do serviço.
+
+Sem dependências, o modelo é escrito direto no formato flatbuffer do TFLite: a média
+de cada canal da imagem (MEAN) seguida de um SOFTMAX, com o lote dinâmico, ou fixo
+em 1 com `--fixed-batch`. `--quantization uint8` ou `int8` gera a mesma rede com
+entrada e saída quantizadas, para comparar com a versão float em
+benchmarks.quantization. Com o TensorFlow instalado, `--tensorflow` gera uma pequena
+rede convolucional, com custo de inferência mais próximo de um modelo real.
+
+Uso, a partir da pasta inference-model-cloud-raspberry4:
+
+    python -m benchmarks.dummy_model /tmp/modelo --size 224 [--fixed-batch] \
+        [--quantization uint8|int8] [--tensorflow]
+
+A pasta gerada segue o layout esperado pelo serviço (MODEL_PATH):
+models/inference/model_inference.tflite e classes.txt.
+"""
+
+import argparse
+import os
+import struct
+from typing import List, Optional
+
+# Valores do schema do TFLite
+FLOAT32 = 0
+INT32 = 2
+UINT8 = 3
+INT8 = 9
+OPERATOR_SOFTMAX = 25
+OPERATOR_MEAN = 40
+OPTIONS_SOFTMAX = 9
+OPTIONS_REDUCER = 27
+
+CLASSES = ["empty", "ok", "nok"]
+
+# Tipo do tensor e zero point de cada quantização. Os pixels e a média usam escala 1;
+# a saída do softmax, entre 0 e 1, usa a escala 1/256 exigida pelo TFLite.
+QUANTIZATIONS = {"uint8": (UINT8, 0), "int8": (INT8, -128)}
+
+
+class _FlatBufferBuilder:
+    """
+    Escritor mínimo de flatbuffers, construído de trás para frente como o oficial.
+
+    Cada objeto é identificado pela distância entre ele e o fim do buffer, que não
+    muda à medida que novos bytes são inseridos na frente.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.minalign = 4
+
+    def _pad(self, align: int, additional: int = 0) -> None:
+        self.minalign = max(self.minalign, align)
+        self.data[0:0] = bytes((-(len(self.data) + additional)) % align)
+
+    def _prepend(self, fmt: str, value) -> int:
+        size = struct.calcsize("<" + fmt)
+        self._pad(size)
+        self.data[0:0] = struct.pack("<" + fmt, value)
+        return len(self.data)
+
+    def _prepend_offset(self, target: int) -> int:
+        self._pad(4)
+        self.data[0:0] = struct.pack("<I", len(self.data) + 4 - target)
+        return len(self.data)
+
+    def vector(self, fmt: str, values) -> int:
+        size = struct.calcsize("<" + fmt)
+        self._pad(max(4, size), size * len(values))
+        self.data[0:0] = b"".join(struct.pack("<" + fmt, value) for value in values)
+        return self._prepend("I", len(values))
+
+    def bytes_vector(self, data: bytes, align: int = 16) -> int:
+        self._pad(align, len(data))
+        self.data[0:0] = data
+        return self._prepend("I", len(data))
+
+    def offset_vector(self, targets: List[int]) -> int:
+        self._pad(4, 4 * len(targets))
+        for target in reversed(targets):
+            self._prepend_offset(target)
+        return self._prepend("I", len(targets))
+
+    def string(self, text: str) -> int:
+        encoded = text.encode() + b"\0"
+        self._pad(4, len(encoded))
+        self.data[0:0] = encoded
+        return self._prepend("I", len(encoded) - 1)
+
+    def table(self, fields: dict) -> int:
+        """
+        Escreve uma tabela. `fields` mapeia o índice do campo para ("offset", ref)
+        ou (formato struct, valor).
+        """
+        end = len(self.data)
+        positions = {}
+        for index in sorted(fields, reverse=True):
+            fmt, value = fields[index]
+            if fmt == "offset":
+                positions[index] = self._prepend_offset(value)
+            else:
+                positions[index] = self._prepend(fmt, value)
+        table = self._prepend("i", 0)
+
+        slots = max(fields) + 1 if fields else 0
+        vtable = [4 + 2 * slots, table - end]
+        vtable += [table - positions[i] if i in positions else 0 for i in range(slots)]
+        self.data[0:0] = struct.pack(f"<{len(vtable)}H", *vtable)
+        # O soffset da tabela aponta para a vtable, escrita logo antes dela
+        struct.pack_into(
+            "<i", self.data, len(self.data) - table, len(self.data) - table
+        )
+        return table
+
+    def finish(self, root: int, identifier: bytes) -> bytes:
+        self._pad(self.minalign, 8)
+        self.data[0:0] = identifier
+        self._prepend_offset(root)
+        return bytes(self.data)
+
+
+def build_flatbuffer_model(
+    size: int,
+    classes: int,
+    fixed_batch: bool = False,
+    quantization: Optional[str] = None,
+) -> bytes:
+    """
+    Escreve o modelo MEAN + SOFTMAX no formato flatbuffer do TFLite.
+
+    Args:
+        size (int): Altura e largura da entrada.
+        classes (int): Quantidade de classes. A média usa os três canais da imagem,
+            então o modelo tem sempre três saídas; valores maiores não são suportados.
+        fixed_batch (bool, optional): Fixa o lote em 1, como modelos exportados sem
+            lote dinâmico. Default é False.
+        quantization (Optional[str], optional): "uint8" ou "int8" para quantizar a
+            entrada, a média e a saída. Default é None, tudo em float32.
+
+    Returns:
+        bytes: O conteúdo do arquivo .tflite.
+    """
+    if classes != 3:
+        raise ValueError("O modelo sem TensorFlow tem exatamente 3 classes.")
+    if quantization is not None and quantization not in QUANTIZATIONS:
+        raise ValueError(f"Quantização não suportada: {quantization}.")
+    builder = _FlatBufferBuilder()
+
+    def tensor(name, shape, tensor_type, buffer, scale=None, zero_point=0):
+        quantization_parameters = None
+        if scale is not None:
+            quantization_parameters = builder.table(
+                {
+                    2: ("offset", builder.vector("f", [scale])),
+                    3: ("offset", builder.vector("q", [zero_point])),
+                }
+            )
+        signature = builder.vector("i", [1 if fixed_batch else -1] + shape[1:])
+        name = builder.string(name)
+        shape = builder.vector("i", shape)
+        fields = {
+            0: ("offset", shape),
+            1: ("b", tensor_type),
+            2: ("I", buffer),
+            3: ("offset", name),
+            7: ("offset", signature),
+        }
+        if quantization_parameters is not None:
+            fields[4] = ("offset", quantization_parameters)
+        return builder.table(fields)
+
+    if quantization is None:
+        tensors = [
+            tensor("input", [1, size, size, 3], FLOAT32, 0),
+            tensor("axes", [2], INT32, 1),
+            tensor("mean", [1, 3], FLOAT32, 0),
+            tensor("output", [1, 3], FLOAT32, 0),
+        ]
+    else:
+        tensor_type, zero_point = QUANTIZATIONS[quantization]
+        tensors = [
+            tensor("input", [1, size, size, 3], tensor_type, 0, 1.0, zero_point),
+            tensor("axes", [2], INT32, 1),
+            tensor("mean", [1, 3], tensor_type, 0, 1.0, zero_point),
+            tensor("output", [1, 3], tensor_type, 0, 1 / 256, zero_point),
+        ]
+
+    reducer_options = builder.table({0: ("?", False)})
+    # beta suaviza o softmax sobre médias de pixels entre 0 e 255
+    softmax_options = builder.table({0: ("f", 1 / 32)})
+
+    def operator(opcode_index, inputs, outputs, options_type, options):
+        outputs = builder.vector("i", outputs)
+        inputs = builder.vector("i", inputs)
+        return builder.table(
+            {
+                0: ("I", opcode_index),
+                1: ("offset", inputs),
+                2: ("offset", outputs),
+                3: ("B", options_type),
+                4: ("offset", options),
+            }
+        )
+
+    operators = [
+        operator(0, [0, 1], [2], OPTIONS_REDUCER, reducer_options),
+        operator(1, [2], [3], OPTIONS_SOFTMAX, softmax_options),
+    ]
+
+    subgraph_name = builder.string("main")
+    subgraph = builder.table(
+        {
+            0: ("offset", builder.offset_vector(tensors)),
+            1: ("offset", builder.vector("i", [0])),
+            2: ("offset", builder.vector("i", [3])),
+            3: ("offset", builder.offset_vector(operators)),
+            4: ("offset", subgraph_name),
+        }
+    )
+
+    # Os kernels int8 do MEAN e do SOFTMAX entraram na versão 2 dos operadores
+    version = 2 if quantization == "int8" else 1
+    operator_codes = [
+        builder.table({0: ("b", code), 2: ("i", version), 3: ("i", code)})
+        for code in (OPERATOR_MEAN, OPERATOR_SOFTMAX)
+    ]
+    axes = builder.bytes_vector(struct.pack("<2i", 1, 2))
+    buffers = [builder.table({}), builder.table({0: ("offset", axes)})]
+
+    description = builder.string("modelo de teste")
+    model = builder.table(
+        {
+            0: ("I", 3),
+            1: ("offset", builder.offset_vector(operator_codes)),
+            2: ("offset", builder.offset_vector([subgraph])),
+            3: ("offset", description),
+            4: ("offset", builder.offset_vector(buffers)),
+        }
+    )
+    return builder.finish(model, b"TFL3")
+
+
+def build_tensorflow_model(size: int, classes: int) -> bytes:
+    """
+    Converte uma pequena rede convolucional Keras, com pesos aleatórios, para TFLite.
+
+    Args:
+        size (int): Altura e largura da entrada.
+        classes (int): Quantidade de classes.
+
+    Returns:
+        bytes: O conteúdo do arquivo .tflite.
+    """
+    import tensorflow as tf
+
+    inputs = tf.keras.Input((size, size, 3))
+    x = tf.keras.layers.Rescaling(1 / 127.5, offset=-1)(inputs)
+    for filters in (16, 32, 64):
+        x = tf.keras.layers.Conv2D(filters, 3, strides=2, activation="relu")(x)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    outputs = tf.keras.layers.Dense(classes, activation="softmax")(x)
+    model = tf.keras.Model(inputs, outputs)
+    return tf.lite.TFLiteConverter.from_keras_model(model).convert()
+
+
+def write_model_dir(
+    path: str,
+    size: int = 224,
+    classes: int = 3,
+    use_tensorflow: bool = False,
+    fixed_batch: bool = False,
+    quantization: Optional[str] = None,
+) -> str:
+    """
+    Cria uma pasta de modelo no layout esperado pelo serviço.
+
+    Args:
+        path (str): Pasta de destino, usada como MODEL_PATH.
+        size (int, optional): Altura e largura da entrada. Default é 224.
+        classes (int, optional): Quantidade de classes. Default é 3.
+        use_tensorflow (bool, optional): Gera a rede convolucional com TensorFlow. Default é False.
+        fixed_batch (bool, optional): Gera o modelo sem TensorFlow com lote fixo em 1. Default é False.
+        quantization (Optional[str], optional): "uint8" ou "int8" para gerar o modelo sem TensorFlow quantizado. Default é None.
+
+    Returns:
+        str: Caminho do arquivo .tflite gerado.
+    """
+    model_dir = os.path.join(path, "models", "inference")
+    os.makedirs(model_dir, exist_ok=True)
+    if use_tensorflow:
+        content = build_tensorflow_model(size, classes)
+    else:
+        content = build_flatbuffer_model(size, classes, fixed_batch, quantization)
+    model_path = os.path.join(model_dir, "model_inference.tflite")
+    with open(model_path, "wb") as file:
+        file.write(content)
+
+    names = CLASSES + [f"classe_{index}" for index in range(len(CLASSES), classes)]
+    with open(os.path.join(path, "classes.txt"), "w") as file:
+        file.write("\n".join(names[:classes]))
+    return model_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="Pasta de destino (MODEL_PATH).")
+    parser.add_argument("--size", type=int, default=224)
+    parser.add_argument("--classes", type=int, default=3)
+    parser.add_argument("--tensorflow", action="store_true")
+    parser.add_argument("--fixed-batch", action="store_true")
+    parser.add_argument("--quantization", choices=sorted(QUANTIZATIONS))
+    args = parser.parse_args()
+    print(
+        write_model_dir(
+            args.path,
+            args.size,
+            args.classes,
+            args.tensorflow,
+            args.fixed_batch,
+            args.quantization,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Gera carga no endpoint /inference e mede vazão e latência do serviço.
+
+Cada cliente concorrente envia as imagens da pasta em ciclo durante o tempo pedido,
+reutilizando a conexão ou abrindo uma nova por pedido, com o payload em base64 ou
+no protocolo binário de frames. O relatório traz vazão, latências p50/p95/p99 e as
+contagens de erros e de recusas por sobrecarga, em tabela ou JSON.
+
+Uso, a partir da pasta inference-model-cloud-raspberry4:
+
+    # sobe o serviço localmente com um modelo gerado e mede
+    python -m benchmarks.load --serve --concurrency 8 --duration 20 --encoding binary
+
+    # mede um serviço já em execução
+    python -m benchmarks.load --url ws://sv-inferencia-python:9999/inference --json
+
+Variáveis do serviço podem ser comparadas com `--serve --env BATCH_MAX_SIZE=1 ...`.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+import websockets
+from PIL import Image
+
+from app.services.frame_protocol import FRAME_SUBPROTOCOL, pack_frame
+from benchmarks.dummy_model import write_model_dir
+from benchmarks.quantization import list_images
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_IMAGES = os.path.join(
+    PACKAGE_DIR, "..", "edge-backend", "app", "tests", "resources", "images"
+)
+
+
+class LoadResults:
+    def __init__(self):
+        """
+        Acumula o resultado de cada pedido feito durante a medição.
+        """
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.connections = 0
+
+    def record(self, status: str, latency: float, error: Optional[str] = None) -> None:
+        self.statuses[status] += 1
+        if status == "ok":
+            self.latencies.append(latency)
+        if error:
+            self.errors[error] += 1
+
+
+def load_payloads(paths: List[str], encoding: str) -> List:
+    """
+    Lê as imagens e monta as mensagens no formato pedido.
+
+    Args:
+        paths (List[str]): Imagens JPEG.
+        encoding (str): "base64" ou "binary".
+
+    Returns:
+        List: Uma mensagem (str ou bytes) por imagem.
+    """
+    payloads = []
+    for frame_id, path in enumerate(paths):
+        with open(path, "rb") as file:
+            jpeg = file.read()
+        if encoding == "base64":
+            payloads.append(base64.b64encode(jpeg).decode())
+        else:
+            width, height = Image.open(path).size
+            payloads.append(
+                pack_frame(jpeg, frame_id, time.time(), shape=(height, width, 3))
+            )
+    return payloads
+
+
+def classify_reply(reply) -> str:
+    data = json.loads(reply)
+    if data.get("error") == "overloaded":
+        return "overloaded"
+    if "error" in data or "classification" not in data:
+        return "error"
+    return "ok"
+
+
+async def client(
+    url: str,
+    payloads: List,
+    encoding: str,
+    reuse: bool,
+    warmup_until: float,
+    deadline: float,
+    results: LoadResults,
+) -> None:
+    """
+    Envia pedidos em sequência até o fim da medição.
+
+    Pedidos iniciados durante o aquecimento não entram no resultado. Sem reutilização
+    a latência inclui a abertura da conexão.
+    """
+    subprotocols = [FRAME_SUBPROTOCOL] if encoding == "binary" else None
+    position = random.randrange(len(payloads))
+    connection = None
+    while time.monotonic() < deadline:
+        payload = payloads[position % len(payloads)]
+        position += 1
+        started = time.monotonic()
+        error = None
+        try:
+            if connection is None:
+                connection = await websockets.connect(
+                    url, subprotocols=subprotocols, max_size=None
+                )
+                results.connections += 1
+            await connection.send(payload)
+            status = classify_reply(await connection.recv())
+        except Exception as e:
+            status, error = "error", type(e).__name__
+            if connection is not None:
+                await connection.close()
+            connection = None
+        latency = (time.monotonic() - started) * 1000
+        if not reuse and connection is not None:
+            await connection.close()
+            connection = None
+        if started >= warmup_until:
+            results.record(status, latency, error)
+    if connection is not None:
+        await connection.close()
+
+
+async def run_load(
+    url: str,
+    payloads: List,
+    encoding: str,
+    concurrency: int,
+    reuse: bool,
+    duration: float,
+    warmup: float,
+) -> LoadResults:
+    results = LoadResults()
+    start = time.monotonic()
+    await asyncio.gather(
+        *(
+            client(
+                url,
+                payloads,
+                encoding,
+                reuse,
+                start + warmup,
+                start + warmup + duration,
+                results,
+            )
+            for _ in range(concurrency)
+        )
+    )
+    return results
+
+
+def model_status_url(url: str) -> str:
+    base = url.replace("ws://", "http://", 1).replace("wss://", "https://", 1)
+    return base.rsplit("/", 1)[0] + "/model"
+
+
+def fetch_model_status(url: str) -> Optional[Dict]:
+    try:
+        with urllib.request.urlopen(model_status_url(url), timeout=2) as response:
+            return json.loads(response.read())
+    except Exception:
+        return None
+
+
+def summarize(results: LoadResults, args, images: int, server: Optional[Dict]) -> Dict:
+    latencies = np.array(results.latencies) if results.latencies else np.zeros(1)
+    return {
+        "url": args.url,
+        "encoding": args.encoding,
+        "connection": args.connection,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "images": images,
+        "server": server,
+        "requests": sum(results.statuses.values()),
+        "ok": results.statuses["ok"],
+        "overloaded": results.statuses["overloaded"],
+        "errors": results.statuses["error"],
+        "error_types": dict(results.errors),
+        "connections": results.connections,
+        "throughput_rps": results.statuses["ok"] / args.duration,
+        "latency_ms": {
+            "mean": float(np.mean(latencies)),
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(np.max(latencies)),
+        },
+    }
+
+
+def print_report(summary: Dict) -> None:
+    rows = [
+        ("endpoint", summary["url"]),
+        ("payload", summary["encoding"]),
+        ("conexão", summary["connection"]),
+        ("clientes", summary["concurrency"]),
+        ("duração (s)", summary["duration_s"]),
+        ("imagens", summary["images"]),
+    ]
+    if summary["server"]:
+        server = summary["server"]
+        rows += [
+            ("modelo", f"{server['digest'][:12]} ({server['precision']})"),
+            (
+                "interpretadores",
+                f"{server['interpreters']} x {server['num_threads']} threads",
+            ),
+        ]
+    rows += [
+        ("pedidos", summary["requests"]),
+        ("respondidos", summary["ok"]),
+        ("sobrecarga", summary["overloaded"]),
+        ("erros", summary["errors"]),
+        ("conexões abertas", summary["connections"]),
+        ("vazão (req/s)", f"{summary['throughput_rps']:.1f}"),
+    ]
+    for name in ("mean", "p50", "p95", "p99", "max"):
+        rows.append((f"latência {name} (ms)", f"{summary['latency_ms'][name]:.1f}"))
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"{name:<{width}}  {value}")
+    for error, count in summary["error_types"].items():
+        print(f"{'':<{width}}  {error}: {count}")
+
+
+def start_service(args) -> subprocess.Popen:
+    """
+    Sobe o serviço em um subprocesso com o modelo gerado e espera ficar pronto.
+    """
+    model_dir = args.model_dir or tempfile.mkdtemp(prefix="sv-benchmark-")
+    if not os.path.exists(os.path.join(model_dir, "classes.txt")):
+        write_model_dir(model_dir, args.size, use_tensorflow=args.tensorflow)
+    env = dict(os.environ, MODEL_PATH=model_dir)
+    env.update(setting.split("=", 1) for setting in args.env)
+    port = args.url.split(":")[2].split("/")[0]
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            port,
+            "--log-level",
+            "warning",
+        ],
+        cwd=PACKAGE_DIR,
+        env=env,
+    )
+    deadline = time.monotonic() + 60
+    while fetch_model_status(args.url) is None:
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("O serviço não subiu.")
+        time.sleep(0.2)
+    return process
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="ws://127.0.0.1:9999/inference")
+    parser.add_argument("--images", nargs="+", default=[DEFAULT_IMAGES])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--connection", choices=("reuse", "per-request"), default="reuse"
+    )
+    parser.add_argument("--encoding", choices=("base64", "binary"), default="base64")
+    parser.add_argument("--duration", type=float, default=10, help="Segundos medidos.")
+    parser.add_argument("--warmup", type=float, default=1, help="Segundos descartados.")
+    parser.add_argument(
+        "--json", action="store_true", help="Imprime o resultado em JSON."
+    )
+    parser.add_argument("--output", help="Grava o resultado em JSON neste arquivo.")
+    parser.add_argument(
+        "--serve", action="store_true", help="Sobe o serviço localmente."
+    )
+    parser.add_argument(
+        "--model-dir", help="MODEL_PATH usado com --serve; gerado se vazio."
+    )
+    parser.add_argument(
+        "--size", type=int, default=224, help="Entrada do modelo gerado."
+    )
+    parser.add_argument(
+        "--tensorflow", action="store_true", help="Gera o modelo com TensorFlow."
+    )
+    parser.add_argument(
+        "--env", action="append", default=[], help="KEY=VALUE para o serviço."
+    )
+    args = parser.parse_args()
+
+    images = list_images(args.images)
+    if not images:
+        parser.error("Nenhuma imagem encontrada.")
+    payloads = load_payloads(images, args.encoding)
+
+    process = start_service(args) if args.serve else None
+    try:
+        results = asyncio.run(
+            run_load(
+                args.url,
+                payloads,
+                args.encoding,
+                args.concurrency,
+                args.connection == "reuse",
+                args.duration,
+                args.warmup,
+            )
+        )
+        summary = summarize(results, args, len(images), fetch_model_status(args.url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=2)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
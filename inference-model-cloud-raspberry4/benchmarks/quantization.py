@@ -0,0 +1,157 @@
+"""
+Compara a versão float e a versão quantizada (int8/uint8) do mesmo modelo TFLite.
+
+Cada imagem passa pelo mesmo pré-processamento e pelo mesmo InterpreterPool usados
+pelo serviço. O relatório mostra a latência do invoke por modelo, o ganho da versão
+quantizada e quanto as predições das duas versões concordam.
+
+Uso, a partir da pasta inference-model-cloud-raspberry4:
+
+    python -m benchmarks.quantization --float modelo.tflite --quantized modelo_int8.tflite \
+        --images imagens/ --runs 50 --threads 4 [--json]
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+from PIL import Image
+
+from app.services.inference_model_cloud import prepare_image
+from app.services.interpreter_pool import InterpreterPool
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def list_images(paths: List[str]) -> List[str]:
+    """
+    Expande pastas em listas de imagens.
+
+    Args:
+        paths (List[str]): Arquivos ou pastas.
+
+    Returns:
+        List[str]: Caminhos das imagens encontradas, em ordem.
+    """
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            images.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        else:
+            images.append(path)
+    return images
+
+
+def benchmark_model(
+    model_path: str, images: List[str], runs: int, num_threads: int
+) -> Dict:
+    """
+    Mede a latência do invoke e coleta a predição de cada imagem.
+
+    Args:
+        model_path (str): Caminho do arquivo .tflite.
+        images (List[str]): Imagens de entrada.
+        runs (int): Repetições do invoke por imagem.
+        num_threads (int): Threads do interpretador.
+
+    Returns:
+        Dict: Precisão, latências em ms e predições (classe, pontuação) por imagem.
+    """
+    pool = InterpreterPool(model_path, size=1, num_threads=num_threads)
+    height, width = pool.input_details[0]["shape"][1:3]
+    latencies = []
+    predictions = []
+    for path in images:
+        pixels = prepare_image(Image.open(path), height, width)
+        output = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = pool.invoke_batch([pixels])
+            latencies.append((time.perf_counter() - start) * 1000)
+        predictions.append(pool.top_class(output[0]))
+    return {
+        "model": model_path,
+        "precision": pool.precision,
+        "size_bytes": os.path.getsize(model_path),
+        "mean_ms": float(np.mean(latencies)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "predictions": predictions,
+    }
+
+
+def compare(float_result: Dict, quantized_result: Dict) -> Dict:
+    """
+    Resume a diferença entre as duas versões do modelo.
+
+    Args:
+        float_result (Dict): Resultado de `benchmark_model` para o modelo float.
+        quantized_result (Dict): Resultado de `benchmark_model` para o modelo quantizado.
+
+    Returns:
+        Dict: Ganho de latência, concordância do top-1 e diferença média das pontuações.
+    """
+    pairs = list(zip(float_result["predictions"], quantized_result["predictions"]))
+    agreement = np.mean([f[0] == q[0] for f, q in pairs])
+    score_diff = np.mean([abs(f[1] - q[1]) for f, q in pairs])
+    return {
+        "speedup": float_result["mean_ms"] / quantized_result["mean_ms"],
+        "top1_agreement": float(agreement),
+        "mean_score_diff": float(score_diff),
+    }
+
+
+def print_report(results: List[Dict], summary: Dict) -> None:
+    print(
+        f"{'modelo':<12}{'precisão':<18}{'tamanho (KB)':>14}"
+        f"{'média (ms)':>12}{'p50 (ms)':>10}{'p95 (ms)':>10}"
+    )
+    for label, result in zip(("float", "quantizado"), results):
+        print(
+            f"{label:<12}{result['precision']:<18}{result['size_bytes'] / 1024:>14.1f}"
+            f"{result['mean_ms']:>12.3f}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+        )
+    print()
+    print(f"ganho de latência: {summary['speedup']:.2f}x")
+    print(f"concordância do top-1: {summary['top1_agreement'] * 100:.1f}%")
+    print(f"diferença média da pontuação: {summary['mean_score_diff'] * 100:.2f} p.p.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--float", dest="float_model", required=True)
+    parser.add_argument("--quantized", required=True)
+    parser.add_argument("--images", nargs="+", required=True)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--json", action="store_true", help="Imprime o resultado em JSON."
+    )
+    args = parser.parse_args()
+
+    images = list_images(args.images)
+    if not images:
+        parser.error("Nenhuma imagem encontrada.")
+    results = [
+        benchmark_model(path, images, args.runs, args.threads)
+        for path in (args.float_model, args.quantized)
+    ]
+    summary = compare(*results)
+
+    if args.json:
+        for result in results:
+            result.pop("predictions")
+        print(json.dumps({"models": results, **summary}, indent=2))
+    else:
+        print_report(results, summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,24 @@ const tf = require("@tensorflow/tfjs");
 const tfn = require("@tensorflow/tfjs-node");
 const fs = require("fs");
 const WebSocket = require("ws");
-const wss = new WebSocket.Server({ port: 7987, typeof: "blob" });
 require('dotenv').config();
 
+// Binary frame protocol (see edge-backend app/backend/services/frame_protocol.py)
+const FRAME_SUBPROTOCOL = "sv-frame.v1";
+const FRAME_MAGIC = "SVFP";
+const FRAME_VERSION = 1;
+const FRAME_HEADER_SIZE = 36;
+const CONTENT_JPEG = 1;
+const CONTENT_RAW = 2;
+
+const wss = new WebSocket.Server({
+  port: 7987,
+  typeof: "blob",
+  // Only select the binary protocol when the client offers it; base64 clients get none
+  handleProtocols: (protocols) =>
+    protocols.has(FRAME_SUBPROTOCOL) ? FRAME_SUBPROTOCOL : false,
+});
+
 const MOBILE_NET_INPUT_WIDTH = 224;
 const MOBILE_NET_INPUT_HEIGHT = 224;
 const DEFAULT_PATH = process.env.MODEL_PATH
@@ -16,11 +31,16 @@ let modelJson = null;
 
 wss.on("connection", function connection(ws) {
   loadLocalModel();
-  ws.on("message", async function incoming(message) {
+  ws.on("message", async function incoming(message, isBinary) {
     try {
-      const messageString = message.toString("utf8");
-      const imageBuffer = Buffer.from(messageString, "base64");
-      const image = tfn.node.decodeImage(imageBuffer, 3);
+      let image;
+      if (isBinary) {
+        image = decodeFrame(message);
+      } else {
+        const messageString = message.toString("utf8");
+        const imageBuffer = Buffer.from(messageString, "base64");
+        image = tfn.node.decodeImage(imageBuffer, 3);
+      }
 
       const predictionResult = await predictImage(image);
 
@@ -36,6 +56,37 @@ wss.on("connection", function connection(ws) {
 
 loadMobileNetFeatureModel();
 
+function decodeFrame(message) {
+  if (message.length < FRAME_HEADER_SIZE) {
+    throw new Error("Message shorter than the frame header");
+  }
+  if (message.toString("ascii", 0, 4) !== FRAME_MAGIC) {
+    throw new Error("Message is not a binary frame");
+  }
+  const version = message.readUInt8(4);
+  if (version !== FRAME_VERSION) {
+    throw new Error(`Unsupported frame protocol version: ${version}`);
+  }
+  const contentType = message.readUInt8(5);
+  const headerSize = message.readUInt16LE(6);
+  const height = message.readUInt16LE(24);
+  const width = message.readUInt16LE(26);
+  const channels = message.readUInt8(28);
+  const payloadLength = message.readUInt32LE(32);
+  if (message.length < headerSize + payloadLength) {
+    throw new Error("Truncated frame payload");
+  }
+  const payload = message.subarray(headerSize, headerSize + payloadLength);
+
+  if (contentType === CONTENT_JPEG) {
+    return tfn.node.decodeImage(payload, 3);
+  }
+  if (contentType === CONTENT_RAW) {
+    return tf.tensor3d(new Uint8Array(payload), [height, width, channels], "int32");
+  }
+  throw new Error(`Unsupported frame content type: ${contentType}`);
+}
+
 async function loadMobileNetFeatureModel() {
   // Caminho do diretório onde o modelo MobileNet está localizado
   const mobileNetPath = "graph_model/mobilenet/model.json";